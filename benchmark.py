@@ -0,0 +1,338 @@
+import sys
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import threading
+import time
+
+import conductor_client as client
+
+#########################################################################################
+# Client Benchmarks #                                                                   #
+#########################################################################################
+
+# Measures requests/second and latency percentiles of the hot client operations against
+# mock_conductor.py (started on a free port unless --server is given), at several
+# concurrency levels and payload sizes:
+#
+#   python benchmark.py --concurrency 1,8,32 --payload 256,16384 --output results.json
+#   python benchmark.py --baseline results.json
+#
+# Results are written as JSON; with --baseline, runs whose throughput dropped or whose p99
+# latency grew by more than --tolerance are reported and the exit status is 1.
+
+BENCH_TASK = "bench_task"
+TASKS_PER_WORKFLOW = 5
+
+def payload(size):
+    return {"data": "x" * size}
+
+def checkStatus(result):
+    """Raise if the last request of this thread was not successful, return result otherwise"""
+
+    status = client.getLastStatus()
+    if status == None or status < 200 or status >= 300:
+        raise RuntimeError("Status " + str(status))
+    return result
+
+
+#########################################################################################
+# Mock Server #                                                                         #
+#########################################################################################
+
+def freePort():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+def startMockServer(args):
+    """Run mock_conductor.py in its own process, so it does not compete for the GIL of the client"""
+
+    port = freePort()
+    command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_conductor.py"),
+               "--port", str(port), "--latency", str(args.latency), "--jitter", str(args.jitter)]
+    server = subprocess.Popen(command, stdout=open(os.devnull, "w"))
+    client.ip = "127.0.0.1"
+    client.port = str(port)
+
+    deadline = time.time() + 10
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), 1).close()
+            return server
+        except socket.error:
+            if server.poll() != None or time.time() > deadline:
+                server.kill()
+                raise RuntimeError("Mock Conductor Server did not start on port " + str(port))
+            time.sleep(0.05)
+
+def registerMetadata():
+    checkStatus(client.createTaskMetadata(json.dumps([{"name": BENCH_TASK, "responseTimeoutSeconds": 600}])))
+    for name, taskCount in (("bench_start", 1), ("bench_tasks", TASKS_PER_WORKFLOW)):
+        tasks = [{"name": BENCH_TASK, "taskReferenceName": "task_%d" % i, "type": "SIMPLE"} for i in range(taskCount)]
+        checkStatus(client.createWorkflowMetadata(json.dumps({"name": name, "version": 1, "tasks": tasks})))
+
+
+#########################################################################################
+# Scenarios #                                                                           #
+#########################################################################################
+
+# Every scenario is a function(payloadSize, operations) preparing the server state and
+# returning operation(index) -> number of items processed by that operation.
+
+def completeTasks(count, output):
+    """Poll and complete count tasks of the benchmark workflows"""
+
+    while count > 0:
+        tasks = json.loads(checkStatus(client.batchPollTask(BENCH_TASK, "bench-setup", min(count, 100), 1000)))
+        if not tasks:
+            raise RuntimeError("Ran out of %s tasks with %d left to complete" % (BENCH_TASK, count))
+        for task in tasks:
+            checkStatus(client.updateTask(json.dumps(client.taskResult(task, "bench-setup", output))))
+        count -= len(tasks)
+
+def startWorkflows(name, count, size):
+    body = json.dumps(payload(size))
+    with client.AsyncClient(maxConcurrency=16) as pool:
+        futures = [pool.submit(lambda: checkStatus(client.startWorkflow(name, 1, None, body))) for i in range(count)]
+        return [future.result() for future in futures]
+
+def startWorkflowScenario(size, operations):
+    body = json.dumps(payload(size))
+
+    def operation(index):
+        checkStatus(client.startWorkflow("bench_start", 1, "bench-%d" % index, body))
+        return 1
+    return operation
+
+def getWorkflowScenario(includeTasks):
+    def scenario(size, operations):
+        workflowIds = startWorkflows("bench_tasks", 50, size)
+        completeTasks(len(workflowIds) * (TASKS_PER_WORKFLOW - 1), payload(size))
+
+        def operation(index):
+            checkStatus(client.getWorkflow(workflowIds[index % len(workflowIds)], includeTasks))
+            return 1
+        return operation
+    return scenario
+
+def pollUpdateScenario(batchSize):
+    def scenario(size, operations):
+        startWorkflows("bench_start", operations * batchSize, 0)
+        output = payload(size)
+
+        def operation(index):
+            if batchSize == 1:
+                task = checkStatus(client.pollTask(BENCH_TASK, "bench"))
+                tasks = [json.loads(task)] if task else []
+            else:
+                tasks = json.loads(checkStatus(client.batchPollTask(BENCH_TASK, "bench", batchSize, 100)))
+            for task in tasks:
+                checkStatus(client.updateTask(json.dumps(client.taskResult(task, "bench", output))))
+            return len(tasks)
+        return operation
+    return scenario
+
+def searchScenario(pageSize):
+    def scenario(size, operations):
+        name = "bench_search_%d" % size
+        checkStatus(client.createWorkflowMetadata(json.dumps({"name": name, "version": 1, "tasks": []})))
+        startWorkflows(name, pageSize * 10, size)
+        query = "workflowType = " + name
+
+        def operation(index):
+            checkStatus(client.searchWorkflows(pageSize * (index % 10), pageSize, None, '*', query))
+            return 1
+        return operation
+    return scenario
+
+# Scenario name -> function(payloadSize, operations), in the order they are run
+scenarios = [
+    ("startWorkflow", startWorkflowScenario),
+    ("getWorkflow", getWorkflowScenario('false')),
+    ("getWorkflowWithTasks", getWorkflowScenario('true')),
+    ("pollTaskUpdateTask", pollUpdateScenario(1)),
+    ("batchPollTaskUpdateTask", pollUpdateScenario(10)),
+    ("searchWorkflows", searchScenario(100)),
+]
+
+
+#########################################################################################
+# Runner #                                                                              #
+#########################################################################################
+
+def drainQueue():
+    """Complete the tasks left scheduled by earlier runs, so every run starts from empty queues"""
+
+    sizes = json.loads(checkStatus(client.getTaskTypeQueueSizes(json.dumps([BENCH_TASK]))))
+    if sizes.get(BENCH_TASK):
+        completeTasks(sizes[BENCH_TASK], {})
+
+def runOperations(operation, concurrency, operations):
+    """Run operations calls of operation on concurrency threads
+        Returns (items, errors, seconds, latency histogram in microseconds).
+    """
+
+    histogram = client.LatencyHistogram()
+    lock = threading.Lock()
+    counts = {"next": 0, "items": 0, "errors": 0}
+
+    def work():
+        while True:
+            with lock:
+                index = counts["next"]
+                if index >= operations:
+                    return
+                counts["next"] += 1
+
+            started = time.time()
+            try:
+                items = operation(index)
+                error = 0
+            except Exception:
+                items = 0
+                error = 1
+            elapsed = (time.time() - started) * 1000000
+            with lock:
+                histogram.record(elapsed)
+                counts["items"] += items
+                counts["errors"] += error
+
+    threads = [threading.Thread(target=work) for i in range(concurrency)]
+    started = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts["items"], counts["errors"], time.time() - started, histogram
+
+def runScenario(name, scenario, concurrency, size, operations, warmup):
+    drainQueue()
+    operation = scenario(size, operations + warmup)
+    client.ensurePoolSize(concurrency)
+    runOperations(operation, concurrency, warmup)
+    items, errors, seconds, histogram = runOperations(lambda index: operation(warmup + index), concurrency, operations)
+
+    return {
+        "scenario": name,
+        "concurrency": concurrency,
+        "payloadBytes": size,
+        "operations": operations,
+        "items": items,
+        "errors": errors,
+        "seconds": round(seconds, 6),
+        "opsPerSecond": round(operations / seconds, 2),
+        "itemsPerSecond": round(items / seconds, 2),
+        "latencyMicros": {
+            "mean": histogram.total // max(1, histogram.count),
+            "p50": histogram.percentile(50),
+            "p90": histogram.percentile(90),
+            "p99": histogram.percentile(99),
+            "max": histogram.max,
+        },
+    }
+
+def runKey(result):
+    return (result["scenario"], result["concurrency"], result["payloadBytes"])
+
+def compareResults(results, baseline, tolerance):
+    """Return a message for every run that is slower than the same run of baseline by more than tolerance"""
+
+    baselineRuns = dict((runKey(result), result) for result in baseline["results"])
+    regressions = []
+    for result in results:
+        before = baselineRuns.get(runKey(result))
+        if before == None:
+            continue
+        if result["opsPerSecond"] < before["opsPerSecond"] * (1 - tolerance):
+            regressions.append("%s concurrency=%d payload=%d: %.1f ops/s (baseline %.1f)" % (runKey(result) + (result["opsPerSecond"], before["opsPerSecond"])))
+        if result["latencyMicros"]["p99"] > before["latencyMicros"]["p99"] * (1 + tolerance):
+            regressions.append("%s concurrency=%d payload=%d: p99 %dus (baseline %dus)" % (runKey(result) + (result["latencyMicros"]["p99"], before["latencyMicros"]["p99"])))
+    return regressions
+
+def intList(value):
+    try:
+        values = [int(item) for item in value.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError("%s is not a comma separated list of integers" % value)
+    if not values or min(values) < 0:
+        raise argparse.ArgumentTypeError("%s is not a comma separated list of integers" % value)
+    return values
+
+def main():
+    scenarioNames = [name for name, scenario in scenarios]
+    parser = argparse.ArgumentParser(description="Benchmark Conductor client operations against a mock Conductor Server.")
+    parser.add_argument('--scenarios', default=",".join(scenarioNames), help='Comma separated scenarios to run, among ' + ",".join(scenarioNames) + ' (default == all)')
+    parser.add_argument('--concurrency', type=intList, default=[1, 8, 32], help='Comma separated concurrency levels (default == 1,8,32)')
+    parser.add_argument('--payload', type=intList, default=[256, 16384], help='Comma separated payload sizes in bytes (default == 256,16384)')
+    parser.add_argument('--operations', type=int, default=1000, help='Measured operations per run (default == 1000)')
+    parser.add_argument('--warmup', type=int, default=100, help='Unmeasured operations before each run (default == 100)')
+    parser.add_argument('--server', help='ip:port of a running mock or Conductor Server, instead of starting mock_conductor.py')
+    parser.add_argument('--latency', type=float, default=0, help='Latency injected by the started mock server, in ms (default == 0)')
+    parser.add_argument('--jitter', type=float, default=0, help='Jitter of the injected latency, in ms (default == 0)')
+    parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='Allowed relative slowdown against --baseline (default == 0.1)')
+    args = parser.parse_args()
+
+    selected = args.scenarios.split(",")
+    unknown = [name for name in selected if name not in scenarioNames]
+    if unknown:
+        parser.error("unknown scenarios: " + ",".join(unknown))
+
+    client.logRequests = False
+    client.useMetadataCache = False
+    server = None
+    if args.server:
+        client.ip, client.port = args.server.rsplit(":", 1)
+    else:
+        server = startMockServer(args)
+
+    results = []
+    try:
+        registerMetadata()
+        for name, scenario in scenarios:
+            if name not in selected:
+                continue
+            for size in args.payload:
+                for concurrency in args.concurrency:
+                    result = runScenario(name, scenario, concurrency, size, args.operations, args.warmup)
+                    results.append(result)
+                    sys.stderr.write("%-24s concurrency=%-4d payload=%-7d %10.1f ops/s  p50=%dus p99=%dus errors=%d\n" % (
+                        name, concurrency, size, result["opsPerSecond"], result["latencyMicros"]["p50"], result["latencyMicros"]["p99"], result["errors"]))
+    finally:
+        client.closeConnectionPools()
+        if server != None:
+            server.terminate()
+            server.wait()
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "server": args.server or "mock_conductor.py",
+        "time": int(time.time()),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2, sort_keys=True, separators=(",", ": "))
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True, separators=(",", ": "))
+        sys.stdout.write("\n")
+
+    if args.baseline:
+        with open(args.baseline) as baselineFile:
+            regressions = compareResults(results, json.load(baselineFile), args.tolerance)
+        for regression in regressions:
+            sys.stderr.write("Regression: " + regression + "\n")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,1214 +1,852 @@
 import sys
 import argparse
-import httplib, urllib
+import httplib
+import socket
+import collections
 import json
 import os
-import string
+import shlex
 
-###########
-# Globals #
-###########
+import conductor_client as client
 
-global ip
-ip = "localhost"
-
-global port
-port = "8080"
-
-#########################################################################################
-
-
-#############
-# Functions #
-#############
-
-#########################################################################################
-# Logging #                                                                             #
-#########################################################################################
-
-def logSendRequest(url, requestType, body=None):
-    """Print generic Send request to Conductor Server"""
-    
-    print("Sending [" + requestType + "] request to Conductor Server " + "(" + url + ")" + ":")
-    if body != None:
-        print("Body:")
-        print(body)
-    print("\n")
-
-
-def logResponse(statusCode, response):
-    """Print generic Response from Conductor Server"""
-    
-    print("Received response from Conductor Server " + "(" + ip + ")" + ":")
-    print("Status: " + str(statusCode))
-    print(response)
-    print("\n")
-
-
-#########################################################################################
-# HTTP Helpers #                                                                        #
 #########################################################################################
-
-def httpRequest(url, requestType, path, headers, body=None):
-    url = string.replace(url," ", "%20")
-    logSendRequest(url, requestType, body)
-    conn = httplib.HTTPConnection(ip, port)
-    conn.request(requestType, path, body, headers)
-    response = conn.getresponse()
-    responseData = response.read()
-    logResponse(response.status, responseData)
-    return response, responseData
-
-
-def httpPost(path, body='{}'):
-    """HTTP POST request to Conductor Server"""
-    headers = {"Content-type": "application/json"}
-    url = "http://" + ip + ":" + port + path
-    return httpRequest(url, "POST", path, headers, body)
-
-
-def httpPut(path, body='{}'):
-    """HTTP PUT request to Conductor Server"""
-
-    headers = {"Content-type": "application/json"}
-    url = "http://" + ip + ":" + port + path
-    return httpRequest(url, "PUT", path, headers, body)
-
-
-def httpGet(path):
-    """HTTP GET request to Conductor Server"""
-
-    headers = {"Accept": "application/json"}
-    url = "http://" + ip + ":" + port + path
-    return httpRequest(url, "GET", path, headers)
-
-
-def httpDelete(path, body='{}'):
-    """HTTP DELETE request to Conductor Server"""
-
-    headers = {"Accept": "application/json"}
-    url = "http://" + ip + ":" + port + path
-    logSendRequest(url, "DELETE")
-    return httpRequest(url, "DELETE", path, headers)
-
-
-#########################################################################################
-# Event Services #                                                                      #
-#########################################################################################
-
-def getAllEventHandlers():
-    """Get all the Conductor Event Handlers
-        Will invoke GET request with format http://<ip>:<port>/api/event
-    """
-
-    path = "/api/event"
-    response, responseData = httpGet(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def getEventHandler(event, activeOnly='true'):
-    """Get Event Handler for given event <event>
-        Will invoke GET request with format http://<ip>:<port>/api/event/<event>?activeOnly=<activeOnly>
-    """
-
-    path = "/api/event/" + event + "?activeOnly=" + activeOnly
-    response, responseData = httpGet(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def createEventHandler(body):
-    """Create Event Handler definition of body passed in
-        Will invoke POST request with format http://<ip>:<port>/api/event
-    """
-
-    path = "/api/event"
-    response, responseData = httpPost(path, body)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def modifyEventHandler(body):
-    """Modify Event Handler definition of body passed in
-        Will invoke PUT request with format http://<ip>:<port>/api/event
-    """
-
-    path = "/api/event"
-    response, responseData = httpPut(path, body)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def deleteEventHandler(name):
-    """Delete Event Handler of <name> passed in
-        Will invoke DELETE request with format http://<ip>:<port>/api/event/<name>
-    """
-
-    path = "/api/event/" + name
-    response, responseData = httpDelete(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def getEventExecutions(eventHandlerName, eventName, messageId, max=100):
-    """Get up to 100 Conductor Event Executions
-        Will invoke GET request with format http://<ip>:<port>/api/event/executions/<eventHandlerName>/<eventName>/<messageId>?max=<max>
-    """
-
-    path = "/api/event/executions/" + eventHandlerName + "/" + eventName + "/" + messageId + "?max=" + str(max)
-    response, responseData = httpGet(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def getRegisteredQueues(verbosity="false"):
-    """Get all the Conductor Registered Queues
-        Will invoke GET request with format http://<ip>:<port>/api/event/queues?verbose=<verbosity>
-    """
-
-    path = "/api/event/queues?verbose=" + verbosity
-    response, responseData = httpGet(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def getRegisteredQueueProviders():
-    """Get all the Conductor Registered Queue Providers
-        Will invoke GET request with format http://<ip>:<port>/api/event/queues/providers
-    """
-
-    path = "/api/event/queues/providers"
-    response, responseData = httpGet(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-#########################################################################################
-# Metadata Management #                                                                 #
-#########################################################################################
-
-def getAllTaskMetadata():
-    """Get all the Conductor Task Definitions
-        Will invoke GET request with format http://<ip>:<port>/api/metadata/taskdefs
-    """
-
-    path = "/api/metadata/taskdefs"
-    response, responseData = httpGet(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def createTaskMetadata(metadata):
-    """Create Task(s) definitions of metadata passed in
-        Will invoke POST request with format http://<ip>:<port>/api/metadata/taskdefs
-    """
-
-    path = "/api/metadata/taskdefs"
-    response, responseData = httpPost(path, metadata)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def modifyTaskMetadata(metadata):
-    """Modify Task definitions of metadata passed in
-        Will invoke PUT request with format http://<ip>:<port>/api/metadata/taskdefs
-    """
-
-    path = "/api/metadata/taskdefs"
-    response, responseData = httpPut(path, metadata)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def deleteTaskMetadata(taskType):
-    """Delete Task definitions of taskType passed in
-        Will invoke DELETE request with format http://<ip>:<port>/api/metadata/taskdefs/<tasktype>
-    """
-
-    path = "/api/metadata/taskdefs/" + taskType
-    response, responseData = httpDelete(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def getTaskMetadata(taskType):
-    """Get Task definition of taskType passed in
-        Will invoke GET request with format http://<ip>:<port>/api/metadata/taskdefs/<tasktype>
-    """
-
-    path = "/api/metadata/taskdefs/" + taskType
-    response, responseData = httpGet(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def getAllWorkflowMetadata():
-    """Get all the Conductor Workflow Definitions
-        Will invoke GET request with format http://<ip>:<port>/api/metadata/workflow
-    """
-
-    path = "/api/metadata/workflow"
-    response, responseData = httpGet(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def createWorkflowMetadata(metadata):
-    """Create Workflow definition of metadata passed in
-        Will invoke POST request with format http://<ip>:<port>/api/metadata/workflow
-    """
-
-    path = "/api/metadata/workflow"
-    response, responseData = httpPost(path, metadata)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def modifyWorkflowMetadata(metadata):
-    """Modify Workflow definitions of metadata passed in
-        Will invoke PUT request with format http://<ip>:<port>/api/metadata/workflow
-    """
-
-    path = "/api/metadata/workflow"
-    response, responseData = httpPut(path, metadata)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def getWorkflowMetadata(name):
-    """Get Workflow definition of name passed in
-        Will invoke GET request with format http://<ip>:<port>/api/metadata/workflow/<name>
-    """
-
-    path = "/api/metadata/workflow/" + name
-    response, responseData = httpGet(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-
-#########################################################################################
-# Admin #                                                                               #
+# Argument Parsing #                                                                    #
 #########################################################################################
 
-def getConfiguration():
-    """Get all the Conductor Configuration Parameters
-        Will invoke GET request with format http://<ip>:<port>/api/admin/config
-    """
-
-    path = "/api/admin/config"
-    response, responseData = httpGet(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def sweepWorkflow(workflowId):
-    """Queue up all the running workflows for sweep
-        Will invoke POST request with format http://<ip>:<port>/api/admin/sweep/requeue/<workflowId>
-    """
-
-    path = "/api/admin/sweep/requeue/" + workflowId
-    response, responseData = httpPost(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def getPendingTasks(taskType, start=None, count=100):
-    """Get the list of pending tasks for a given task type
-        Will invoke GET request with format http://<ip>:<port>/api/admin/task/<taskType>?start=<start>&count=<count>
-    """
-
-    parameterString = "?"
-    if start != None:
-        parameterString += "start=" + str(start)
-        parameterString += "&"
+def positive_int(value):
+    ivalue = int(value)
+    if ivalue <= 0:
+         raise argparse.ArgumentTypeError("%s is not a valid positive integer value" % value)
+    return ivalue
 
-    parameterString += "count=" + str(count)
+def argument(*args, **kwargs):
+    """Describe a sub-command argument, added to its parser only when the command is used"""
+    return args, kwargs
 
-    path = "/api/admin/task/" + taskType + parameterString
-    response, responseData = httpGet(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
+def optional(args, *names):
+    """Keyword arguments for the options in names that were given on the command line"""
+    return dict((name, getattr(args, name)) for name in names if getattr(args, name) != None)
 
-    return responseJSON
 
 #########################################################################################
-# Task Management #                                                                     #
+# Commands #                                                                            #
 #########################################################################################
 
-def updateTask(body):
-    """Update Task with information of body passed in
-        Will invoke POST request with format http://<ip>:<port>/api/tasks
-    """
-
-    path = "/api/tasks"
-    response, responseData = httpPost(path, body)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
+# Command name -> (arguments, function(args)). Sub-command parsers are only built for the
+# command being run, see getCommandParser().
+commands = collections.OrderedDict()
 
-def getInProgressTask(taskType, startKey=None, count=100):
-    """Get in progress tasks for a given task type
-        Will invoke GET request with format http://<ip>:<port>/api/tasks/in_progress/<taskType>?startKey=<startKey>&count=<count>
-    """
-
-    parameterString = "?"
-    if startKey != None:
-        parameterString += "startKey=" + startKey
-        parameterString += "&"
-
-    parameterString += "count=" + str(count)
-
-    path = "/api/tasks/in_progress/" + taskType + parameterString
-    response, responseData = httpGet(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def getInProgressTaskForWorkflowInstance(workflowId, taskName):
-    """Get a Conductor Task Instance information with given workflowId and task name
-        Will invoke GET request with format http://<ip>:<port>/api/tasks/in_progress/<workflowId>/<taskName>
-    """
-
-    path = "/api/tasks/in_progress/" + workflowId + "/" + taskName
-    response, responseData = httpGet(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
+def command(name, *arguments):
+    """Register the decorated function(args) as the sub-command name taking arguments"""
 
-    return responseJSON
+    def register(function):
+        commands[name] = (arguments, function)
+        return function
+    return register
 
-def batchPollTask(taskType, workerid=None, count=1, timeout=100):
-    """This method will batch poll for a given task
-        Will invoke GET request with format http://<ip>:<port>/api/tasks/poll/batch/<taskType>?workerid=<workerid>&count=<count>&timeout=<timeout>
-    """
-    parameterString = "?"
-    if workerid != None:
-        parameterString += "workerid=" + workerid
-        parameterString += "&"
-
-    parameterString += "count=" + str(count)
-    parameterString += "&timeout=" + str(timeout)
-
-    path = "/api/tasks/poll/batch/" + taskType + parameterString
-    response, responseData = httpGet(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def pollTask(taskType, workerid=None):
-    """This method will poll for a given task
-        Will invoke GET request with format http://<ip>:<port>/api/tasks/poll/<taskType>?workerid=<workerid>&count=<count>&timeout=<timeout>
-    """
-    path = "/api/tasks/poll/" + taskType
-    if workerid != None:
-        path += "?workerid=" + workerid
-
-    response, responseData = httpGet(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
+commandParsers = {}
 
-def getTasksQueue():
-    """Get details about each queue
-        Will invoke GET request with format http://<ip>:<port>/api/tasks/queue/all
-    """
-
-    path = "/api/tasks/queue/all"
-    response, responseData = httpGet(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
+def getCommandParser(name):
+    """Build (once) the parser of sub-command name"""
 
-    return responseJSON
+    parser = commandParsers.get(name)
+    if parser == None:
+        parser = argparse.ArgumentParser(prog="%s %s" % (os.path.basename(sys.argv[0]), name))
+        for args, kwargs in commands[name][0]:
+            parser.add_argument(*args, **kwargs)
+        commandParsers[name] = parser
+    return parser
 
-def getTasksQueueVerbose():
-    """Get verbose details about each queue
-        Will invoke GET request with format http://<ip>:<port>/api/tasks/queue/all/verbose
-    """
+def runCommand(name, subArgs):
+    """Parse subArgs for sub-command name and run it, returning the result of its API call"""
 
-    path = "/api/tasks/queue/all/verbose"
-    response, responseData = httpGet(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
+    arguments, function = commands[name]
+    return function(getCommandParser(name).parse_args(subArgs))
 
-    return responseJSON
+def writeRecords(records):
+    """Print one JSON document per line (NDJSON)"""
 
-def requeueAllPendingTasks():
-    """Requeue pending tasks for all the running workflows
-        Will invoke POST request with format http://<ip>:<port>/api/tasks/queue/requeue
-        Returns workflow instance id
-    """
+    for record in records:
+        sys.stdout.write(json.dumps(record) + "\n")
 
-    path = "/api/tasks/queue/requeue"
-    response, responseData = httpPost(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
 
-    return responseJSON
-
-def requeuePendingTasks(taskType):
-    """Requeue pending tasks for taskType
-        Will invoke POST request with format http://<ip>:<port>/api/tasks/queue/requeue/<taskType>
-        Returns workflow instance id
-    """
-
-    path = "/api/tasks/queue/requeue/" + taskType
-    response, responseData = httpPost(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def getTaskTypeQueueSizes(body):
-    """Create Workflow definition of metadata passed in
-        Will invoke POST request with format http://<ip>:<port>/api/tasks/queue/sizes
-    """
-
-    path = "/api/tasks/queue/sizes"
-    response, responseData = httpPost(path, body)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
+# Event Services #
+@command('getAllEventHandlers')
+def getAllEventHandlersCommand(args):
+    return client.getAllEventHandlers()
+
+@command('getEventHandler',
+         argument('event', help='Event Name'),
+         argument('--activeOnly', choices=['true','false'], help='Query only if active {true | false} (default == true)'))
+def getEventHandlerCommand(args):
+    return client.getEventHandler(args.event, **optional(args, 'activeOnly'))
+
+@command('createEventHandler',
+         argument('body', help='Event Handler definition in JSON'))
+def createEventHandlerCommand(args):
+    return client.createEventHandler(args.body)
+
+@command('modifyEventHandler',
+         argument('body', help='Event Handler definition in JSON'))
+def modifyEventHandlerCommand(args):
+    return client.modifyEventHandler(args.body)
+
+@command('deleteEventHandler',
+         argument('name', help='Event Name'))
+def deleteEventHandlerCommand(args):
+    return client.deleteEventHandler(args.name)
+
+@command('getEventExecutions',
+         argument('eventHandlerName', help='Event Handler Name'),
+         argument('eventName', help='Event Name'),
+         argument('messageId', help='Message Id'),
+         argument('--max', type=positive_int, help='Max number to query (Positive integer value, default == 100)'))
+def getEventExecutionsCommand(args):
+    return client.getEventExecutions(args.eventHandlerName, args.eventName, args.messageId, **optional(args, 'max'))
+
+@command('getRegisteredQueues',
+         argument('--verbosity', choices=['true','false'], help="Verbosity {true | false} (default == false)"))
+def getRegisteredQueuesCommand(args):
+    return client.getRegisteredQueues(**optional(args, 'verbosity'))
+
+@command('getRegisteredQueueProviders')
+def getRegisteredQueueProvidersCommand(args):
+    return client.getRegisteredQueueProviders()
+
+def selectEventHandlers(handlers, names=None, event=None):
+    """The handlers (dicts) named in names (all if None) and listening to event (any if None)"""
+
+    if names != None:
+        unknown = set(names) - set(handler.get("name") for handler in handlers)
+        if unknown:
+            raise ValueError("Unknown event handlers: " + ", ".join(sorted(unknown)))
+        handlers = [handler for handler in handlers if handler.get("name") in names]
+    if event != None:
+        handlers = [handler for handler in handlers if handler.get("event") == event]
+    return handlers
+
+@command('inspectEventHandlers',
+         argument('--event', help='Only the handlers of this event'),
+         argument('--activeOnly', action='store_true', help='Only the active handlers'))
+def inspectEventHandlersCommand(args):
+    client.logRequests = False
+
+    records = selectEventHandlers(client.inspectEventHandlers(), event=args.event)
+    if args.activeOnly:
+        records = [record for record in records if record["active"]]
+    writeRecords(records)
+
+@command('scanEventExecutions',
+         argument('messageId', nargs='*', help='Message Ids'),
+         argument('--ids', help='File of message ids, one per line (- for stdin)'),
+         argument('--handler', action='append', help='Event Handler to scan the messages of (may be repeated, default == every handler)'),
+         argument('--event', help='Only scan the handlers of this event'),
+         argument('--concurrency', type=positive_int, default=16, help='Number of concurrent requests (Positive integer value, default == 16)'),
+         argument('--max', type=positive_int, default=100, help='Executions first asked for per message, grown while responses come back full (Positive integer value, default == 100)'),
+         argument('--maxExecutions', type=positive_int, default=10000, help='Max executions read per message and handler, the records of messages with more are marked truncated (Positive integer value, default == 10000)'),
+         argument('--output', help='File to write one execution record per line to (default == stdout)'))
+def scanEventExecutionsCommand(args):
+    if bool(args.messageId) == (args.ids != None):
+        getCommandParser('scanEventExecutions').error("message ids or --ids are required, not both")
+    client.logRequests = False
+
+    try:
+        handlers = selectEventHandlers(client.fetchEventHandlers(), args.handler, args.event)
+    except (RuntimeError, ValueError) as e:
+        getCommandParser('scanEventExecutions').error(str(e))
+    if not handlers:
+        getCommandParser('scanEventExecutions').error("no event handler to scan")
+
+    messageIds = args.messageId
+    if args.ids != None:
+        # Same format as workflow id files: one per line, blank lines and # comments skipped
+        messageIds = client.readWorkflowIds(sys.stdin if args.ids == '-' else open(args.ids))
+
+    outputStream = sys.stdout if args.output == None else open(args.output, 'w')
+    counts = client.EventExecutionCounts()
+    messages = client.eventMessages(messageIds, handlers)
+    for record in client.scanEventExecutions(messages, concurrency=args.concurrency, max=args.max, maxLimit=args.maxExecutions):
+        counts.add(record)
+        outputStream.write(json.dumps(record) + "\n")
+    outputStream.flush()
+    sys.stderr.write(counts.summary())
+    if counts.truncated or any(counts.counts[handler]["ERROR"] for handler in counts.counts):
+        sys.exit(1)
 
-    return responseJSON
 
-def deleteTaskFromQueue(taskType, taskId):
-    """Delete Task of taskType with taskId from queue
-        Will invoke DELETE request with format http://<ip>:<port>/api/tasks/queue/<tasktype>/<taskId>
-    """
+# Metadata Management #
+@command('getAllTaskMetadata')
+def getAllTaskMetadataCommand(args):
+    return client.getAllTaskMetadata()
+
+@command('createTaskMetadata',
+         argument('metadata', help='Task Metadata definition(s) in JSON array'))
+def createTaskMetadataCommand(args):
+    return client.createTaskMetadata(args.metadata)
+
+@command('modifyTaskMetadata',
+         argument('metadata', help='Task Metadata definition in JSON'))
+def modifyTaskMetadataCommand(args):
+    return client.modifyTaskMetadata(args.metadata)
+
+@command('deleteTaskMetadata',
+         argument('taskType', help='Task Type (Name)'))
+def deleteTaskMetadataCommand(args):
+    return client.deleteTaskMetadata(args.taskType)
+
+@command('getTaskMetadata',
+         argument('taskType', help='Task Type (Name)'))
+def getTaskMetadataCommand(args):
+    return client.getTaskMetadata(args.taskType)
+
+@command('getAllWorkflowMetadata')
+def getAllWorkflowMetadataCommand(args):
+    return client.getAllWorkflowMetadata()
+
+@command('createWorkflowMetadata',
+         argument('metadata', help='Workflow Metadata definition in JSON'))
+def createWorkflowMetadataCommand(args):
+    return client.createWorkflowMetadata(args.metadata)
+
+@command('modifyWorkflowMetadata',
+         argument('metadata', help='Workflow Metadata definition in JSON'))
+def modifyWorkflowMetadataCommand(args):
+    return client.modifyWorkflowMetadata(args.metadata)
+
+@command('getWorkflowMetadata',
+         argument('name', help='Workflow name'))
+def getWorkflowMetadataCommand(args):
+    return client.getWorkflowMetadata(args.name)
+
+@command('syncMetadata',
+         argument('directory', help='Directory of task and workflow definitions (.json files, searched recursively)'),
+         argument('--batchSize', type=positive_int, default=25, help='Definitions per create request (Positive integer value, default == 25)'),
+         argument('--concurrency', type=positive_int, default=8, help='Number of concurrent requests (Positive integer value, default == 8)'),
+         argument('--dryRun', action='store_true', help='Only print the plan'),
+         argument('--noDiff', action='store_true', help='Do not print the diff of updated definitions'))
+def syncMetadataCommand(args):
+    client.logRequests = False
+    try:
+        pushed, failed = client.syncMetadata(args.directory, batchSize=args.batchSize, concurrency=args.concurrency, dryRun=args.dryRun, showDiff=not args.noDiff)
+    except ValueError as e:
+        getCommandParser('syncMetadata').error(str(e))
+    except RuntimeError as e:
+        # Reading the metadata of Conductor Server failed, nothing was pushed
+        sys.stderr.write("syncMetadata failed: " + str(e) + "\n")
+        sys.exit(1)
+    if not args.dryRun:
+        sys.stderr.write("Pushed " + str(pushed) + " definitions, " + str(failed) + " failed\n")
+    if failed:
+        sys.exit(1)
 
-    path = "/api/tasks/queue/" + taskType + "/" + taskId
-    response, responseData = httpDelete(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
 
-    return responseJSON
+# Admin #
+@command('getConfiguration')
+def getConfigurationCommand(args):
+    return client.getConfiguration()
+
+@command('sweepWorkflow',
+         argument('workflowId', help='Workflow Instance Id'))
+def sweepWorkflowCommand(args):
+    return client.sweepWorkflow(args.workflowId)
+
+@command('getPendingTasks',
+         argument('taskType', help='Task Type (Name)'),
+         argument('--start', type=positive_int, help='Start time (Positive integer value)'),
+         argument('--count', type=positive_int, help='Query count (Positive integer value, default == 100)'),
+         argument('--all', action='store_true', help='Follow every page and print one task per line (NDJSON), --count being the page size'),
+         argument('--prefetch', type=positive_int, default=1, help='Pages fetched in parallel ahead of the current one with --all (Positive integer value, default == 1)'))
+def getPendingTasksCommand(args):
+    if args.all:
+        client.logRequests = False
+        return writeRecords(client.iterPendingTasks(args.taskType, start=args.start or 0, pageSize=args.count or 100, prefetch=args.prefetch))
+    return client.getPendingTasks(args.taskType, start=args.start, **optional(args, 'count'))
+
+
+# Task Managment #
+@command('updateTask',
+         argument('body', help='Task information in JSON'))
+def updateTaskCommand(args):
+    return client.updateTask(args.body)
+
+@command('getInProgressTask',
+         argument('taskType', help='Task Type (Name)'),
+         argument('--startKey', help='Start Key (String)'),
+         argument('--count', type=positive_int, help='Query count (Positive integer value, default == 100)'),
+         argument('--all', action='store_true', help='Follow the startKey cursor to the end and print one task per line (NDJSON), --count being the page size'))
+def getInProgressTaskCommand(args):
+    if args.all:
+        client.logRequests = False
+        return writeRecords(client.iterInProgressTasks(args.taskType, startKey=args.startKey, pageSize=args.count or 100))
+    return client.getInProgressTask(args.taskType, startKey=args.startKey, **optional(args, 'count'))
+
+@command('getInProgressTaskForWorkflowInstance',
+         argument('workflowInstanceId', help='Workflow Instance Id'),
+         argument('taskRefName', help='Task Reference Name'))
+def getInProgressTaskForWorkflowInstanceCommand(args):
+    return client.getInProgressTaskForWorkflowInstance(args.workflowInstanceId, args.taskRefName)
+
+@command('batchPollTask',
+         argument('taskType', help='Task Type (Name)'),
+         argument('--workerid', help="Id of Worker (String)"),
+         argument('--count', type=positive_int, help='Query count (Positive integer value, default == 1)'),
+         argument('--timeout', type=positive_int, help='Timeout Value (Positive integer value, default == 100)'))
+def batchPollTaskCommand(args):
+    return client.batchPollTask(args.taskType, workerid=args.workerid, **optional(args, 'count', 'timeout'))
+
+@command('pollTask',
+         argument('taskType', help='Task Type (Name)'),
+         argument('--workerid', help="Id of Worker (String)"))
+def pollTaskCommand(args):
+    return client.pollTask(args.taskType, args.workerid)
+
+@command('getTasksQueue')
+def getTasksQueueCommand(args):
+    return client.getTasksQueue()
+
+@command('getTasksQueueVerbose')
+def getTasksQueueVerboseCommand(args):
+    return client.getTasksQueueVerbose()
+
+@command('requeueAllPendingTasks')
+def requeueAllPendingTasksCommand(args):
+    return client.requeueAllPendingTasks()
+
+@command('requeuePendingTasks',
+         argument('taskType', help='Task Type (Name)'))
+def requeuePendingTasksCommand(args):
+    return client.requeuePendingTasks(args.taskType)
+
+@command('getTaskTypeQueueSizes',
+         argument('body', help='Body in JSON array'))
+def getTaskTypeQueueSizesCommand(args):
+    return client.getTaskTypeQueueSizes(args.body)
+
+@command('deleteTaskFromQueue',
+         argument('taskType', help='Task Type (Name)'),
+         argument('taskId', help='Task Instance Id'))
+def deleteTaskFromQueueCommand(args):
+    return client.deleteTaskFromQueue(args.taskType, args.taskId)
+
+@command('getTask',
+         argument('taskId', help='Task Instance Id'))
+def getTaskCommand(args):
+    return client.getTask(args.taskId)
+
+@command('ackTask',
+         argument('taskId', help='Task Instance Id'),
+         argument('--workerid', help="Id of Worker (String)"))
+def ackTaskCommand(args):
+    return client.ackTask(args.taskId, args.workerid)
+
+
+# Workflow Managment #
+@command('startDecision',
+         argument('workflowId', help='Workflow Instance Id'))
+def startDecisionCommand(args):
+    return client.startDecision(args.workflowId)
+
+@command('getRunningWorkflows',
+         argument('name', help='Workflow Name'),
+         argument('--version', type=positive_int, help='Workflow Version (Positive integer value, default == 1)'),
+         argument('--startTime', help='Start Time (Long value)'),
+         argument('--endTime', help='End Time (Long value)'))
+def getRunningWorkflowsCommand(args):
+    return client.getRunningWorkflows(args.name, startTime=args.startTime, endTime=args.endTime, **optional(args, 'version'))
+
+@command('searchWorkflows',
+         argument('--start', type=positive_int, help='Start Time (Positive integer value)'),
+         argument('--size', type=positive_int, help='Size (Positive integer value, default == 100)'),
+         argument('--sort', choices=['ASC', 'DESC'], help='Sort ascending (ASC) or descending (DESC)'),
+         argument('--freeText', help='Free Text (String value, default == *)'),
+         argument('--query', help='Query (String value)'),
+         argument('--all', action='store_true', help='Follow every page and print one workflow summary per line (NDJSON), --size being the page size'),
+         argument('--stream', action='store_true', help='Print the workflow summaries one per line (NDJSON) as they are read, without holding the response in memory'))
+def searchWorkflowsCommand(args):
+    if args.all:
+        client.logRequests = False
+        return writeRecords(client.iterSearchWorkflows(query=args.query, freeText=args.freeText or '*', sort=args.sort, start=args.start or 0, pageSize=args.size or 100))
+    if args.stream:
+        client.logRequests = False
+        return writeRecords(client.streamSearchWorkflows(start=args.start, sort=args.sort, query=args.query, **optional(args, 'size', 'freeText')))
+    return client.searchWorkflows(start=args.start, sort=args.sort, query=args.query, **optional(args, 'size', 'freeText'))
+
+@command('startWorkflow',
+         argument('name', help='Workflow Name'),
+         argument('--version', type=positive_int, help='Workflow Version (Positiive integer value, default == 1)'),
+         argument('--correlationId', help='Correlation Id (String value)'),
+         argument('--body', help='Parameters in JSON format'))
+def startWorkflowCommand(args):
+    return client.startWorkflow(args.name, version=args.version, correlationId=args.correlationId, body=args.body)
+
+@command('getWorkflowByCorrelationId',
+         argument('name', help='Workflow Name'),
+         argument('correlationId', help='Correlation Id (String value)'),
+         argument('--includeClosed', choices=['true','false'], help='Include Closed (Boolean value, default == false)'),
+         argument('--includeTasks', choices=['true','false'], help='Include Tasks (Boolean value, default == false)'))
+def getWorkflowByCorrelationIdCommand(args):
+    return client.getWorkflowByCorrelationId(args.name, args.correlationId, **optional(args, 'includeClosed', 'includeTasks'))
+
+@command('stopWorkflow',
+         argument('workflowId', help='Workflow Instance Id'),
+         argument('--reason', help='Reason of termination (String value)'))
+def stopWorkflowCommand(args):
+    return client.stopWorkflow(args.workflowId, args.reason)
+
+@command('getWorkflow',
+         argument('workflowId', help='Workflow Instance Id'),
+         argument('--includeTasks', choices=['true','false'], help='Include Tasks (Boolean value, default == true)'),
+         argument('--streamTasks', action='store_true', help='Print the tasks one per line (NDJSON) as they are read, without holding the execution in memory'))
+def getWorkflowCommand(args):
+    if args.streamTasks:
+        client.logRequests = False
+        return writeRecords(client.streamWorkflowTasks(args.workflowId))
+    return client.getWorkflow(args.workflowId, **optional(args, 'includeTasks'))
+
+@command('pauseWorkflow',
+         argument('workflowId', help='Workflow Instance Id'))
+def pauseWorkflowCommand(args):
+    return client.pauseWorkflow(args.workflowId)
+
+@command('removeWorkflow',
+         argument('workflowId', help='Workflow Instance Id'))
+def removeWorkflowCommand(args):
+    return client.removeWorkflow(args.workflowId)
+
+@command('rerunWorkflow',
+         argument('workflowId', help='Workflow Instance Id'),
+         argument('--body', help='Parameters in JSON format {"reRunFromWorkflowId":"string", "workflowInput":{}, "reRunFromTaskId":"string", "taskInput":{}, "correlationId":"string"'))
+def rerunWorkflowCommand(args):
+    return client.rerunWorkflow(args.workflowId, body=args.body)
+
+@command('restartWorkflow',
+         argument('workflowId', help='Workflow Instance Id'))
+def restartWorkflowCommand(args):
+    return client.restartWorkflow(args.workflowId)
+
+@command('resumeWorkflow',
+         argument('workflowId', help='Workflow Instance Id'))
+def resumeWorkflowCommand(args):
+    return client.resumeWorkflow(args.workflowId)
+
+@command('retryWorkflow',
+         argument('workflowId', help='Workflow Instance Id'))
+def retryWorkflowCommand(args):
+    return client.retryWorkflow(args.workflowId)
+
+@command('skipWorkflowTask',
+         argument('workflowId', help='Workflow Instance Id'),
+         argument('taskReferenceName', help='Task Reference Name'),
+         argument('--body', help='Parameters in JSON format {"taskInput":{}, "taskOutput":{}'))
+def skipWorkflowTaskCommand(args):
+    return client.skipWorkflowTask(args.workflowId, args.taskReferenceName, body=args.body)
+
+
+# Bulk Operations #
+@command('bulkStartWorkflow',
+         argument('input', nargs='?', help='File of {name, version, correlationId, input} records (default == stdin)'),
+         argument('--format', choices=['jsonl', 'csv'], help='Input format {jsonl | csv} (default == csv for *.csv files, jsonl otherwise)'),
+         argument('--workers', type=positive_int, default=16, help='Number of concurrent starts (Positive integer value, default == 16)'),
+         argument('--rate', type=positive_int, help='Max workflow starts per second (Positive integer value, default == unlimited)'),
+         argument('--output', help='File to write one result line per record to (default == stdout)'))
+def bulkStartWorkflowCommand(args):
+    client.logRequests = False
+
+    inputFormat = args.format
+    if inputFormat == None:
+        inputFormat = 'csv' if args.input != None and args.input.endswith('.csv') else 'jsonl'
+
+    inputStream = sys.stdin if args.input in (None, '-') else open(args.input)
+    outputStream = sys.stdout if args.output == None else open(args.output, 'w')
+    started, failed = client.bulkStartWorkflow(client.readWorkflowRecords(inputStream, inputFormat), workers=args.workers, rate=args.rate, output=outputStream)
+    sys.stderr.write("Started " + str(started) + " workflows, " + str(failed) + " failed\n")
+    if failed:
+        sys.exit(1)
 
-def getTask(taskId):
-    """Get Task Instance of taskId passed in
-        Will invoke GET request with format http://<ip>:<port>/api/tasks/<taskId>
-    """
 
-    path = "/api/tasks/" + taskId
-    response, responseData = httpGet(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
+@command('bulkWorkflowAction',
+         argument('action', choices=['retryWorkflow', 'restartWorkflow', 'pauseWorkflow', 'resumeWorkflow', 'stopWorkflow', 'removeWorkflow'], help='Action to apply to each workflow'),
+         argument('--query', help='Apply to every workflow matching this search query (String value)'),
+         argument('--freeText', help='Free Text of the search (String value, default == *)'),
+         argument('--ids', help='File of workflow ids, one per line (- for stdin)'),
+         argument('--reason', help='Reason of termination for stopWorkflow (String value)'),
+         argument('--concurrency', type=positive_int, default=16, help='Number of concurrent actions (Positive integer value, default == 16)'),
+         argument('--checkpoint', help='File recording the ids already processed, skipped when the command is run again'),
+         argument('--dryRun', action='store_true', help='Only list the workflows the action would be applied to'),
+         argument('--output', help='File to write one result line per workflow to (default == stdout)'))
+def bulkWorkflowActionCommand(args):
+    if (args.query == None and args.freeText == None) == (args.ids == None):
+        getCommandParser('bulkWorkflowAction').error("exactly one of --query/--freeText or --ids is required")
+    client.logRequests = False
+
+    if args.ids != None:
+        workflowIds = client.readWorkflowIds(sys.stdin if args.ids == '-' else open(args.ids))
+    else:
+        workflowIds = client.searchWorkflowIds(query=args.query, freeText=args.freeText or '*')
+        sys.stderr.write("Found " + str(len(workflowIds)) + " workflows\n")
+
+    outputStream = sys.stdout if args.output == None else open(args.output, 'w')
+    succeeded, failed = client.bulkWorkflowAction(args.action, workflowIds, concurrency=args.concurrency, reason=args.reason, dryRun=args.dryRun, checkpoint=args.checkpoint, output=outputStream, progress=sys.stderr)
+    if not args.dryRun:
+        sys.stderr.write(args.action + " succeeded for " + str(succeeded) + " workflows, failed for " + str(failed) + "\n")
+    if failed:
+        sys.exit(1)
 
-    return responseJSON
+@command('multiGetWorkflow',
+         argument('workflowId', nargs='*', help='Workflow Instance Ids'),
+         argument('--ids', help='File of workflow ids, one per line (- for stdin)'),
+         argument('--includeTasks', choices=['true','false'], default='true', help='Include Tasks (Boolean value, default == true)'),
+         argument('--tasksFor', help='Comma separated workflow statuses (e.g. FAILED,TIMED_OUT): fetch every workflow without tasks, then with tasks only when in one of these statuses'),
+         argument('--concurrency', type=positive_int, default=16, help='Number of concurrent requests (Positive integer value, default == 16)'),
+         argument('--executionCache', help='Directory caching the workflows across invocations: COMPLETED ones are never fetched again, others only when their updateTime moved'),
+         argument('--output', help='File to write one workflow per line to (default == stdout)'))
+def multiGetWorkflowCommand(args):
+    if bool(args.workflowId) == (args.ids != None):
+        getCommandParser('multiGetWorkflow').error("workflow ids or --ids are required, not both")
+    if args.executionCache != None and args.tasksFor != None:
+        getCommandParser('multiGetWorkflow').error("--tasksFor cannot be used with --executionCache")
+    client.logRequests = False
+
+    workflowIds = args.workflowId
+    if args.ids != None:
+        workflowIds = client.readWorkflowIds(sys.stdin if args.ids == '-' else open(args.ids))
+
+    needsTasks = None
+    if args.tasksFor != None:
+        statuses = set(status.strip().upper() for status in args.tasksFor.split(","))
+        needsTasks = lambda workflow: workflow.get("status") in statuses
+
+    if args.executionCache != None:
+        cache = client.ExecutionCache(directory=os.path.join(args.executionCache, client.ip + "_" + str(client.port)), concurrency=args.concurrency)
+        results = cache.getWorkflows(workflowIds, includeTasks=args.includeTasks)
+    else:
+        cache = None
+        results = client.getWorkflows(workflowIds, includeTasks=args.includeTasks, needsTasks=needsTasks, concurrency=args.concurrency)
+
+    outputStream = sys.stdout if args.output == None else open(args.output, 'w')
+    fetched = 0
+    failed = 0
+    for workflowId, workflow, error in results:
+        if error == None:
+            outputStream.write(json.dumps(workflow) + "\n")
+            fetched += 1
+        else:
+            outputStream.write(json.dumps({"workflowId": workflowId, "error": str(error)}) + "\n")
+            failed += 1
+    outputStream.flush()
+    sys.stderr.write("Fetched " + str(fetched) + " workflows, " + str(failed) + " failed\n")
+    if cache != None:
+        sys.stderr.write("Execution cache: " + str(cache.hits) + " completed hits, " + str(cache.unchanged) + " unchanged, " + str(cache.fetched) + " fetched\n")
+    if failed:
+        sys.exit(1)
 
-def ackTask(taskId, workerid=None):
-    """This method will ack a given task
-        Will invoke POST request with format http://<ip>:<port>/api/tasks/<taskId>/ack?workerid=<workerid>
-    """
-    path = "/api/tasks/" + taskId + "/ack"
-    if workerid != None:
-        path += "?workerid=" + workerid
 
-    response, responseData = httpPost(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
+# Queue Monitoring #
+@command('monitorQueues',
+         argument('taskType', nargs='*', help='Task Types (Names) to sample (default == every queue)'),
+         argument('--interval', type=positive_int, default=5, help='Seconds between samples (Positive integer value, default == 5)'),
+         argument('--samples', type=positive_int, help='Number of samples to take (Positive integer value, default == until interrupted)'),
+         argument('--format', choices=['csv', 'ndjson'], default='csv', help='Output format {csv | ndjson} (default == csv)'),
+         argument('--output', help='File to append samples to (default == stdout)'),
+         argument('--maxBytes', type=positive_int, help='Rotate the output file once it reaches this size (Positive integer value)'),
+         argument('--backupCount', type=int, default=5, help='Number of rotated output files kept (Integer value, default == 5)'))
+def monitorQueuesCommand(args):
+    client.logRequests = False
+
+    writer = client.TimeSeriesWriter(args.output, format=args.format, maxBytes=args.maxBytes, backupCount=args.backupCount)
+    try:
+        client.monitorQueues(args.taskType, writer, interval=args.interval, samples=args.samples)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        writer.close()
+
+
+# Task Workers #
+def loadHandler(handlerPath):
+    """Import a module:function handler reference"""
+
+    moduleName, functionName = handlerPath.split(":", 1)
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+    module = __import__(moduleName, fromlist=[functionName])
+    return getattr(module, functionName)
+
+@command('runWorker',
+         argument('--handler', action='append', required=True, help='Handler of a task type as taskType=module:function (may be repeated)'),
+         argument('--workerid', help="Id of Worker (String)"),
+         argument('--threads', type=positive_int, default=8, help='Number of handler threads (Positive integer value, default == 8)'),
+         argument('--batchSize', type=positive_int, help='Max tasks per poll (Positive integer value, default == threads)'),
+         argument('--timeout', type=positive_int, default=100, help='Batch poll timeout in ms (Positive integer value, default == 100)'),
+         argument('--maxPollInterval', type=positive_int, default=10, help='Max seconds between polls of an empty queue (Positive integer value, default == 10)'),
+         argument('--publishThreads', type=positive_int, default=4, help='Number of threads posting task results (Positive integer value, default == 4)'),
+         argument('--adaptive', action='store_true', help='Size and time polls from the queue depths, free threads and handler latency instead of a fixed batch'))
+def runWorkerCommand(args):
+    client.logRequests = False
+
+    worker = client.TaskWorker(workerId=args.workerid, threads=args.threads, batchSize=args.batchSize, pollTimeout=args.timeout, maxPollInterval=args.maxPollInterval, publishThreads=args.publishThreads, adaptive=args.adaptive)
+    for handler in args.handler:
+        if "=" not in handler or ":" not in handler:
+            getCommandParser('runWorker').error("--handler must be given as taskType=module:function")
+        taskType, handlerPath = handler.split("=", 1)
+        worker.register(taskType, loadHandler(handlerPath))
+    worker.run()
+    sys.stderr.write("Completed " + str(worker.completed) + " tasks, " + str(worker.failed) + " failed\n")
+
+
+# Batch Scripts #
+# Commands writing their own output (NDJSON streams, progress, summaries) and exiting with
+# their own status, which would corrupt the result lines of a script
+unscriptableCommands = frozenset(['run', 'runWorker', 'syncMetadata', 'bulkStartWorkflow', 'bulkWorkflowAction',
+                                  'multiGetWorkflow', 'monitorQueues', 'inspectEventHandlers', 'scanEventExecutions'])
+
+# Options turning a command into such a stream
+unscriptableOptions = {
+    'searchWorkflows': ('all', 'stream'),
+    'getPendingTasks': ('all',),
+    'getInProgressTask': ('all',),
+    'getWorkflow': ('streamTasks',),
+}
+
+def readScript(stream):
+    """Yield (lineNumber, name, args) for each command line of a script, skipping blanks and # comments
+        args is the parsed argparse Namespace, or the exception raised parsing the line.
+    """
+
+    lineNumber = 0
+    for line in stream:
+        lineNumber += 1
+        try:
+            words = shlex.split(line, comments=True)
+        except ValueError as e:
+            yield lineNumber, None, e
+            continue
+        if not words:
+            continue
+
+        name = words[0]
+        if name not in commands:
+            yield lineNumber, name, ValueError("Unknown command " + name)
+            continue
+        if name in unscriptableCommands:
+            yield lineNumber, name, ValueError(name + " writes its own output and cannot be run from a script")
+            continue
+        try:
+            args = getCommandParser(name).parse_args(words[1:])
+        except SystemExit:
+            yield lineNumber, name, ValueError("Invalid arguments for " + name)
+            continue
+        streamed = [option for option in unscriptableOptions.get(name, ()) if getattr(args, option)]
+        if streamed:
+            yield lineNumber, name, ValueError(name + " --" + streamed[0] + " writes its own output and cannot be run from a script")
+            continue
+        yield lineNumber, name, args
+
+def runScriptLine(line):
+    """Run one parsed script line, returning (result, HTTP status of its last request)"""
+
+    lineNumber, name, args = line
+    if isinstance(args, Exception):
+        raise args
+    try:
+        result = commands[name][1](args)
+    except SystemExit as e:
+        # Commands exit on invalid arguments, keep the other lines going
+        raise RuntimeError(name + " exited with status " + str(e.code))
+    return result, client.getLastStatus()
+
+def runNow(function, *args):
+    """Run function(*args) in the calling thread and return its outcome as a finished Future"""
+
+    future = client.Future()
+    try:
+        future.setResult(function(*args))
+    except Exception as e:
+        future.setException(e)
+    return future
+
+def scriptResult(line, future):
+    lineNumber, name, args = line
+    record = {"line": lineNumber, "command": name}
+    error = future.exception()
+    if error != None:
+        record["ok"] = False
+        record["error"] = str(error)
+        return record
+
+    result, status = future.result()
+    record["ok"] = result != None
+    record["status"] = status
+    if result == None:
+        record["error"] = "Status " + str(status) + ": " + name + " failed"
+    else:
+        try:
+            record["result"] = json.loads(result)
+        except ValueError:
+            record["result"] = result
+    return record
+
+@command('run',
+         argument('script', nargs='?', help='File of commands, one per line with the same arguments as on the command line (default == stdin)'),
+         argument('--parallel', type=positive_int, default=1, help='Number of lines run concurrently, lines must then be independent (Positive integer value, default == 1)'),
+         argument('--output', help='File to write one JSON result line per command to (default == stdout)'))
+def runScriptCommand(args):
+    client.logRequests = False
+
+    inputStream = sys.stdin if args.script in (None, '-') else open(args.script)
+    outputStream = sys.stdout if args.output == None else open(args.output, 'w')
+    lines = readScript(inputStream)
+
+    if args.parallel > 1:
+        pool = client.AsyncClient(maxConcurrency=args.parallel)
+        results = pool.imapUnordered(runScriptLine, lines)
+    else:
+        pool = None
+        results = ((line, runNow(runScriptLine, line)) for line in lines)
+
+    failed = 0
+    try:
+        for line, future in results:
+            record = scriptResult(line, future)
+            if not record["ok"]:
+                failed += 1
+            outputStream.write(json.dumps(record) + "\n")
+            outputStream.flush()
+    finally:
+        if pool != None:
+            pool.shutdown()
+
+    if failed:
+        sys.exit(1)
 
-    return responseJSON
 
 #########################################################################################
-# Workflow Management #                                                                 #
+# Main #                                                                                #
 #########################################################################################
 
-def startDecision(workflowId):
-    """Start Decision Task for a workflow with given id
-        Will invoke PUT request with format http://<ip>:<port>/api/workflow/decide/<workflowId>
-    """
-
-    path = "/api/workflow/decide/" + workflowId
-    response, responseData = httpPut(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def getRunningWorkflows(name, version=1, startTime=None, endTime=None):
-    """Retrieve all the running workflows with a given name
-        Will invoke GET request with format http://<ip>:<port>/api/workflow/running/<name>?version=<version>&startTime=<startTime>&endTime=<endTime>
-    """
-
-    parameterString = "?"
-    if startTime != None:
-        parameterString += "startTime=" + str(startTime)
-        parameterString += "&"
-
-    if endTime != None:
-        parameterString += "endTime=" + str(endTime)
-        parameterString += "&"
-
-    parameterString += "version=" + str(version)
-
-    path = "/api/workflow/running/" + name + parameterString
-    response, responseData = httpGet(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def searchWorkflows(start=None, size=100, sort=None, freeText='*', query=None):
-    """Search for workloads based on parameters
-        Will invoke GET request with format http://<ip>:<port>/api/workflow/search?start=<start>&size=<size>&sort=<sort>&freeText=<freeText>&query=<query>
-    """
-
-    parameterString = "?"
-    if start != None:
-        parameterString += "start=" + str(start)
-        parameterString += "&"
-
-    if sort != None:
-        parameterString += "sort=" + sort
-        parameterString += "&"
-
-    if query != None:
-        parameterString += "query=" + query
-        parameterString += "&"
-
-    parameterString += "size=" + str(size)
-    parameterString += "freeText=" + freeText
-
-    path = "/api/workflow/search" + parameterString
-    response, responseData = httpGet(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def startWorkflow(name, version=None, correlationId=None, body=None):
-    """Start a Conductor Workflow with given name
-        Will invoke POST request with format http://<ip>:<port>/api/workflow/<name>?version=<version>&correlationId=<correlationId>
-        Returns workflow instance id
-    """
-
-    parameterString = "?"
-    if version != None:
-        parameterString += "version=" + str(version)
-        parameterString += "&"
-
-    if correlationId != None:
-        parameterString += "sort=" + correlationId
-        parameterString += "&"
-
-    if body == None:
-        body = '{}'
-
-    path = "/api/workflow/" + name + parameterString
-    response, responseData = httpPost(path, body)
-    workflowInstanceId = None
-    
-    if response.status >= 200 and response.status < 300:
-        workflowInstanceId = responseData
-
-    return workflowInstanceId
-
-def getWorkflowByCorrelationId(name, correlationId, includeClosed='false', includeTasks='false'):
-    """Retrieve workflows with name for given correlationId
-        Will invoke GET request with format http://<ip>:<port>/api/workflow/<name>/correlated/<correlationId>?includeClosed=<includeClosed>&includeTasks=<includeTasks>
-    """
-
-    parameterString = "?includeClosed=" + includeClosed
-    parameterString += "&includeTasks=" + includeTasks
-
-    path = "/api/workflow/" + name + "/correlated/" + correlationId + parameterString
-    response, responseData = httpGet(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def stopWorkflow(workflowId, reason=None):
-    """Terminate/Stope Workflow of <workflowId> passed in
-        Will invoke DELETE request with format http://<ip>:<port>/api/workflow/<workflowId>?reason=<reason>
-    """
-
-    path = "/api/workflow/" + workflowId
-
-    if reason != None:
-        path += "?reason=" + reason
-
-    response, responseData = httpDelete(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def getWorkflow(workflowId, includeTasks='true'):
-    """Get a Conductor Workflow Instance information with given workflowId
-        Will invoke GET request with format http://<ip>:<port>/api/workflow/<workflowId>?includeTasks=<includeTasks>
-    """
+def main():
+    parser = argparse.ArgumentParser(description="Execute Swagger API to Conductor Server.", add_help=False)
+    parser.add_argument('--ip', help='IP Address of Conductor Server')
+    parser.add_argument('--port', help='Port of Conductor Server')
+    parser.add_argument('--servers', help='Comma separated host:port list of Conductor Server nodes to spread requests over, instead of --ip/--port')
+    parser.add_argument('--selection', choices=['roundrobin','latency'], help='How a node is picked among --servers: roundrobin (default) or lowest observed latency')
+    parser.add_argument('--healthCheckInterval', type=int, help='Seconds between health checks of the --servers nodes, 0 to disable (default == 5)')
+    parser.add_argument('--requestTimeout', type=float, help='Seconds to wait to connect to or hear from Conductor Server before giving up (default == no timeout)')
+    parser.add_argument('--retries', type=positive_int, help='Max tries of a request failing with a connection error or overload status; POSTs that may have been processed are never retried (Positive integer value, default == 4)')
+    parser.add_argument('--retryDelay', type=float, help='Base of the exponential backoff between tries, in seconds (default == 0.2)')
+    parser.add_argument('--circuitThreshold', type=int, help='Consecutive failures of an endpoint after which its requests fail fast, 0 to disable (default == 5)')
+    parser.add_argument('--circuitResetTimeout', type=float, help='Seconds before a failing endpoint gets a trial request again (default == 10)')
+    parser.add_argument('--poolSize', type=positive_int, help='Max number of keep-alive connections to Conductor Server (Positive integer value, default == 10)')
+    parser.add_argument('--poolIdleTimeout', type=positive_int, help='Seconds before an idle keep-alive connection is closed (Positive integer value, default == 30)')
+    parser.add_argument('--noCache', '--no-cache', dest='noCache', action='store_true', help='Bypass the metadata cache and always query Conductor Server')
+    parser.add_argument('--cacheDir', help='Directory persisting the metadata cache across invocations (default == in memory only)')
+    parser.add_argument('--cacheTTL', type=positive_int, help='Seconds a cached metadata definition stays valid (Positive integer value, default == 300)')
+    parser.add_argument('--timing', action='store_true', help='Print p50/p95/p99 request timings per endpoint to stderr on exit')
+    parser.add_argument('--metricsFile', help='File to write request metrics to in Prometheus text format, every 15 seconds and on exit')
+    parser.add_argument('--noCompression', action='store_true', help='Do not ask Conductor Server for gzip/deflate compressed responses')
+    parser.add_argument('--gzipUploads', action='store_true', help='gzip request bodies of 1KB or more (the server must accept Content-Encoding: gzip)')
+    parser.add_argument('--print', dest='printMode', choices=client.outputModes, help='Output of requests and responses: verbose (default), quiet, raw bodies, ndjson envelopes with status and timing, or a summary line per request')
+    parser.add_argument('--printFile', help='File to write the output of requests and responses to instead of stdout')
+    parser.add_argument('command',
+                        nargs="?",
+                        choices=list(commands),
+                        help="Command to execute",
+                        )
+    parser.add_argument('-h', '--help', action='store_true')
+    args, sub_args = parser.parse_known_args()
+
+    if len(sys.argv) < 2:
+        print(parser.format_help())
+        sys.exit(1)
 
-    path = "/api/workflow/" + workflowId + "?includeTasks=" + includeTasks
-    response, responseData = httpGet(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
+    # Manually handle help
+    if args.help:
+        # If no subcommand was specified, give general help
+        if args.command is None:
+            print(parser.format_help())
+            sys.exit(1)
+        # Otherwise pass the help option on to the subcommand
+        sub_args.append('--help')
 
-    return responseJSON
+    if args.command is None:
+        print(parser.format_help())
+        sys.exit(1)
 
-def pauseWorkflow(workflowId):
-    """Pause a Conductor Workflow Instance information with given workflowId
-        Will invoke PUT request with format http://<ip>:<port>/api/workflow/<workflowId>/pause
-    """
+    if args.ip is not None:
+        client.ip = args.ip
 
-    path = "/api/workflow/" + workflowId + "/pause"
-    response, responseData = httpPut(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
+    if args.port is not None:
+        client.port = args.port
 
-    return responseJSON
+    if args.servers is not None:
+        client.servers = [server.strip() for server in args.servers.split(",") if server.strip()]
+        client.ip, client.port = client.servers[0].rsplit(":", 1)
 
-def removeWorkflow(workflowId):
-    """Remove a Conductor Workflow Instance information with given workflowId
-        Will invoke DELETE request with format http://<ip>:<port>/api/workflow/<workflowId>/remove
-    """
+    if args.selection is not None:
+        client.serverSelection = args.selection
 
-    path = "/api/workflow/" + workflowId + "/remove"
-    response, responseData = httpDelete(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
+    if args.healthCheckInterval is not None:
+        client.healthCheckInterval = args.healthCheckInterval
 
-    return responseJSON
+    if args.requestTimeout is not None:
+        client.requestTimeout = args.requestTimeout
 
-def rerunWorkflow(workflowId, body=None):
-    """Rerun a Conductor Workflow from a specific task (passed in body)
-        Will invoke POST request with format http://<ip>:<port>/api/workflow/<workflowId>/rerun
-        Returns workflow instance id
-    """
-    if body == None:
-        body = '{}'
-
-    path = "/api/workflow/" + workflowId + "/rerun"
-    response, responseData = httpPost(path, body)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
-
-    return responseJSON
-
-def restartWorkflow(workflowId):
-    """Restart a completed Conductor Workflow
-        Will invoke POST request with format http://<ip>:<port>/api/workflow/<workflowId>/restart
-        Returns workflow instance id
-    """
+    if args.retries is not None:
+        client.retryAttempts = args.retries
 
-    path = "/api/workflow/" + workflowId + "/restart"
-    response, responseData = httpPost(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
+    if args.retryDelay is not None:
+        client.retryBaseDelay = args.retryDelay
 
-    return responseJSON
+    if args.circuitThreshold is not None:
+        client.circuitThreshold = args.circuitThreshold
 
-def resumeWorkflow(workflowId):
-    """Resume a Conductor Workflow Instance information with given workflowId
-        Will invoke PUT request with format http://<ip>:<port>/api/workflow/<workflowId>/resume
-    """
+    if args.circuitResetTimeout is not None:
+        client.circuitResetTimeout = args.circuitResetTimeout
 
-    path = "/api/workflow/" + workflowId + "/resume"
-    response, responseData = httpPut(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
+    if args.poolSize is not None:
+        client.poolMaxSize = args.poolSize
 
-    return responseJSON
+    if args.poolIdleTimeout is not None:
+        client.poolIdleTimeout = args.poolIdleTimeout
 
-def retryWorkflow(workflowId):
-    """Retries the last failed task of a Conductor Workflow
-        Will invoke POST request with format http://<ip>:<port>/api/workflow/<workflowId>/retry
-        Returns workflow instance id
-    """
+    if args.noCache:
+        client.useMetadataCache = False
 
-    path = "/api/workflow/" + workflowId + "/retry"
-    response, responseData = httpPost(path)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
+    if args.cacheDir is not None:
+        client.metadataCacheDir = args.cacheDir
 
-    return responseJSON
+    if args.cacheTTL is not None:
+        client.metadataCacheTTL = args.cacheTTL
 
-def skipWorkflowTask(workflowId, taskReferenceName, body=None):
-    """Skip a given task from a current running Conductor Workflow
-        Will invoke PUT request with format http://<ip>:<port>/api/workflow/<workflowId>/skiptask/<taskReferenceName>
-        Returns workflow instance id
-    """
-    if body == None:
-        body = '{}'
+    if args.noCompression:
+        client.acceptCompression = False
 
-    path = "/api/workflow/" + workflowId + "/skiptask/" + taskReferenceName
-    response, responseData = httpPut(path, body)
-    responseJSON = None
-    
-    if response.status >= 200 and response.status < 300:
-        responseJSON = responseData
+    if args.gzipUploads:
+        client.compressUploads = True
 
-    return responseJSON
+    if args.printMode is not None:
+        client.outputMode = args.printMode
 
+    if args.printFile is not None:
+        client.outputFile = open(args.printFile, "w")
 
-#########################################################################################
-# Argument Parsing #                                                                    #
-#########################################################################################
+    if args.metricsFile is not None:
+        client.exportMetricsPeriodically(args.metricsFile)
 
-def positive_int(value):
-    ivalue = int(value)
-    if ivalue <= 0:
-         raise argparse.ArgumentTypeError("%s is not a valid positive integer value" % value)
-    return ivalue
-
-parser = argparse.ArgumentParser(description="Execute Swagger API to Conductor Server.", add_help=False)
-parser.add_argument('--ip', help='IP Address of Conductor Server')
-parser.add_argument('--port', help='Port of Conductor Server')
-parser.add_argument('command',
-                    nargs="?",
-                    choices=['getAllEventHandlers', 'getEventHandler', 'createEventHandler', 'modifyEventHandler', 'deleteEventHandler', 'getEventExecutions', 'getRegisteredQueues', 'getRegisteredQueueProviders',
-                    'getAllTaskMetadata', 'createTaskMetadata', 'modifyTaskMetadata', 'deleteTaskMetadata', 'getTaskMetadata', 'getAllWorkflowMetadata', 'createWorkflowMetadata', 'modifyWorkflowMetadata', 'getWorkflowMetadata',
-                    'getConfiguration', 'sweepWorkflow', 'getPendingTasks',
-                    'updateTask', 'getInProgressTask', 'getInProgressTaskForWorkflowInstance', 'batchPollTask', 'pollTask', 'getTasksQueue', 'getTasksQueueVerbose', 'requeueAllPendingTasks', 'requeuePendingTasks', 'getTaskTypeQueueSizes', 'deleteTaskFromQueue', 'getTask', 'ackTask',
-                    'startDecision', 'getRunningWorkflows', 'searchWorkflows', 'startWorkflow', 'getWorkflowByCorrelationId', 'stopWorkflow', 'getWorkflow', 'pauseWorkflow', 'removeWorkflow', 'rerunWorkflow', 'restartWorkflow', 'resumeWorkflow', 'retryWorkflow', 'skipWorkflowTask'],
-                    help="Command to execute",
-                    )
-parser.add_argument('-h', '--help', action='store_true')
-args, sub_args = parser.parse_known_args()
-
-if len(sys.argv) < 2:
-    print(parser.format_help())
-    exit(1)
-
-# Manually handle help
-if args.help:
-    # If no subcommand was specified, give general help
-    if args.command is None: 
-        print(parser.format_help())
+    try:
+        runCommand(args.command, sub_args)
+    except (client.CircuitOpenError, httplib.HTTPException, socket.error) as e:
+        sys.stderr.write("Request to Conductor Server failed: " + (str(e) or e.__class__.__name__) + "\n")
         sys.exit(1)
-    # Otherwise pass the help option on to the subcommand
-    sub_args.append('--help')
-
-if args.ip is not None:
-    ip = args.ip
-
-if args.port is not None:
-    port = args.port
-
-parser = argparse.ArgumentParser(prog="%s %s" % (os.path.basename(sys.argv[0]), args.command))
-
-# Event Services #
-if args.command == 'getAllEventHandlers':
-    args = parser.parse_args(sub_args)
-    getAllEventHandlers()
-
-elif args.command == 'getEventHandler':
-    parser.add_argument('event', help='Event Name')
-    parser.add_argument('--activeOnly', choices=['true','false'], help='Query only if active {true | false} (default == true)')
-    args = parser.parse_args(sub_args)
-    if args.activeOnly == None:
-        getEventHandler(args.event)
-    else:
-        getEventHandler(args.event, args.activeOnly)
-
-elif args.command == 'createEventHandler':
-    parser.add_argument('body', help='Event Handler definition in JSON')
-    args = parser.parse_args(sub_args)
-    createEventHandler(args.body)
-
-elif args.command == 'modifyEventHandler':
-    parser.add_argument('body', help='Event Handler definition in JSON')
-    args = parser.parse_args(sub_args)
-    modifyEventHandler(args.body)
-
-elif args.command == 'deleteEventHandler':
-    parser.add_argument('name', help='Event Name')
-    args = parser.parse_args(sub_args)
-    deleteEventHandler(args.name)
-
-elif args.command == 'getEventExecutions':
-    parser.add_argument('eventHandlerName', help='Event Handler Name')
-    parser.add_argument('eventName', help='Event Name')
-    parser.add_argument('messageId', help='Message Id')
-    parser.add_argument('--max', type=positive_int, help='Max number to query (Positive integer value, default == 100)')
-    args = parser.parse_args(sub_args)
-    if args.max == None:
-        getEventExecutions(args.eventHandlerName, args.eventName, args.messageId)
-    else:
-        getEventExecutions(args.eventHandlerName, args.eventName, args.messageId, args.max)
-
-elif args.command == 'getRegisteredQueues':
-    parser.add_argument('--verbosity', choices=['true','false'], help="Verbosity {true | false} (default == false)")
-    args = parser.parse_args(sub_args)
-    if args.verbosity == None:
-        getRegisteredQueues()
-    else:
-        getRegisteredQueues(args.verbosity)
-
-elif args.command == 'getRegisteredQueueProviders':
-    args = parser.parse_args(sub_args)
-    getRegisteredQueueProviders()
-
-
-# Metadata Management #
-elif args.command == 'getAllTaskMetadata':
-    args = parser.parse_args(sub_args)
-    getAllTaskMetadata()
-
-elif args.command == 'createTaskMetadata':
-    parser.add_argument('metadata', help='Task Metadata definition(s) in JSON array')
-    args = parser.parse_args(sub_args)
-    createTaskMetadata(args.metadata)
-
-elif args.command == 'modifyTaskMetadata':
-    parser.add_argument('metadata', help='Task Metadata definition in JSON')
-    args = parser.parse_args(sub_args)
-    modifyTaskMetadata(args.metadata)
-
-elif args.command == 'deleteTaskMetadata':
-    parser.add_argument('taskType', help='Task Type (Name)')
-    args = parser.parse_args(sub_args)
-    deleteTaskMetadata(args.taskType)
-
-elif args.command == 'getTaskMetadata':
-    parser.add_argument('taskType', help='Task Type (Name)')
-    args = parser.parse_args(sub_args)
-    getTaskMetadata(args.taskType)
-
-elif args.command == 'getAllWorkflowMetadata':
-    args = parser.parse_args(sub_args)
-    getAllWorkflowMetadata()
-
-elif args.command == 'createWorkflowMetadata':
-    parser.add_argument('metadata', help='Workflow Metadata definition in JSON')
-    args = parser.parse_args(sub_args)
-    createWorkflowMetadata(args.metadata)
-
-elif args.command == 'modifyWorkflowMetadata':
-    parser.add_argument('metadata', help='Workflow Metadata definition in JSON')
-    args = parser.parse_args(sub_args)
-    modifyWorkflowMetadata(args.metadata)
-
-elif args.command == 'getWorkflowMetadata':
-    parser.add_argument('name', help='Workflow name')
-    args = parser.parse_args(sub_args)
-    getWorkflowMetadata(args.name)
-
-
-# Admin #
-elif args.command == 'getConfiguration':
-    args = parser.parse_args(sub_args)
-    getConfiguration()
-
-elif args.command == 'sweepWorkflow':
-    parser.add_argument('workflowId', help='Workflow Instance Id')
-    args = parser.parse_args(sub_args)
-    sweepWorkflow(args.workflowId)
-
-elif args.command == 'getPendingTasks':
-    parser.add_argument('taskType', help='Task Type (Name)')
-    parser.add_argument('--start', type=positive_int, help='Start time (Positive integer value)')
-    parser.add_argument('--count', type=positive_int, help='Query count (Positive integer value, default == 100)')
-    args = parser.parse_args(sub_args)
-    if args.count == None:
-        getPendingTasks(args.taskType, start=args.start)
-    else:
-        getPendingTasks(args.taskType, start=args.start, count=args.count)
-           
-# Task Managment #  
-elif args.command == 'updateTask':
-    parser.add_argument('body', help='Task information in JSON')
-    args = parser.parse_args(sub_args)
-    updateTask(args.body)
-
-elif args.command == 'getInProgressTask':
-    parser.add_argument('taskType', help='Task Type (Name)')
-    parser.add_argument('--startKey', help='Start Key (String)')
-    parser.add_argument('--count', type=positive_int, help='Query count (Positive integer value, default == 100)')
-    args = parser.parse_args(sub_args)
-    if args.count == None:
-        getInProgressTask(args.taskType, startKey=args.startKey)
-    else:
-        getInProgressTask(args.taskType, startKey=args.startKey, count=args.count)
-
-elif args.command == 'getInProgressTaskForWorkflowInstance':
-    parser.add_argument('workflowInstanceId', help='Workflow Instance Id')
-    parser.add_argument('taskRefName', help='Task Reference Name')
-    args = parser.parse_args(sub_args)
-    getInProgressTaskForWorkflowInstance(args.workflowInstanceId, args.taskRefName)
-
-elif args.command == 'batchPollTask':
-    parser.add_argument('taskType', help='Task Type (Name)')
-    parser.add_argument('--workerid', help="Id of Worker (String)")
-    parser.add_argument('--count', type=positive_int, help='Query count (Positive integer value, default == 1)')
-    parser.add_argument('--timeout', type=positive_int, help='Timeout Value (Positive integer value, default == 100)')
-    args = parser.parse_args(sub_args)
-    if args.count == None and args.timeout == None:
-        batchPollTask(args.taskType, workerid=args.workerid)
-    else:
-        if args.count != None and args.timeout != None:
-            batchPollTask(args.taskType, workerid=args.workerid, count=args.count, timeout=args.timeout)
-        elif args.count == None and args.timeout != None:
-            batchPollTask(args.taskType, workerid=args.workerid, timeout=args.timeout)
-        elif args.count != None and args.timeout == None:
-            batchPollTask(args.taskType, workerid=args.workerid, count=args.count)
-
-elif args.command == 'pollTask':
-    parser.add_argument('taskType', help='Task Type (Name)')
-    parser.add_argument('--workerid', help="Id of Worker (String)")
-    args = parser.parse_args(sub_args)
-    pollTask(args.taskType, args.workerid)
-
-elif args.command == 'getTasksQueue':
-    args = parser.parse_args(sub_args)
-    getTasksQueue()
-
-elif args.command == 'getTasksQueueVerbose':
-    args = parser.parse_args(sub_args)
-    getTasksQueueVerbose()
-
-elif args.command == 'requeueAllPendingTasks':
-    args = parser.parse_args(sub_args)
-    requeueAllPendingTasks()
-
-elif args.command == 'requeuePendingTasks':
-    parser.add_argument('taskType', help='Task Type (Name)')
-    args = parser.parse_args(sub_args)
-    requeuePendingTasks(args.taskType)
-
-elif args.command == 'getTaskTypeQueueSizes':
-    parser.add_argument('body', help='Body in JSON array')
-    args = parser.parse_args(sub_args)
-    getTaskTypeQueueSizes(args.body)
-
-elif args.command == 'deleteTaskFromQueue':
-    parser.add_argument('taskType', help='Task Type (Name)')
-    parser.add_argument('taskId', help='Task Instance Id')
-    args = parser.parse_args(sub_args)
-    deleteTaskFromQueue(args.taskType, args.taskId)
-
-elif args.command == 'getTask':
-    parser.add_argument('taskId', help='Task Instance Id')
-    args = parser.parse_args(sub_args)
-    getTask(args.taskId)
-
-elif args.command == 'ackTask':
-    parser.add_argument('taskId', help='Task Instance Id')
-    parser.add_argument('--workerid', help="Id of Worker (String)")
-    args = parser.parse_args(sub_args)
-    ackTask(args.taskId, args.workerid)
-
-# Workflow Managment #  
-elif args.command == 'startDecision':
-    parser.add_argument('workflowId', help='Workflow Instance Id')
-    args = parser.parse_args(sub_args)
-    startDecision(args.workflowId)
-
-elif args.command == 'getRunningWorkflows':
-    parser.add_argument('name', help='Workflow Name')
-    parser.add_argument('--version', type=positive_int, help='Workflow Version (Positive integer value, default == 1)')
-    parser.add_argument('--startTime', help='Start Time (Long value)')
-    parser.add_argument('--endTime', help='End Time (Long value)')
-    args = parser.parse_args(sub_args)
-    if args.version == None:
-        getRunningWorkflows(args.name, startTime=args.startTime, endTime=args.endTime)
-    else:
-        getRunningWorkflows(args.name, startTime=args.startTime, endTime=args.endTime, version=args.version)
-
-elif args.command == 'searchWorkflows':
-    parser.add_argument('--start', type=positive_int, help='Start Time (Positive integer value)')    
-    parser.add_argument('--size', type=positive_int, help='Size (Positive integer value, default == 100)')
-    parser.add_argument('--sort', choices=['ASC', 'DESC'], help='Sort ascending (ASC) or descending (DESC)')
-    parser.add_argument('--freeText', help='Free Text (String value, default == *)')
-    parser.add_argument('--query', help='Query (String value)')
-    args = parser.parse_args(sub_args)
-    if args.size == None and args.freeText == None:
-        searchWorkflows(start=args.start, sort=args.sort, query=args.query)
-    else:
-        if args.size != None and args.freeText != None:
-            searchWorkflows(start=args.start, sort=args.sort, query=args.query, size=args.size, freeText=args.freeText)
-        elif args.size == None and args.freeText != None:
-            searchWorkflows(start=args.start, sort=args.sort, query=args.query, freeText=args.freeText)
-        elif args.size != None and args.freeText == None:
-            searchWorkflows(start=args.start, sort=args.sort, query=args.query, size=args.size)
-
-elif args.command == 'startWorkflow':
-    parser.add_argument('name', help='Workflow Name')
-    parser.add_argument('--version', type=positive_int, help='Workflow Version (Positiive integer value, default == 1)')
-    parser.add_argument('--correlationId', help='Correlation Id (String value)')
-    parser.add_argument('--body', help='Parameters in JSON format')
-    args = parser.parse_args(sub_args)
-    startWorkflow(args.name, version=args.version, correlationId=args.correlationId, body=args.body)
-
-elif args.command == 'getWorkflowByCorrelationId':
-    parser.add_argument('name', help='Workflow Name')
-    parser.add_argument('correlationId', help='Correlation Id (String value)')
-    parser.add_argument('--includeClosed', choices=['true','false'], help='Include Closed (Boolean value, default == false)')
-    parser.add_argument('--includeTasks', choices=['true','false'], help='Include Tasks (Boolean value, default == false)')
-    args = parser.parse_args(sub_args)
-    if args.includeClosed == None and args.includeTasks == None:
-        getWorkflowByCorrelationId(args.name, args.correlationId)
-    else:
-        if args.includeClosed != None and args.includeTasks != None:
-            getWorkflowByCorrelationId(args.name, args.correlationId, includeClosed=args.includeClosed, includeTasks=args.includeTasks)
-        elif args.includeClosed == None and args.includeTasks != None:
-            getWorkflowByCorrelationId(args.name, args.correlationId, includeTasks=args.includeTasks)
-        elif args.includeClosed != None and args.includeTasks == None:
-            getWorkflowByCorrelationId(args.name, args.correlationId, includeClosed=args.includeClosed)
-
-elif args.command == 'stopWorkflow':
-    parser.add_argument('workflowId', help='Workflow Instance Id')
-    parser.add_argument('--reason', help='Reason of termination (String value)')
-    args = parser.parse_args(sub_args)
-    stopWorkflow(args.workflowId, args.reason)
-
-elif args.command == 'getWorkflow':
-    parser.add_argument('workflowId', help='Workflow Instance Id')
-    parser.add_argument('--includeTasks', choices=['true','false'], help='Include Tasks (Boolean value, default == true)')
-    args = parser.parse_args(sub_args)
-    if args.includeTasks == None:
-        getWorkflow(args.workflowId)
-    else:
-        getWorkflow(args.workflowId, args.includeTasks)
-
-elif args.command == 'pauseWorkflow':
-    parser.add_argument('workflowId', help='Workflow Instance Id')
-    args = parser.parse_args(sub_args)
-    pauseWorkflow(args.workflowId)
-
-elif args.command == 'removeWorkflow':
-    parser.add_argument('workflowId', help='Workflow Instance Id')
-    args = parser.parse_args(sub_args)
-    removeWorkflow(args.workflowId)
-
-elif args.command == 'rerunWorkflow':
-    parser.add_argument('workflowId', help='Workflow Instance Id')
-    parser.add_argument('--body', help='Parameters in JSON format {"reRunFromWorkflowId":"string", "workflowInput":{}, "reRunFromTaskId":"string", "taskInput":{}, "correlationId":"string"')
-    args = parser.parse_args(sub_args)
-    rerunWorkflow(args.workflowId, body=args.body)
-
-elif args.command == 'restartWorkflow':
-    parser.add_argument('workflowId', help='Workflow Instance Id')
-    args = parser.parse_args(sub_args)
-    restartWorkflow(args.workflowId)
-
-elif args.command == 'resumeWorkflow':
-    parser.add_argument('workflowId', help='Workflow Instance Id')
-    args = parser.parse_args(sub_args)
-    resumeWorkflow(args.workflowId)
-
-elif args.command == 'retryWorkflow':
-    parser.add_argument('workflowId', help='Workflow Instance Id')
-    args = parser.parse_args(sub_args)
-    retryWorkflow(args.workflowId)
-
-elif args.command == 'skipWorkflowTask':
-    parser.add_argument('workflowId', help='Workflow Instance Id')
-    parser.add_argument('taskReferenceName', help='Task Reference Name')
-    parser.add_argument('--body', help='Parameters in JSON format {"taskInput":{}, "taskOutput":{}')
-    args = parser.parse_args(sub_args)
-    skipWorkflowTask(args.workflowId, args.taskReferenceName, body=args.body)
-
+    finally:
+        client.closeServerEndpoints()
+        if client.outputFile is not None:
+            client.outputFile.close()
+        if args.timing:
+            sys.stderr.write(client.requestMetrics.summary())
+        if args.metricsFile is not None:
+            client.requestMetrics.writePrometheus(args.metricsFile)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,3945 @@
+import sys
+import httplib, urllib
+import json
+import Queue
+import bisect
+import collections
+import difflib
+import email.utils
+import hashlib
+import os
+import random
+import re
+import select
+import socket
+import string
+import threading
+import time
+import weakref
+import zlib
+
+###########
+# Globals #
+###########
+
+global ip
+ip = "localhost"
+
+global port
+port = "8080"
+
+global poolMaxSize
+poolMaxSize = 10
+
+global poolIdleTimeout
+poolIdleTimeout = 30
+
+global requestTimeout
+requestTimeout = None
+
+global servers
+servers = None
+
+global serverSelection
+serverSelection = "roundrobin"
+
+global healthCheckInterval
+healthCheckInterval = 5
+
+global retryAttempts
+retryAttempts = 4
+
+global retryBaseDelay
+retryBaseDelay = 0.2
+
+global circuitThreshold
+circuitThreshold = 5
+
+global circuitResetTimeout
+circuitResetTimeout = 10
+
+global logRequests
+logRequests = True
+
+global outputMode
+outputMode = "verbose"
+
+global outputFile
+outputFile = None
+
+global acceptCompression
+acceptCompression = True
+
+global compressUploads
+compressUploads = False
+
+global compressMinSize
+compressMinSize = 1024
+
+global useMetadataCache
+useMetadataCache = True
+
+global metadataCacheDir
+metadataCacheDir = None
+
+global metadataCacheTTL
+metadataCacheTTL = 300
+
+#########################################################################################
+
+
+#############
+# Functions #
+#############
+
+#########################################################################################
+# Logging #                                                                             #
+#########################################################################################
+
+# Output modes of logSendRequest/logResponse:
+#   verbose  URL, request body, status and response body of every request
+#   quiet    nothing
+#   raw      response bodies only
+#   ndjson   one {"method", "path", "status", "ms", "body"} JSON line per response
+#   summary  one "method path status time size" line per response
+outputModes = ("verbose", "quiet", "raw", "ndjson", "summary")
+
+outputLock = threading.Lock()
+
+def getOutput():
+    if outputFile != None:
+        return outputFile
+    return sys.stdout
+
+def logSendRequest(url, requestType, body=None):
+    """Print generic Send request to Conductor Server"""
+
+    if not logRequests or outputMode != "verbose":
+        return
+
+    with outputLock:
+        output = getOutput()
+        output.write("Sending [%s] request to Conductor Server (%s):\n" % (requestType, url))
+        if body != None:
+            output.write("Body:\n")
+            output.write(body)
+            output.write("\n")
+        output.write("\n\n")
+
+
+def ndjsonBody(response, contentType=None):
+    """Serialize a response body as a single line of JSON for the ndjson output mode"""
+
+    if not response.strip():
+        return "null"
+    if contentType != None and "json" in contentType:
+        # Pretty-printed bodies would break the one line per response framing
+        try:
+            return json.dumps(json.loads(response))
+        except ValueError:
+            pass
+    return json.dumps(response)
+
+def logResponse(statusCode, response, requestType=None, path=None, elapsed=None, contentType=None):
+    """Print generic Response from Conductor Server in the selected outputMode
+        Response bodies are written as they are, except in ndjson mode where a JSON body is
+        embedded in the envelope re-serialized on a single line, any other body (or one that
+        does not parse) as a JSON string.
+    """
+
+    if not logRequests or outputMode == "quiet":
+        return
+
+    with outputLock:
+        output = getOutput()
+        if outputMode == "raw":
+            if response:
+                output.write(response)
+                output.write("\n")
+        elif outputMode == "ndjson":
+            output.write('{"method": %s, "path": %s, "status": %d, "ms": %s, "body": ' % (
+                json.dumps(requestType), json.dumps(path), statusCode, json.dumps(round((elapsed or 0) * 1000, 3))))
+            output.write(ndjsonBody(response, contentType))
+            output.write("}\n")
+        elif outputMode == "summary":
+            output.write("%s %s %d %.1fms %d bytes\n" % (requestType, path, statusCode, (elapsed or 0) * 1000, len(response)))
+        else:
+            output.write("Received response from Conductor Server (%s):\n" % ip)
+            output.write("Status: %s\n" % statusCode)
+            output.write(response)
+            output.write("\n\n\n")
+
+
+def logRetry(requestType, path, reason, delay):
+    """Print that a failed request is retried after delay seconds"""
+
+    if not logRequests or outputMode == "quiet":
+        return
+
+    message = "Retrying [%s] request (%s) in %.2fs after %s\n" % (requestType, path, delay, reason)
+    if outputMode != "verbose":
+        # Keep the output of the other modes machine readable
+        sys.stderr.write(message)
+        return
+
+    with outputLock:
+        getOutput().write(message + "\n\n")
+
+def logCachedResponse(path, response):
+    """Print Response served from the local metadata cache"""
+
+    if not logRequests or outputMode == "quiet":
+        return
+
+    if outputMode != "verbose":
+        logResponse(200, response, "GET", path, 0, "application/json")
+        return
+
+    with outputLock:
+        output = getOutput()
+        output.write("Cached response for (%s):\n" % path)
+        output.write(response)
+        output.write("\n\n\n")
+
+
+#########################################################################################
+# Request Metrics #                                                                     #
+#########################################################################################
+
+class LatencyHistogram(object):
+    """HDR style histogram of non-negative integer values (e.g. microseconds or bytes)
+
+        Values below 2^precisionBits are counted exactly; larger values are counted in
+        2^precisionBits linear buckets per power of two, so every value is kept to within
+        a relative error of 1 / 2^precisionBits while memory only grows with the range.
+        Values are also counted exactly against the ascending bounds, if given (see
+        cumulativeCounts()).
+    """
+
+    def __init__(self, precisionBits=5, bounds=()):
+        self.precisionBits = precisionBits
+        self.bounds = list(bounds)
+        # boundCounts[i] counts the values above bounds[i - 1] and at most bounds[i]
+        self.boundCounts = [0] * len(self.bounds)
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def bucketOf(self, value):
+        """Return the lowest value of the bucket that counts value"""
+
+        shift = value.bit_length() - self.precisionBits
+        if shift <= 0:
+            return value
+        return (value >> shift) << shift
+
+    def bucketWidth(self, bucket):
+        return 1 << max(0, bucket.bit_length() - self.precisionBits)
+
+    def record(self, value):
+        value = max(0, value)
+        index = bisect.bisect_left(self.bounds, value)
+        if index < len(self.bounds):
+            self.boundCounts[index] += 1
+        value = int(value)
+        bucket = self.bucketOf(value)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percent):
+        """Return the highest value equivalent to the given percentile (0 if nothing was recorded)"""
+
+        if self.count == 0:
+            return 0
+        rank = max(1, int(round(percent / 100.0 * self.count)))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.max, bucket + self.bucketWidth(bucket) - 1)
+        return self.max
+
+    def cumulativeCounts(self):
+        """Return how many recorded values were at most each of bounds"""
+
+        counts = []
+        seen = 0
+        for count in self.boundCounts:
+            seen += count
+            counts.append(seen)
+        return counts
+
+
+# Endpoint templates the request paths are grouped by, most specific first
+endpointTemplates = [
+    ("POST", "/api/workflow/{name}"),
+    (None, "/api/event/executions/{eventHandlerName}/{eventName}/{messageId}"),
+    (None, "/api/event/queues/providers"),
+    (None, "/api/event/queues"),
+    (None, "/api/event/{name}"),
+    (None, "/api/event"),
+    (None, "/api/metadata/taskdefs/{taskType}"),
+    (None, "/api/metadata/taskdefs"),
+    (None, "/api/metadata/workflow/{name}"),
+    (None, "/api/metadata/workflow"),
+    (None, "/api/admin/config"),
+    (None, "/api/admin/sweep/requeue/{workflowId}"),
+    (None, "/api/admin/task/{taskType}"),
+    (None, "/api/tasks/in_progress/{workflowId}/{taskRefName}"),
+    (None, "/api/tasks/in_progress/{taskType}"),
+    (None, "/api/tasks/poll/batch/{taskType}"),
+    (None, "/api/tasks/poll/{taskType}"),
+    (None, "/api/tasks/queue/all/verbose"),
+    (None, "/api/tasks/queue/all"),
+    (None, "/api/tasks/queue/requeue/{taskType}"),
+    (None, "/api/tasks/queue/requeue"),
+    (None, "/api/tasks/queue/sizes"),
+    (None, "/api/tasks/queue/{taskType}/{taskId}"),
+    (None, "/api/tasks/{taskId}/ack"),
+    (None, "/api/tasks/{taskId}"),
+    (None, "/api/tasks"),
+    (None, "/api/workflow/decide/{workflowId}"),
+    (None, "/api/workflow/running/{name}"),
+    (None, "/api/workflow/search"),
+    (None, "/api/workflow/{name}/correlated/{correlationId}"),
+    (None, "/api/workflow/{workflowId}/skiptask/{taskReferenceName}"),
+    (None, "/api/workflow/{workflowId}/{action}"),
+    (None, "/api/workflow/{workflowId}"),
+]
+endpointPatterns = [(method, re.compile("^" + re.sub(r"\{[^}]+\}", "[^/]+", template) + "$"), template)
+                    for method, template in endpointTemplates]
+
+def endpointTemplate(requestType, path):
+    """Return the endpoint template of a request path, e.g. /api/workflow/{workflowId}"""
+
+    path = path.split("?", 1)[0]
+    for method, pattern, template in endpointPatterns:
+        if (method == None or method == requestType) and pattern.match(path):
+            if template.endswith("/{action}"):
+                return template.replace("{action}", path.rsplit("/", 1)[1])
+            return template
+    return path
+
+
+class EndpointMetrics(object):
+    """Request timings of one method and endpoint template"""
+
+    def __init__(self):
+        # Times are recorded in microseconds, counted exactly against the exported bounds
+        microsecondsBounds = [bound * 1000000.0 for bound in RequestMetrics.secondsBounds]
+        self.connect = LatencyHistogram(bounds=microsecondsBounds)
+        self.firstByte = LatencyHistogram(bounds=microsecondsBounds)
+        self.total = LatencyHistogram(bounds=microsecondsBounds)
+        self.size = LatencyHistogram(bounds=RequestMetrics.bytesBounds)
+        self.errors = 0
+
+
+class RequestMetrics(object):
+    """Thread-safe per endpoint histograms of connect time, time to first byte, total time and response size"""
+
+    # Bucket bounds of the exported Prometheus histograms
+    secondsBounds = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+    bytesBounds = [256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864]
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def endpoint(self, requestType, template):
+        key = (requestType, template)
+        metrics = self.endpoints.get(key)
+        if metrics == None:
+            metrics = self.endpoints.setdefault(key, EndpointMetrics())
+        return metrics
+
+    def record(self, requestType, path, connectTime, firstByteTime, totalTime, size):
+        """Record a completed request, times in seconds and size in bytes"""
+
+        template = endpointTemplate(requestType, path)
+        with self.lock:
+            metrics = self.endpoint(requestType, template)
+            metrics.connect.record(connectTime * 1000000)
+            metrics.firstByte.record(firstByteTime * 1000000)
+            metrics.total.record(totalTime * 1000000)
+            metrics.size.record(size)
+
+    def recordError(self, requestType, path):
+        template = endpointTemplate(requestType, path)
+        with self.lock:
+            self.endpoint(requestType, template).errors += 1
+
+    def summary(self):
+        """Return a p50/p95/p99 table of the total request time per endpoint"""
+
+        lines = ["%-8s %-60s %7s %6s %9s %9s %9s %9s %10s" % ("Method", "Endpoint", "Count", "Errors", "p50 ms", "p95 ms", "p99 ms", "TTFB ms", "Avg bytes")]
+        with self.lock:
+            for (requestType, template), metrics in sorted(self.endpoints.items()):
+                total = metrics.total
+                averageFirstByte = metrics.firstByte.total / 1000.0 / total.count if total.count else 0
+                averageSize = metrics.size.total / total.count if total.count else 0
+                lines.append("%-8s %-60s %7d %6d %9.2f %9.2f %9.2f %9.2f %10d" % (
+                    requestType, template, total.count, metrics.errors,
+                    total.percentile(50) / 1000.0, total.percentile(95) / 1000.0, total.percentile(99) / 1000.0,
+                    averageFirstByte, averageSize))
+        return "\n".join(lines) + "\n"
+
+    def prometheus(self):
+        """Return the metrics in the Prometheus text exposition format"""
+
+        series = [
+            ("conductor_client_request_seconds", "Total time of Conductor Server requests", "total", 1000000.0, RequestMetrics.secondsBounds),
+            ("conductor_client_first_byte_seconds", "Time to first response byte of Conductor Server requests", "firstByte", 1000000.0, RequestMetrics.secondsBounds),
+            ("conductor_client_connect_seconds", "Time spent opening connections for Conductor Server requests", "connect", 1000000.0, RequestMetrics.secondsBounds),
+            ("conductor_client_response_bytes", "Size of Conductor Server response bodies", "size", 1.0, RequestMetrics.bytesBounds),
+        ]
+        lines = []
+        with self.lock:
+            endpoints = sorted(self.endpoints.items())
+            for name, description, attribute, scale, bounds in series:
+                lines.append("# HELP " + name + " " + description)
+                lines.append("# TYPE " + name + " histogram")
+                for (requestType, template), metrics in endpoints:
+                    histogram = getattr(metrics, attribute)
+                    labels = 'method="' + requestType + '",endpoint="' + template + '"'
+                    for bound, count in zip(bounds, histogram.cumulativeCounts()):
+                        lines.append(name + "_bucket{" + labels + ',le="' + repr(bound) + '"} ' + str(count))
+                    lines.append(name + "_bucket{" + labels + ',le="+Inf"} ' + str(histogram.count))
+                    lines.append(name + "_sum{" + labels + "} " + repr(histogram.total / scale))
+                    lines.append(name + "_count{" + labels + "} " + str(histogram.count))
+
+            lines.append("# HELP conductor_client_request_errors_total Conductor Server requests that failed without a response")
+            lines.append("# TYPE conductor_client_request_errors_total counter")
+            for (requestType, template), metrics in endpoints:
+                lines.append('conductor_client_request_errors_total{method="' + requestType + '",endpoint="' + template + '"} ' + str(metrics.errors))
+        return "\n".join(lines) + "\n"
+
+    def writePrometheus(self, path):
+        """Write the Prometheus metrics to path atomically (e.g. for the node_exporter textfile collector)"""
+
+        tempFile = path + "." + str(os.getpid()) + ".tmp"
+        with open(tempFile, "w") as metricsFile:
+            metricsFile.write(self.prometheus())
+        os.rename(tempFile, path)
+
+
+requestMetrics = RequestMetrics()
+
+def exportMetricsPeriodically(path, interval=15):
+    """Rewrite the Prometheus metrics file every interval seconds on a daemon thread"""
+
+    def export():
+        while True:
+            time.sleep(interval)
+            try:
+                requestMetrics.writePrometheus(path)
+            except (IOError, OSError) as e:
+                sys.stderr.write("Writing metrics to " + path + " failed: " + str(e) + "\n")
+
+    exporter = threading.Thread(target=export, name="conductor-metrics")
+    exporter.daemon = True
+    exporter.start()
+    return exporter
+
+
+#########################################################################################
+# HTTP Helpers #                                                                        #
+#########################################################################################
+
+def connectionDropped(conn):
+    """Whether the server closed an idle kept-alive connection, which then reads as end of file"""
+
+    if conn.sock == None:
+        return True
+    try:
+        readable, writable, failed = select.select([conn.sock], [], [], 0)
+    except (select.error, socket.error, ValueError):
+        return True
+    return bool(readable)
+
+class ConnectionPool(object):
+    """Thread-safe pool of keep-alive HTTP connections to a single Conductor Server
+
+        At most maxSize connections are open at once; acquire() blocks when all of them
+        are in use. Connections left idle for longer than idleTimeout seconds are closed
+        instead of being reused, since the server has most likely dropped them already;
+        the shared pools are also swept by a daemon thread (see reapIdleConnections), so
+        a pool that goes quiet does not keep them open.
+    """
+
+    def __init__(self, host, port, maxSize=10, idleTimeout=30, timeout=None):
+        self.host = host
+        self.port = port
+        self.maxSize = maxSize
+        self.idleTimeout = idleTimeout
+        self.timeout = timeout
+        self.lock = threading.Condition()
+        self.inUse = 0
+        self.idle = []
+
+    def resize(self, maxSize):
+        """Change the max number of open connections, waking any caller blocked in acquire()"""
+
+        with self.lock:
+            self.maxSize = maxSize
+            self.lock.notify_all()
+
+    def acquire(self):
+        """Return (connection, reused) for an idle connection, or a new one if none is usable"""
+
+        with self.lock:
+            while self.inUse >= self.maxSize:
+                self.lock.wait()
+            self.inUse += 1
+            now = time.time()
+            while self.idle:
+                conn, lastUsed = self.idle.pop()
+                if now - lastUsed < self.idleTimeout and not connectionDropped(conn):
+                    return conn, True
+                conn.close()
+        return httplib.HTTPConnection(self.host, self.port, timeout=self.timeout), False
+
+    def release(self, conn, reusable=True):
+        """Hand a connection back to the pool, closing it if it cannot be reused"""
+
+        if not reusable:
+            conn.close()
+        with self.lock:
+            if reusable:
+                self.idle.append((conn, time.time()))
+            self.inUse -= 1
+            self.lock.notify()
+
+    def evictIdle(self):
+        """Close every idle connection that has exceeded idleTimeout"""
+
+        now = time.time()
+        with self.lock:
+            expired = [entry for entry in self.idle if now - entry[1] >= self.idleTimeout]
+            self.idle = [entry for entry in self.idle if now - entry[1] < self.idleTimeout]
+        for conn, lastUsed in expired:
+            conn.close()
+
+    def close(self):
+        """Close every idle connection held by the pool"""
+
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for conn, lastUsed in idle:
+            conn.close()
+
+
+connectionPools = {}
+connectionPoolsLock = threading.Lock()
+connectionReaper = None
+
+def reapIdleConnections():
+    """Close the expired idle connections of every shared ConnectionPool, checking twice per idleTimeout"""
+
+    while True:
+        with connectionPoolsLock:
+            pools = list(connectionPools.values())
+        for pool in pools:
+            pool.evictIdle()
+        time.sleep(max(1, min(pool.idleTimeout for pool in pools) / 2.0))
+
+def getConnectionPool(host=None, hostPort=None):
+    """Return the shared ConnectionPool for host:hostPort (default: the global ip:port)"""
+
+    global connectionReaper
+    if host == None:
+        host = ip
+    if hostPort == None:
+        hostPort = port
+
+    key = (host, str(hostPort))
+    with connectionPoolsLock:
+        pool = connectionPools.get(key)
+        if pool == None:
+            pool = ConnectionPool(host, hostPort, maxSize=poolMaxSize, idleTimeout=poolIdleTimeout, timeout=requestTimeout)
+            connectionPools[key] = pool
+            if connectionReaper == None:
+                connectionReaper = threading.Thread(target=reapIdleConnections, name="conductor-pool-reaper")
+                connectionReaper.daemon = True
+                connectionReaper.start()
+    return pool
+
+def ensurePoolSize(size):
+    """Make sure every shared ConnectionPool allows at least size open connections"""
+
+    global poolMaxSize
+    with connectionPoolsLock:
+        poolMaxSize = max(poolMaxSize, size)
+        pools = list(connectionPools.values())
+    for pool in pools:
+        if pool.maxSize < size:
+            pool.resize(size)
+
+def closeConnectionPools():
+    """Close the idle connections of every shared ConnectionPool"""
+
+    with connectionPoolsLock:
+        pools = list(connectionPools.values())
+    for pool in pools:
+        pool.close()
+
+
+class ConnectError(socket.error):
+    """No connection to Conductor Server could be opened, so the request was never sent"""
+
+
+class SendError(ConnectError):
+    """The connection failed while the request was written, so Conductor Server never got all of it"""
+
+
+class RequestError(httplib.HTTPException):
+    """The request itself could not be written (e.g. an invalid URL), it is never retried nor held against the server"""
+
+
+class ServerEndpoint(object):
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.downSince = None
+        self.latency = None
+
+    def __repr__(self):
+        return self.host + ":" + str(self.port)
+
+
+class ServerEndpoints(object):
+    """Spread requests over several Conductor Server nodes, steering clear of the ones that stop responding
+
+        selection 'roundrobin' cycles through the healthy nodes; 'latency' picks the faster
+        of two random healthy nodes by the moving average of their observed latency, so a
+        slow node gets little traffic without the fastest one getting all of it.
+
+        A node that cannot be reached is marked down and the request goes to another node:
+        any request when the connection failed before the request was fully written, only
+        GETs when it failed later on. A node marked down gets traffic again once a health check (GET /api/admin/config
+        every healthCheckInterval seconds) succeeds, or after recheckAfter seconds when
+        health checks are off. If every node is down, requests are still attempted.
+    """
+
+    def __init__(self, endpoints, selection="roundrobin", healthCheckInterval=5, checkTimeout=2, recheckAfter=10, smoothing=0.3):
+        if selection not in ("roundrobin", "latency"):
+            raise ValueError("Unknown server selection " + str(selection))
+        self.endpoints = [ServerEndpoint(host, endpointPort) for host, endpointPort in endpoints]
+        self.selection = selection
+        self.healthCheckInterval = healthCheckInterval
+        self.checkTimeout = checkTimeout
+        self.recheckAfter = recheckAfter
+        self.smoothing = smoothing
+        self.lock = threading.Lock()
+        # Start at a random node so short lived processes do not all begin with the first one
+        self.turn = random.randrange(len(self.endpoints))
+        self.stopped = threading.Event()
+        self.checker = None
+        if healthCheckInterval:
+            self.checker = threading.Thread(target=self.checkLoop, name="conductor-health-check")
+            self.checker.daemon = True
+            self.checker.start()
+
+    def isUp(self, endpoint, now):
+        if endpoint.downSince == None:
+            return True
+        return not self.healthCheckInterval and now - endpoint.downSince >= self.recheckAfter
+
+    def choose(self, exclude=()):
+        """Return the ServerEndpoint the next request should go to, avoiding those in exclude"""
+
+        now = time.time()
+        with self.lock:
+            candidates = [endpoint for endpoint in self.endpoints if endpoint not in exclude]
+            candidates = [endpoint for endpoint in candidates if self.isUp(endpoint, now)] or candidates
+            if self.selection == "latency":
+                return min(random.sample(candidates, min(2, len(candidates))), key=lambda endpoint: endpoint.latency or 0.0)
+            self.turn += 1
+            return candidates[self.turn % len(candidates)]
+
+    def observe(self, endpoint, latency):
+        with self.lock:
+            if endpoint.latency == None:
+                endpoint.latency = latency
+            else:
+                endpoint.latency += self.smoothing * (latency - endpoint.latency)
+
+    def markDown(self, endpoint):
+        with self.lock:
+            if endpoint.downSince == None:
+                endpoint.downSince = time.time()
+                sys.stderr.write("Conductor Server " + repr(endpoint) + " is not responding\n")
+
+    def markUp(self, endpoint):
+        with self.lock:
+            endpoint.downSince = None
+
+    def request(self, requestType, path, headers, body=None, stream=False):
+        """Send a request to a healthy node, failing over to the others, see requestOnPool()"""
+
+        tried = []
+        while True:
+            endpoint = self.choose(exclude=tried)
+            logSendRequest("http://" + repr(endpoint) + string.replace(path, " ", "%20"), requestType, body)
+            try:
+                result = requestOnPool(getConnectionPool(endpoint.host, endpoint.port), requestType, path, headers, body, stream)
+            except RequestError:
+                raise
+            except (httplib.HTTPException, socket.error) as e:
+                self.markDown(endpoint)
+                tried.append(endpoint)
+                if len(tried) >= len(self.endpoints) or not (isinstance(e, ConnectError) or requestType == "GET"):
+                    raise
+                continue
+            # Long polls wait for tasks on purpose, they say nothing about the node
+            if "/poll/" not in path:
+                self.observe(endpoint, result[3])
+            return result
+
+    def check(self, endpoint):
+        """Health check endpoint with GET /api/admin/config"""
+
+        conn = httplib.HTTPConnection(endpoint.host, endpoint.port, timeout=self.checkTimeout)
+        try:
+            started = time.time()
+            response, connectTime, firstByteTime = openResponse(conn, "GET", "/api/admin/config", {"Accept": "application/json"})
+            response.read()
+            healthy = response.status >= 200 and response.status < 300
+        except (httplib.HTTPException, socket.error):
+            healthy = False
+        finally:
+            conn.close()
+
+        if healthy:
+            self.observe(endpoint, time.time() - started)
+            self.markUp(endpoint)
+        else:
+            self.markDown(endpoint)
+
+    def checkLoop(self):
+        while not self.stopped.wait(self.healthCheckInterval):
+            checks = [threading.Thread(target=self.check, args=(endpoint,)) for endpoint in self.endpoints]
+            for check in checks:
+                check.daemon = True
+                check.start()
+            for check in checks:
+                check.join()
+
+    def stop(self):
+        """Stop the health checks, waiting for the ones under way"""
+
+        self.stopped.set()
+        if self.checker != None:
+            self.checker.join()
+
+
+serverEndpoints = None
+serverEndpointsLock = threading.Lock()
+
+def getServerEndpoints():
+    """Return the shared ServerEndpoints of the global servers list, or None when a single ip:port is used"""
+
+    global serverEndpoints
+    if not servers:
+        return None
+    with serverEndpointsLock:
+        if serverEndpoints == None:
+            endpoints = []
+            for server in servers:
+                if isinstance(server, basestring):
+                    host, hostPort = server.rsplit(":", 1)
+                    server = (host, hostPort)
+                endpoints.append(server)
+            serverEndpoints = ServerEndpoints(endpoints, selection=serverSelection, healthCheckInterval=healthCheckInterval)
+    return serverEndpoints
+
+def closeServerEndpoints():
+    """Stop the health checks of the shared ServerEndpoints, if any"""
+
+    global serverEndpoints
+    with serverEndpointsLock:
+        endpoints, serverEndpoints = serverEndpoints, None
+    if endpoints != None:
+        endpoints.stop()
+
+
+# Status of the last response received by the current thread, see getLastStatus()
+lastResponse = threading.local()
+
+def getLastStatus():
+    """Return the HTTP status of the last response received by the calling thread (None if none)"""
+
+    return getattr(lastResponse, "status", None)
+
+def compressBody(body):
+    """gzip a request body"""
+
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(body) + compressor.flush()
+
+def iterResponseChunks(response, chunkSize=65536):
+    """Yield the body of response in decoded chunks as it is read
+        A gzip or deflate Content-Encoding is decompressed incrementally, so only one chunk
+        of compressed and of decompressed data (at most chunkSize bytes each) is held at a time.
+    """
+
+    encoding = (response.getheader("Content-Encoding") or "").strip().lower()
+    decompressor = None
+    if encoding == "gzip":
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    elif encoding == "deflate":
+        decompressor = zlib.decompressobj()
+
+    first = True
+    while True:
+        chunk = response.read(chunkSize)
+        if not chunk:
+            break
+        if decompressor == None:
+            yield chunk
+            continue
+        if first and encoding == "deflate":
+            # Some servers send a raw deflate stream without the zlib header
+            try:
+                data = decompressor.decompress(chunk, chunkSize)
+            except zlib.error:
+                decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+                data = decompressor.decompress(chunk, chunkSize)
+        else:
+            data = decompressor.decompress(chunk, chunkSize)
+        first = False
+        # Highly compressible data is inflated chunkSize bytes at a time
+        while data:
+            yield data
+            data = ""
+            if decompressor.unconsumed_tail:
+                data = decompressor.decompress(decompressor.unconsumed_tail, chunkSize)
+
+    if decompressor != None:
+        data = decompressor.flush()
+        if data:
+            yield data
+
+def sendRequest(conn, requestType, path, headers, body=None, stream=False):
+    """Send a request on conn, returning (response, responseData, connectTime, firstByteTime)
+        With stream, the body of a 2xx response is left unread and responseData is None.
+    """
+
+    if acceptCompression:
+        headers = dict(headers, **{"Accept-Encoding": "gzip, deflate"})
+    if compressUploads and body and len(body) >= compressMinSize:
+        headers = dict(headers, **{"Content-Encoding": "gzip"})
+        body = compressBody(body)
+
+    response, connectTime, firstByteTime = openResponse(conn, requestType, path, headers, body)
+    if stream and response.status >= 200 and response.status < 300:
+        return response, None, connectTime, firstByteTime
+    responseData = "".join(iterResponseChunks(response))
+    return response, responseData, connectTime, firstByteTime
+
+def openResponse(conn, requestType, path, headers, body=None):
+    """Send a request on conn and read the response headers, returning (response, connectTime, firstByteTime)"""
+
+    started = time.time()
+    connectTime = 0.0
+    if conn.sock == None:
+        try:
+            conn.connect()
+        except socket.error as e:
+            raise ConnectError(*e.args)
+        connectTime = time.time() - started
+    try:
+        conn.request(requestType, path, body, headers)
+    except (socket.error, httplib.CannotSendRequest, httplib.NotConnected) as e:
+        raise SendError(str(e) or e.__class__.__name__)
+    except httplib.HTTPException as e:
+        raise RequestError(e.__class__.__name__ + ": " + str(e))
+    response = conn.getresponse()
+    firstByteTime = time.time() - started
+    return response, connectTime, firstByteTime
+
+class CircuitOpenError(RuntimeError):
+    """A request was not sent because the recent requests to its endpoint failed, see CircuitBreaker"""
+
+
+# Statuses telling the server is overloaded or unreachable, rather than the request wrong
+overloadStatuses = (429, 502, 503, 504)
+
+class RetryPolicy(object):
+    """How failed requests are retried
+
+        A request is tried up to attempts times. Requests that could not connect and responses
+        with a status in statuses are retried, and so are connections that broke once the
+        request was sent when brokenConnections is set, as the server may have processed it.
+        Before retry n (from 0) the client sleeps a random time up to baseDelay * 2 ** n,
+        capped at maxDelay (full jitter), or the Retry-After of the response when it has one;
+        a Retry-After beyond maxDelay ends the retries.
+    """
+
+    def __init__(self, attempts=4, baseDelay=0.2, maxDelay=10, statuses=overloadStatuses, brokenConnections=True):
+        self.attempts = attempts
+        self.baseDelay = baseDelay
+        self.maxDelay = maxDelay
+        self.statuses = statuses
+        self.brokenConnections = brokenConnections
+
+    def delay(self, retry, retryAfter=None):
+        """Seconds to sleep before retry number retry, None to give up"""
+
+        if retry + 1 >= self.attempts:
+            return None
+        if retryAfter != None:
+            return retryAfter if retryAfter <= self.maxDelay else None
+        return random.uniform(0, min(self.maxDelay, self.baseDelay * (2 ** retry)))
+
+def parseRetryAfter(value):
+    """Seconds to wait of a Retry-After header, given in seconds or as an HTTP date, None if missing or invalid"""
+
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    date = email.utils.parsedate_tz(value)
+    if date == None:
+        return None
+    return max(0.0, email.utils.mktime_tz(date) - time.time())
+
+# POSTs that can be repeated safely, retried like the other methods
+idempotentRequests = set([
+    ("POST", "/api/metadata/taskdefs"),
+    ("POST", "/api/tasks"),
+    ("POST", "/api/tasks/{taskId}/ack"),
+    ("POST", "/api/tasks/queue/requeue"),
+    ("POST", "/api/tasks/queue/requeue/{taskType}"),
+    ("POST", "/api/tasks/queue/sizes"),
+])
+
+def getRetryPolicy(requestType, path):
+    """Return the RetryPolicy of a request, from retryAttempts and retryBaseDelay
+
+        GET, PUT and DELETE requests and the POSTs of idempotentRequests are retried on any
+        connection error and overload status. Other POSTs, such as startWorkflow, are only
+        retried when they cannot have been processed: the connection could not be opened,
+        it failed before the request was fully written, or the server answered 429 Too Many
+        Requests.
+    """
+
+    if requestType == "POST" and (requestType, endpointTemplate(requestType, path)) not in idempotentRequests:
+        return RetryPolicy(retryAttempts, retryBaseDelay, statuses=(429,), brokenConnections=False)
+    return RetryPolicy(retryAttempts, retryBaseDelay)
+
+
+class CircuitBreaker(object):
+    """Fail fast on an endpoint whose requests keep failing, instead of piling load on an overloaded server
+
+        After threshold consecutive failed requests (connection errors and overload statuses
+        once retries are exhausted) the circuit opens: requests raise CircuitOpenError without
+        being sent. Every resetTimeout seconds a single trial request is let through, closing
+        the circuit if it succeeds.
+    """
+
+    def __init__(self, threshold=5, resetTimeout=10):
+        self.threshold = threshold
+        self.resetTimeout = resetTimeout
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.openedAt = None
+
+    def allow(self):
+        """Whether a request may be sent now"""
+
+        with self.lock:
+            if self.openedAt == None:
+                return True
+            now = time.time()
+            if now - self.openedAt >= self.resetTimeout:
+                # Let this request through as the trial, the others wait for its outcome
+                self.openedAt = now
+                return True
+            return False
+
+    def succeeded(self):
+        with self.lock:
+            self.failures = 0
+            self.openedAt = None
+
+    def failed(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.openedAt = time.time()
+
+circuitBreakers = {}
+circuitBreakersLock = threading.Lock()
+
+def getCircuitBreaker(requestType, path):
+    """Return the shared CircuitBreaker of the endpoint template of a request, None if circuitThreshold is 0"""
+
+    if not circuitThreshold:
+        return None
+    key = (requestType, endpointTemplate(requestType, path))
+    with circuitBreakersLock:
+        breaker = circuitBreakers.get(key)
+        if breaker == None:
+            breaker = circuitBreakers[key] = CircuitBreaker(circuitThreshold, circuitResetTimeout)
+    return breaker
+
+
+class ResponseStream(object):
+    """Body of a streamed 2xx response, holding its pooled connection until close()"""
+
+    def __init__(self, pool, conn, response, requestType, path, started, connectTime, firstByteTime):
+        self.pool = pool
+        self.conn = conn
+        self.response = response
+        self.requestType = requestType
+        self.path = path
+        self.started = started
+        self.connectTime = connectTime
+        self.firstByteTime = firstByteTime
+        self.received = 0
+
+    def chunks(self):
+        """Yield the decompressed chunks of the body as they arrive"""
+
+        for chunk in iterResponseChunks(self.response):
+            self.received += len(chunk)
+            yield chunk
+
+    def close(self, completed):
+        """Release the connection, kept alive only if the body was completely read"""
+
+        self.pool.release(self.conn, reusable=completed and not self.response.will_close)
+        if completed:
+            requestMetrics.record(self.requestType, self.path, self.connectTime, self.firstByteTime, time.time() - self.started, self.received)
+
+def requestOnPool(pool, requestType, path, headers, body=None, stream=False):
+    """Send a request on a connection of pool, returning (response, responseData, connectTime, firstByteTime)
+        With stream, the body of a 2xx response is left unread and responseData is a
+        ResponseStream to read it from, which must be closed.
+    """
+
+    started = time.time()
+    conn, reused = pool.acquire()
+    try:
+        try:
+            response, responseData, connectTime, firstByteTime = sendRequest(conn, requestType, path, headers, body, stream)
+        except SendError:
+            if not reused:
+                raise
+            # The server closed the kept-alive socket while it sat in the pool, reconnect once.
+            # Failures once the request was written are left to the RetryPolicy, as the server
+            # may have processed it.
+            conn.close()
+            response, responseData, connectTime, firstByteTime = sendRequest(conn, requestType, path, headers, body, stream)
+    except:
+        pool.release(conn, reusable=False)
+        requestMetrics.recordError(requestType, path)
+        raise
+    if responseData == None:
+        return response, ResponseStream(pool, conn, response, requestType, path, started, connectTime, firstByteTime), connectTime, firstByteTime
+    pool.release(conn, reusable=not response.will_close)
+    return response, responseData, connectTime, firstByteTime
+
+def httpRequest(url, requestType, path, headers, body=None, stream=False):
+    """Send a request, retrying it by its RetryPolicy and failing fast while the circuit of its endpoint is open
+        Returns (response, responseData) of the last attempt; raises the connection error of
+        the last attempt, or CircuitOpenError. With stream, responseData of a 2xx response
+        is a ResponseStream (see requestOnPool), and nothing is retried once it is returned.
+    """
+
+    policy = getRetryPolicy(requestType, path)
+    breaker = getCircuitBreaker(requestType, path)
+    if breaker != None and not breaker.allow():
+        requestMetrics.recordError(requestType, path)
+        raise CircuitOpenError("Circuit open for [%s] %s after repeated failures, not sending (%s)" % (requestType, endpointTemplate(requestType, path), path))
+
+    retry = 0
+    while True:
+        try:
+            response, responseData = sendHttpRequest(url, requestType, path, headers, body, stream)
+        except RequestError:
+            raise
+        except (httplib.HTTPException, socket.error) as e:
+            delay = None
+            if isinstance(e, ConnectError) or policy.brokenConnections:
+                delay = policy.delay(retry)
+            if delay == None:
+                if breaker != None:
+                    breaker.failed()
+                raise
+            reason = e.__class__.__name__ + " " + str(e)
+        else:
+            delay = None
+            if response.status in policy.statuses:
+                delay = policy.delay(retry, parseRetryAfter(response.getheader("Retry-After")))
+            if delay == None:
+                if breaker != None:
+                    if response.status in overloadStatuses:
+                        breaker.failed()
+                    else:
+                        breaker.succeeded()
+                return response, responseData
+            reason = "status " + str(response.status)
+
+        logRetry(requestType, path, reason, delay)
+        time.sleep(delay)
+        retry += 1
+
+def sendHttpRequest(url, requestType, path, headers, body=None, stream=False):
+    """Send a request once, to the node chosen by ServerEndpoints when servers is set"""
+
+    started = time.time()
+    endpoints = getServerEndpoints()
+    if endpoints != None:
+        response, responseData, connectTime, firstByteTime = endpoints.request(requestType, path, headers, body, stream)
+    else:
+        url = string.replace(url," ", "%20")
+        logSendRequest(url, requestType, body)
+        response, responseData, connectTime, firstByteTime = requestOnPool(getConnectionPool(), requestType, path, headers, body, stream)
+    lastResponse.status = response.status
+    if isinstance(responseData, ResponseStream):
+        # Recorded once the body is read, see ResponseStream.close()
+        return response, responseData
+    requestMetrics.record(requestType, path, connectTime, firstByteTime, time.time() - started, len(responseData))
+    logResponse(response.status, responseData, requestType, path, time.time() - started, response.getheader("Content-Type"))
+    return response, responseData
+
+def httpStream(path, key=None):
+    """HTTP GET request to Conductor Server, yielding the elements of a JSON array of the response as they arrive
+        key names the member of the response object holding the array (see iterJsonArray).
+        The response is never held in memory as a whole. Raises RuntimeError if the response
+        status is not 2xx.
+    """
+
+    url = "http://" + ip + ":" + port + path
+    headers = {"Accept": "application/json"}
+    response, responseData = httpRequest(url, "GET", path, headers, stream=True)
+    if not isinstance(responseData, ResponseStream):
+        raise RuntimeError("Status " + str(response.status) + ": " + responseData)
+
+    completed = False
+    try:
+        chunks = responseData.chunks()
+        for element in iterJsonArray(chunks, key):
+            yield element
+        # Read what follows the array, so the connection can be kept alive
+        for chunk in chunks:
+            pass
+        completed = True
+    except GeneratorExit:
+        raise
+    except:
+        requestMetrics.recordError("GET", path)
+        raise
+    finally:
+        responseData.close(completed)
+
+
+def httpPost(path, body='{}'):
+    """HTTP POST request to Conductor Server"""
+    headers = {"Content-type": "application/json"}
+    url = "http://" + ip + ":" + port + path
+    return httpRequest(url, "POST", path, headers, body)
+
+
+def httpPut(path, body='{}'):
+    """HTTP PUT request to Conductor Server"""
+
+    headers = {"Content-type": "application/json"}
+    url = "http://" + ip + ":" + port + path
+    return httpRequest(url, "PUT", path, headers, body)
+
+
+def httpGet(path):
+    """HTTP GET request to Conductor Server"""
+
+    headers = {"Accept": "application/json"}
+    url = "http://" + ip + ":" + port + path
+    return httpRequest(url, "GET", path, headers)
+
+
+def httpDelete(path, body='{}'):
+    """HTTP DELETE request to Conductor Server"""
+
+    headers = {"Accept": "application/json"}
+    url = "http://" + ip + ":" + port + path
+    logSendRequest(url, "DELETE")
+    return httpRequest(url, "DELETE", path, headers)
+
+
+#########################################################################################
+# Streaming JSON #                                                                      #
+#########################################################################################
+
+jsonStructure = re.compile(r'["{}\[\],]')
+jsonNesting = re.compile(r'["{}\[\]]')
+jsonStringEnd = re.compile(r'["\\]')
+
+def iterJsonArray(chunks, key=None):
+    """Yield the elements of a JSON array, parsed one at a time from an iterable of text chunks
+        key names the member of the top level object holding the array (e.g. "tasks" of a
+        workflow execution or "results" of a search); None streams a top level array. Only
+        the element being parsed and the current chunk are held in memory, everything else
+        in the document is skipped.
+    """
+
+    buffer = ""
+    pos = 0
+    depth = 0
+    inString = False
+    expectKey = False
+    keyStart = None
+    memberName = None
+    arrayDepth = None
+    elementStart = None
+
+    for chunk in chunks:
+        # Drop what has been scanned, except the element or member name being read
+        keep = min([pos] + [start for start in (elementStart, keyStart) if start != None])
+        buffer = buffer[keep:] + chunk
+        pos -= keep
+        if elementStart != None:
+            elementStart -= keep
+        if keyStart != None:
+            keyStart -= keep
+
+        while True:
+            if inString:
+                match = jsonStringEnd.search(buffer, pos)
+                if match == None:
+                    pos = len(buffer)
+                    break
+                if match.group() == "\\":
+                    if match.end() >= len(buffer):
+                        # The escaped character is in the next chunk
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                    continue
+                inString = False
+                pos = match.end()
+                if keyStart != None:
+                    memberName = buffer[keyStart:match.start()]
+                    keyStart = None
+                continue
+
+            if depth == arrayDepth or depth == 1:
+                match = jsonStructure.search(buffer, pos)
+            else:
+                match = jsonNesting.search(buffer, pos)
+            if match == None:
+                pos = len(buffer)
+                break
+            token = match.group()
+            pos = match.end()
+
+            if token == '"':
+                inString = True
+                if depth == 1 and expectKey and arrayDepth == None:
+                    keyStart = pos
+                    expectKey = False
+            elif token == "{" or token == "[":
+                if token == "[" and arrayDepth == None and ((key == None and depth == 0) or (key != None and depth == 1 and memberName == key)):
+                    arrayDepth = depth + 1
+                    elementStart = pos
+                depth += 1
+                if depth == 1 and token == "{":
+                    expectKey = True
+            elif token == "}" or token == "]":
+                if depth == arrayDepth:
+                    element = buffer[elementStart:match.start()]
+                    if element.strip():
+                        yield json.loads(element)
+                    return
+                depth -= 1
+            elif depth == arrayDepth:
+                yield json.loads(buffer[elementStart:match.start()])
+                elementStart = pos
+            elif depth == 1:
+                expectKey = True
+
+
+#########################################################################################
+# Concurrent Client #                                                                   #
+#########################################################################################
+
+class Future(object):
+    """Pending result of a call submitted to an AsyncClient"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.lock = threading.Lock()
+        self.value = None
+        self.error = None
+        self.callbacks = []
+
+    def setResult(self, value):
+        self.value = value
+        self.finish()
+
+    def setException(self, error):
+        self.error = error
+        self.finish()
+
+    def finish(self):
+        with self.lock:
+            self.event.set()
+            callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    def addDoneCallback(self, callback):
+        """Call callback(future) once the call has finished (immediately if it already has)"""
+
+        with self.lock:
+            if not self.event.is_set():
+                self.callbacks.append(callback)
+                return
+        callback(self)
+
+    def done(self):
+        return self.event.is_set()
+
+    def exception(self, timeout=None):
+        """Wait for the call to finish and return the exception it raised, or None"""
+
+        if not self.event.wait(timeout):
+            raise RuntimeError("Timed out waiting for Conductor Server call")
+        return self.error
+
+    def result(self, timeout=None):
+        """Wait for the call to finish and return its value, raising the exception it raised"""
+
+        error = self.exception(timeout)
+        if error != None:
+            raise error
+        return self.value
+
+
+def asCompleted(futures):
+    """Yield futures in the order they finish"""
+
+    finished = Queue.Queue()
+    futures = list(futures)
+    for future in futures:
+        future.addDoneCallback(finished.put)
+    for i in range(len(futures)):
+        yield finished.get()
+
+
+def runInBackground(function, *args, **kwargs):
+    """Run function(*args, **kwargs) on a new daemon thread and return a Future of its result"""
+
+    future = Future()
+
+    def run():
+        try:
+            future.setResult(function(*args, **kwargs))
+        except Exception as e:
+            future.setException(e)
+
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
+    return future
+
+def iterPages(fetchPage, cursor, prefetch=True):
+    """Yield the items of successive pages, following the cursor from page to page
+        fetchPage(cursor) returns (items, nextCursor), nextCursor being None after the last
+        page. With prefetch the next page is fetched in the background while the items of
+        the current one are consumed.
+    """
+
+    page = runInBackground(fetchPage, cursor) if prefetch else None
+    while cursor != None:
+        if prefetch:
+            items, cursor = page.result()
+            if cursor != None:
+                page = runInBackground(fetchPage, cursor)
+        else:
+            items, cursor = fetchPage(cursor)
+        for item in items:
+            yield item
+
+
+def iterOffsetPages(fetchPage, start, pageSize, prefetch=1):
+    """Yield the items of offset based pages in order until a page comes back short
+        fetchPage(start) returns the list of items at offset start. Up to prefetch pages
+        beyond the current one are fetched in parallel.
+    """
+
+    pages = []
+    nextStart = start
+    try:
+        while True:
+            while len(pages) <= prefetch:
+                pages.append(runInBackground(fetchPage, nextStart))
+                nextStart += pageSize
+            items = pages.pop(0).result()
+            for item in items:
+                yield item
+            if len(items) < pageSize:
+                return
+    finally:
+        # Pages prefetched past the end are still in flight, let them release their connections
+        for page in pages:
+            page.exception()
+
+
+class RateLimiter(object):
+    """Spread calls evenly so that at most rate calls per second are let through, across all threads"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.lock = threading.Lock()
+        self.next = time.time()
+
+    def acquire(self):
+        """Block until the caller may make its next call"""
+
+        with self.lock:
+            now = time.time()
+            start = max(now, self.next)
+            self.next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class AsyncClient(object):
+    """Run Conductor Server API calls concurrently on a bounded set of worker threads
+
+        Every API function of this script is available as a method returning a Future:
+
+            client = AsyncClient(maxConcurrency=32)
+            futures = [client.getWorkflow(workflowId) for workflowId in workflowIds]
+            for future in asCompleted(futures):
+                workflow = future.result()
+
+        At most maxConcurrency calls are in flight at once, submitting more blocks until one
+        finishes. Worker threads share the keep-alive ConnectionPool of the Conductor Server,
+        which is grown to maxConcurrency connections if it is smaller. Submitting after
+        shutdown() raises RuntimeError.
+    """
+
+    operations = frozenset([
+        'getAllEventHandlers', 'getEventHandler', 'createEventHandler', 'modifyEventHandler', 'deleteEventHandler', 'getEventExecutions', 'getRegisteredQueues', 'getRegisteredQueueProviders',
+        'getAllTaskMetadata', 'createTaskMetadata', 'modifyTaskMetadata', 'deleteTaskMetadata', 'getTaskMetadata', 'getAllWorkflowMetadata', 'createWorkflowMetadata', 'modifyWorkflowMetadata', 'getWorkflowMetadata',
+        'getConfiguration', 'sweepWorkflow', 'getPendingTasks',
+        'updateTask', 'getInProgressTask', 'getInProgressTaskForWorkflowInstance', 'batchPollTask', 'pollTask', 'getTasksQueue', 'getTasksQueueVerbose', 'requeueAllPendingTasks', 'requeuePendingTasks', 'getTaskTypeQueueSizes', 'deleteTaskFromQueue', 'getTask', 'ackTask',
+        'startDecision', 'getRunningWorkflows', 'searchWorkflows', 'startWorkflow', 'getWorkflowByCorrelationId', 'stopWorkflow', 'getWorkflow', 'pauseWorkflow', 'removeWorkflow', 'rerunWorkflow', 'restartWorkflow', 'resumeWorkflow', 'retryWorkflow', 'skipWorkflowTask'])
+
+    def __init__(self, maxConcurrency=16):
+        self.maxConcurrency = maxConcurrency
+        self.slots = threading.BoundedSemaphore(maxConcurrency)
+        self.calls = Queue.Queue()
+        self.lock = threading.Lock()
+        self.closed = False
+        ensurePoolSize(maxConcurrency)
+        self.workers = []
+        for i in range(maxConcurrency):
+            worker = threading.Thread(target=self.work, name="conductor-async-%d" % i)
+            worker.daemon = True
+            worker.start()
+            self.workers.append(worker)
+
+    def __getattr__(self, name):
+        if name not in AsyncClient.operations:
+            raise AttributeError(name)
+        function = globals()[name]
+        return lambda *args, **kwargs: self.submit(function, *args, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.shutdown()
+
+    def work(self):
+        while True:
+            call = self.calls.get()
+            if call == None:
+                return
+            future, function, args, kwargs = call
+            try:
+                future.setResult(function(*args, **kwargs))
+            except Exception as e:
+                future.setException(e)
+            finally:
+                self.slots.release()
+
+    def submit(self, function, *args, **kwargs):
+        """Run function(*args, **kwargs) on a worker thread, blocking while maxConcurrency calls are in flight"""
+
+        self.slots.acquire()
+        with self.lock:
+            if self.closed:
+                self.slots.release()
+                raise RuntimeError("AsyncClient is shut down")
+            future = Future()
+            self.calls.put((future, function, args, kwargs))
+        return future
+
+    def imapUnordered(self, function, iterable):
+        """Yield (item, future) for function(item) over iterable, in completion order
+
+            Items are pulled from iterable lazily, so at most maxConcurrency calls are in flight
+            and at most 2 * maxConcurrency items are held in memory at any time. Once the
+            consumer stops iterating, no further item is submitted.
+        """
+
+        finished = Queue.Queue()
+        # One token per item submitted but not yet yielded, bounding how far the feeder runs ahead
+        pending = Queue.Queue(2 * self.maxConcurrency)
+        stopped = threading.Event()
+        end = object()
+
+        def reserve():
+            while not stopped.is_set():
+                try:
+                    pending.put(None, timeout=0.1)
+                    return True
+                except Queue.Full:
+                    pass
+            return False
+
+        def feed():
+            submitted = 0
+            error = None
+            try:
+                for item in iterable:
+                    if not reserve():
+                        break
+                    future = self.submit(function, item)
+                    future.addDoneCallback(lambda future, item=item: finished.put((item, future)))
+                    submitted += 1
+            except Exception as e:
+                error = e
+            finished.put((end, (submitted, error)))
+
+        feeder = threading.Thread(target=feed, name="conductor-async-feed")
+        feeder.daemon = True
+        feeder.start()
+
+        try:
+            yielded = 0
+            total = None
+            error = None
+            while total == None or yielded < total:
+                item, future = finished.get()
+                if item is end:
+                    total, error = future
+                    continue
+                pending.get()
+                yielded += 1
+                yield item, future
+
+            if error != None:
+                raise error
+        finally:
+            stopped.set()
+
+    def shutdown(self, wait=True):
+        """Stop the worker threads once every submitted call has finished"""
+
+        with self.lock:
+            if not self.closed:
+                self.closed = True
+                for worker in self.workers:
+                    self.calls.put(None)
+        if wait:
+            for worker in self.workers:
+                worker.join()
+
+
+#########################################################################################
+# Event Services #                                                                      #
+#########################################################################################
+
+def getAllEventHandlers():
+    """Get all the Conductor Event Handlers
+        Will invoke GET request with format http://<ip>:<port>/api/event
+    """
+
+    path = "/api/event"
+    response, responseData = httpGet(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def getEventHandler(event, activeOnly='true'):
+    """Get Event Handler for given event <event>
+        Will invoke GET request with format http://<ip>:<port>/api/event/<event>?activeOnly=<activeOnly>
+    """
+
+    path = "/api/event/" + event + "?activeOnly=" + activeOnly
+    response, responseData = httpGet(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def createEventHandler(body):
+    """Create Event Handler definition of body passed in
+        Will invoke POST request with format http://<ip>:<port>/api/event
+    """
+
+    path = "/api/event"
+    response, responseData = httpPost(path, body)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def modifyEventHandler(body):
+    """Modify Event Handler definition of body passed in
+        Will invoke PUT request with format http://<ip>:<port>/api/event
+    """
+
+    path = "/api/event"
+    response, responseData = httpPut(path, body)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def deleteEventHandler(name):
+    """Delete Event Handler of <name> passed in
+        Will invoke DELETE request with format http://<ip>:<port>/api/event/<name>
+    """
+
+    path = "/api/event/" + name
+    response, responseData = httpDelete(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def getEventExecutions(eventHandlerName, eventName, messageId, max=100):
+    """Get up to 100 Conductor Event Executions
+        Will invoke GET request with format http://<ip>:<port>/api/event/executions/<eventHandlerName>/<eventName>/<messageId>?max=<max>
+    """
+
+    path = "/api/event/executions/" + eventHandlerName + "/" + eventName + "/" + messageId + "?max=" + str(max)
+    response, responseData = httpGet(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def getRegisteredQueues(verbosity="false"):
+    """Get all the Conductor Registered Queues
+        Will invoke GET request with format http://<ip>:<port>/api/event/queues?verbose=<verbosity>
+    """
+
+    path = "/api/event/queues?verbose=" + verbosity
+    response, responseData = httpGet(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def getRegisteredQueueProviders():
+    """Get all the Conductor Registered Queue Providers
+        Will invoke GET request with format http://<ip>:<port>/api/event/queues/providers
+    """
+
+    path = "/api/event/queues/providers"
+    response, responseData = httpGet(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def fetchEventHandlers():
+    """Return every Conductor Event Handler (list of dicts), raising RuntimeError if the request fails"""
+
+    responseJSON = getAllEventHandlers()
+    if responseJSON == None:
+        raise RuntimeError("Status " + str(getLastStatus()) + ": getAllEventHandlers failed")
+    return json.loads(responseJSON) or []
+
+def fetchRegisteredQueues(verbosity="false"):
+    """Return the registered queues by event (dict), empty if Conductor Server does not report them"""
+
+    responseJSON = getRegisteredQueues(verbosity)
+    queues = json.loads(responseJSON) if responseJSON else None
+    return queues if isinstance(queues, dict) else {}
+
+def describeEventAction(action):
+    """Compact description of an Event Handler action, e.g. 'start_workflow:encode_flow'"""
+
+    kind = action.get("action")
+    target = action.get(kind) if kind else None
+    if isinstance(target, dict):
+        name = target.get("name") or target.get("taskRefName")
+        if name:
+            return kind + ":" + name
+    return kind
+
+def inspectEventHandlers():
+    """Return a compact record (dict) of every Event Handler with the queue of its event
+        A record holds the handler name, event, active flag and condition, its actions (see
+        describeEventAction) and, when Conductor Server has the event registered, the queue
+        it listens on (getRegisteredQueues) and the number of messages waiting in it.
+    """
+
+    queues = fetchRegisteredQueues("false")
+    sizes = fetchRegisteredQueues("true")
+    records = []
+    for handler in fetchEventHandlers():
+        event = handler.get("event")
+        record = {
+            "name": handler.get("name"),
+            "event": event,
+            "active": handler.get("active"),
+            "condition": handler.get("condition"),
+            "actions": [describeEventAction(action) for action in handler.get("actions") or []],
+        }
+        if event in queues:
+            record["queue"] = queues[event]
+        queueSizes = sizes.get(event)
+        if isinstance(queueSizes, dict) and queueSizes:
+            record["queueSize"] = sum(size for size in queueSizes.values() if isinstance(size, (int, long)))
+        records.append(record)
+    return records
+
+def fetchEventExecutions(eventHandlerName, eventName, messageId, max=100, maxLimit=10000):
+    """Return (executions, truncated) of a message, executions a list of dicts, raising RuntimeError if a request fails
+        The API has no offset, so a response holding max executions may have been cut short:
+        it is asked again with a four times larger max until it is not. truncated is True
+        when the message still has maxLimit executions or more, some of which were not read.
+    """
+
+    while True:
+        responseJSON = getEventExecutions(eventHandlerName, eventName, messageId, max)
+        if responseJSON == None:
+            raise RuntimeError("Status " + str(getLastStatus()) + ": getEventExecutions failed for " + messageId)
+        executions = json.loads(responseJSON) or []
+        if len(executions) < max:
+            return executions, False
+        if max >= maxLimit:
+            return executions, True
+        max = min(max * 4, maxLimit)
+
+def eventMessages(messageIds, handlers):
+    """Yield (eventHandlerName, eventName, messageId) for every messageId and handler (dict) pair
+        messageIds are read lazily, so they may be a stream; duplicates are skipped.
+    """
+
+    seen = set()
+    for messageId in messageIds:
+        if messageId in seen:
+            continue
+        seen.add(messageId)
+        for handler in handlers:
+            yield handler["name"], handler["event"], messageId
+
+def eventExecutionRecord(eventHandlerName, eventName, messageId, execution=None):
+    """Compact record (dict) of an Event Execution, or of a message without executions when execution is None"""
+
+    record = {"handler": eventHandlerName, "event": eventName, "messageId": messageId, "status": None}
+    if execution == None:
+        return record
+    record.update(id=execution.get("id"), status=execution.get("status"), action=execution.get("action"), created=execution.get("created"))
+    output = execution.get("output") or {}
+    if output.get("workflowId"):
+        record["workflowId"] = output["workflowId"]
+    if output.get("error"):
+        record["error"] = output["error"]
+    return record
+
+def scanEventExecutions(messages, concurrency=16, max=100, maxLimit=10000):
+    """Yield a compact record (dict) per Event Execution of messages, in completion order
+        messages yields (eventHandlerName, eventName, messageId), see eventMessages(), and is
+        read lazily with up to concurrency messages fetched at once. A message without any
+        execution yields one record with status None, and one whose executions could not be
+        fetched one record with the error and "failed": true. The records of a message that
+        has more than maxLimit executions have "truncated": true.
+    """
+
+    def fetch(message):
+        return fetchEventExecutions(message[0], message[1], message[2], max, maxLimit)
+
+    client = AsyncClient(maxConcurrency=concurrency)
+    try:
+        for message, future in client.imapUnordered(fetch, messages):
+            error = future.exception()
+            if error != None:
+                record = eventExecutionRecord(*message)
+                record.update(failed=True, error=str(error))
+                yield record
+                continue
+            executions, truncated = future.result()
+            if not executions:
+                yield eventExecutionRecord(*message)
+            for execution in executions:
+                record = eventExecutionRecord(message[0], message[1], message[2], execution)
+                if truncated:
+                    record["truncated"] = True
+                yield record
+    finally:
+        client.shutdown()
+
+class EventExecutionCounts(object):
+    """Counts of scanned Event Execution records by handler and status
+
+            counts = EventExecutionCounts()
+            for record in scanEventExecutions(messages):
+                counts.add(record)
+            sys.stderr.write(counts.summary())
+
+        Messages without executions are counted as NONE and failed fetches as ERROR.
+        truncated holds the messages whose executions were cut off at maxLimit.
+    """
+
+    def __init__(self):
+        # handler -> status -> count
+        self.counts = collections.defaultdict(collections.Counter)
+        # (handler, event, messageId) of the messages whose executions were cut off
+        self.truncated = set()
+
+    def add(self, record):
+        if record.get("truncated"):
+            self.truncated.add((record["handler"], record["event"], record["messageId"]))
+        if record.get("failed"):
+            status = "ERROR"
+        else:
+            status = record.get("status") or "NONE"
+        self.counts[record["handler"]][status] += 1
+
+    def summary(self):
+        """Return a table of the counts, one line per handler and status"""
+
+        lines = ["%-40s %-12s %10s" % ("Handler", "Status", "Count")]
+        for handler in sorted(self.counts):
+            for status, count in sorted(self.counts[handler].items()):
+                lines.append("%-40s %-12s %10d" % (handler, status, count))
+        if self.truncated:
+            lines.append(str(len(self.truncated)) + " messages had more executions than were read (truncated)")
+        return "\n".join(lines) + "\n"
+
+#########################################################################################
+# Metadata Management #                                                                 #
+#########################################################################################
+
+class MetadataCache(object):
+    """LRU cache of metadata responses with a per-entry TTL, optionally persisted to a directory
+
+        Keys are the metadata paths below /api/metadata (e.g. 'taskdefs/<taskType>'). When a
+        directory is given every entry is also stored there as a file, so that separate
+        invocations of this script share the cache until the entries expire.
+    """
+
+    def __init__(self, maxEntries=256, ttl=300, directory=None):
+        self.maxEntries = maxEntries
+        self.ttl = ttl
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.entries = collections.OrderedDict()
+        if directory != None and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def entryFile(self, key):
+        return os.path.join(self.directory, urllib.quote(key, safe='') + ".json")
+
+    def get(self, key):
+        """Return the cached value of key, or None if it is missing or expired"""
+
+        now = time.time()
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry == None and self.directory != None:
+                entry = self.load(key)
+            if entry == None or entry[0] <= now:
+                return None
+            self.entries[key] = entry
+            return entry[1]
+
+    def put(self, key, value, ttl=None):
+        expires = time.time() + (ttl if ttl != None else self.ttl)
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = (expires, value)
+            while len(self.entries) > self.maxEntries:
+                self.entries.popitem(last=False)
+            if self.directory != None:
+                self.store(key, expires, value)
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+            if self.directory != None and os.path.exists(self.entryFile(key)):
+                os.remove(self.entryFile(key))
+
+    def invalidatePrefix(self, prefix):
+        """Drop every entry whose key starts with prefix"""
+
+        with self.lock:
+            for key in [key for key in self.entries if key.startswith(prefix)]:
+                del self.entries[key]
+            if self.directory != None:
+                filePrefix = urllib.quote(prefix, safe='')
+                for name in os.listdir(self.directory):
+                    if name.startswith(filePrefix):
+                        os.remove(os.path.join(self.directory, name))
+
+    def load(self, key):
+        try:
+            with open(self.entryFile(key)) as entryFile:
+                entry = json.load(entryFile)
+            return entry["expires"], entry["value"]
+        except (IOError, ValueError, KeyError):
+            return None
+
+    def store(self, key, expires, value):
+        # Write then rename so concurrent invocations never read a partial entry. The cache is
+        # only an optimization: a full disk or read-only directory must not fail the request.
+        tempFile = self.entryFile(key) + "." + str(os.getpid()) + ".tmp"
+        try:
+            with open(tempFile, "w") as entryFile:
+                json.dump({"expires": expires, "value": value}, entryFile)
+            os.rename(tempFile, self.entryFile(key))
+        except (IOError, OSError) as e:
+            sys.stderr.write("Caching metadata " + key + " failed: " + str(e) + "\n")
+            if os.path.exists(tempFile):
+                try:
+                    os.remove(tempFile)
+                except OSError:
+                    pass
+
+
+metadataCaches = {}
+metadataCacheLock = threading.Lock()
+
+def getMetadataCache():
+    """Return the shared MetadataCache of the global ip:port, or None when caching is turned off"""
+
+    if not useMetadataCache:
+        return None
+
+    key = (ip, str(port))
+    with metadataCacheLock:
+        cache = metadataCaches.get(key)
+        if cache == None:
+            directory = None
+            if metadataCacheDir != None:
+                directory = os.path.join(metadataCacheDir, ip + "_" + str(port))
+            cache = MetadataCache(ttl=metadataCacheTTL, directory=directory)
+            metadataCaches[key] = cache
+    return cache
+
+def getCachedMetadata(key):
+    cache = getMetadataCache()
+    if cache == None:
+        return None
+    responseJSON = cache.get(key)
+    if responseJSON != None:
+        logCachedResponse("/api/metadata/" + key, responseJSON)
+    return responseJSON
+
+def cacheMetadata(key, responseJSON):
+    cache = getMetadataCache()
+    if cache != None and responseJSON != None:
+        cache.put(key, responseJSON)
+
+def invalidateMetadata(kind, metadata=None, name=None):
+    """Drop the cached definitions of kind ('taskdefs' or 'workflow') touched by a change
+        The names are read from the metadata JSON (object or array) or given as name; if
+        they cannot be determined every cached definition of kind is dropped.
+    """
+
+    cache = getMetadataCache()
+    if cache == None:
+        return
+
+    cache.invalidate(kind)
+    names = []
+    if name != None:
+        names = [name]
+    elif metadata != None:
+        try:
+            definitions = json.loads(metadata)
+            if isinstance(definitions, dict):
+                definitions = [definitions]
+            names = [definition["name"] for definition in definitions]
+        except (ValueError, TypeError, KeyError):
+            names = []
+
+    if not names:
+        cache.invalidatePrefix(kind + "/")
+    for definitionName in names:
+        cache.invalidate(kind + "/" + definitionName)
+
+def getAllTaskMetadata():
+    """Get all the Conductor Task Definitions
+        Will invoke GET request with format http://<ip>:<port>/api/metadata/taskdefs
+    """
+
+    path = "/api/metadata/taskdefs"
+    responseJSON = getCachedMetadata("taskdefs")
+    if responseJSON != None:
+        return responseJSON
+
+    response, responseData = httpGet(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+        cacheMetadata("taskdefs", responseJSON)
+
+    return responseJSON
+
+def createTaskMetadata(metadata):
+    """Create Task(s) definitions of metadata passed in
+        Will invoke POST request with format http://<ip>:<port>/api/metadata/taskdefs
+    """
+
+    path = "/api/metadata/taskdefs"
+    response, responseData = httpPost(path, metadata)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    invalidateMetadata("taskdefs", metadata=metadata)
+
+    return responseJSON
+
+def modifyTaskMetadata(metadata):
+    """Modify Task definitions of metadata passed in
+        Will invoke PUT request with format http://<ip>:<port>/api/metadata/taskdefs
+    """
+
+    path = "/api/metadata/taskdefs"
+    response, responseData = httpPut(path, metadata)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    invalidateMetadata("taskdefs", metadata=metadata)
+
+    return responseJSON
+
+def deleteTaskMetadata(taskType):
+    """Delete Task definitions of taskType passed in
+        Will invoke DELETE request with format http://<ip>:<port>/api/metadata/taskdefs/<tasktype>
+    """
+
+    path = "/api/metadata/taskdefs/" + taskType
+    response, responseData = httpDelete(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    invalidateMetadata("taskdefs", name=taskType)
+
+    return responseJSON
+
+def getTaskMetadata(taskType):
+    """Get Task definition of taskType passed in
+        Will invoke GET request with format http://<ip>:<port>/api/metadata/taskdefs/<tasktype>
+    """
+
+    path = "/api/metadata/taskdefs/" + taskType
+    responseJSON = getCachedMetadata("taskdefs/" + taskType)
+    if responseJSON != None:
+        return responseJSON
+
+    response, responseData = httpGet(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+        cacheMetadata("taskdefs/" + taskType, responseJSON)
+
+    return responseJSON
+
+def getAllWorkflowMetadata():
+    """Get all the Conductor Workflow Definitions
+        Will invoke GET request with format http://<ip>:<port>/api/metadata/workflow
+    """
+
+    path = "/api/metadata/workflow"
+    responseJSON = getCachedMetadata("workflow")
+    if responseJSON != None:
+        return responseJSON
+
+    response, responseData = httpGet(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+        cacheMetadata("workflow", responseJSON)
+
+    return responseJSON
+
+def createWorkflowMetadata(metadata):
+    """Create Workflow definition of metadata passed in
+        Will invoke POST request with format http://<ip>:<port>/api/metadata/workflow
+    """
+
+    path = "/api/metadata/workflow"
+    response, responseData = httpPost(path, metadata)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    invalidateMetadata("workflow", metadata=metadata)
+
+    return responseJSON
+
+def modifyWorkflowMetadata(metadata):
+    """Modify Workflow definitions of metadata passed in
+        Will invoke PUT request with format http://<ip>:<port>/api/metadata/workflow
+    """
+
+    path = "/api/metadata/workflow"
+    response, responseData = httpPut(path, metadata)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    invalidateMetadata("workflow", metadata=metadata)
+
+    return responseJSON
+
+def getWorkflowMetadata(name):
+    """Get Workflow definition of name passed in
+        Will invoke GET request with format http://<ip>:<port>/api/metadata/workflow/<name>
+    """
+
+    path = "/api/metadata/workflow/" + name
+    responseJSON = getCachedMetadata("workflow/" + name)
+    if responseJSON != None:
+        return responseJSON
+
+    response, responseData = httpGet(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+        cacheMetadata("workflow/" + name, responseJSON)
+
+    return responseJSON
+
+
+# Fields Conductor Server sets on the definitions it stores
+definitionAuditFields = frozenset(["createTime", "updateTime", "createdBy", "updatedBy", "ownerApp"])
+
+# Values Conductor Server fills in for the fields a definition leaves out, besides empty ones
+taskDefDefaults = {"retryCount": 3, "retryLogic": "FIXED", "retryDelaySeconds": 60, "timeoutPolicy": "TIME_OUT_WF",
+                   "responseTimeoutSeconds": 3600, "rateLimitFrequencyInSeconds": 1, "backoffScaleFactor": 1}
+workflowDefDefaults = {"version": 1, "schemaVersion": 2, "restartable": True, "timeoutPolicy": "ALERT_ONLY"}
+workflowTaskDefaults = {"type": "SIMPLE"}
+
+def readDefinitions(directory):
+    """Load the task and workflow definitions of every .json file below directory
+        A file holds one definition or an array of them; definitions with a "tasks" array
+        are workflow definitions. Returns ({name: taskDef}, {(name, version): workflowDef},
+        {key: path}) and raises ValueError for invalid or duplicate definitions.
+    """
+
+    taskDefs = {}
+    workflowDefs = {}
+    paths = {}
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for fileName in sorted(files):
+            if not fileName.endswith(".json"):
+                continue
+            path = os.path.join(root, fileName)
+            try:
+                with open(path) as definitionFile:
+                    definitions = json.load(definitionFile)
+            except ValueError as e:
+                raise ValueError(path + ": " + str(e))
+            if isinstance(definitions, dict):
+                definitions = [definitions]
+            for definition in definitions:
+                if not isinstance(definition, dict) or not definition.get("name"):
+                    raise ValueError(path + ": definition without a name")
+                if isinstance(definition.get("tasks"), list):
+                    key = ("workflow", definition["name"], definition.get("version", 1))
+                    workflowDefs[key[1:]] = definition
+                else:
+                    key = ("task", definition["name"])
+                    taskDefs[key[1]] = definition
+                if key in paths:
+                    raise ValueError(path + ": " + " ".join(map(str, key)) + " is also defined in " + paths[key])
+                paths[key] = path
+    return taskDefs, workflowDefs, paths
+
+def isDefaultValue(value, default):
+    return value in (None, False, 0, "", [], {}) or value == default
+
+def projectDefinition(stored, local, defaults={}, nestedDefaults=None):
+    """Return stored restricted to the fields that tell whether it differs from local, recursively
+        Conductor Server fills in a default for every field a definition leaves out, so a
+        stored field that local lacks is only kept when it holds something else than the
+        default, empty or given by defaults: it was removed from the local definition.
+        nestedDefaults apply to the objects nested in stored (default: defaults).
+    """
+
+    if nestedDefaults == None:
+        nestedDefaults = defaults
+    if isinstance(local, dict) and isinstance(stored, dict):
+        projected = {}
+        for key, value in stored.items():
+            if key in definitionAuditFields:
+                continue
+            if key in local:
+                projected[key] = projectDefinition(value, local[key], nestedDefaults)
+            elif not isDefaultValue(value, defaults.get(key)):
+                projected[key] = value
+        return projected
+    if isinstance(local, list) and isinstance(stored, list) and len(local) == len(stored):
+        return [projectDefinition(storedItem, localItem, defaults) for storedItem, localItem in zip(stored, local)]
+    return stored
+
+def normalizeDefinition(definition):
+    return dict((key, value) for key, value in definition.items() if key not in definitionAuditFields)
+
+def definitionHash(definition):
+    return hashlib.sha1(json.dumps(definition, sort_keys=True, separators=(",", ":"))).hexdigest()
+
+def planMetadataSync(taskDefs, workflowDefs):
+    """Compare local definitions with the ones of Conductor Server, fetched once
+        Returns the changes as (kind, key, action, local, stored) tuples, kind being 'task' or
+        'workflow', action 'create' or 'update' and stored the projected server definition
+        (None when it is created), and the number of unchanged definitions.
+    """
+
+    cache = getMetadataCache()
+    if cache != None:
+        cache.invalidate("taskdefs")
+        cache.invalidate("workflow")
+
+    storedTasks = getAllTaskMetadata()
+    storedWorkflows = getAllWorkflowMetadata()
+    if storedTasks == None or storedWorkflows == None:
+        raise RuntimeError("Status " + str(getLastStatus()) + ": could not fetch the definitions of Conductor Server")
+    storedTasks = dict((definition["name"], definition) for definition in json.loads(storedTasks))
+    storedWorkflows = dict(((definition["name"], definition.get("version", 1)), definition) for definition in json.loads(storedWorkflows))
+
+    changes = []
+    unchanged = 0
+    for kind, local, stored in (("task", taskDefs, storedTasks), ("workflow", workflowDefs, storedWorkflows)):
+        for key in sorted(local):
+            definition = normalizeDefinition(local[key])
+            if key not in stored:
+                changes.append((kind, key, "create", definition, None))
+                continue
+            if kind == "task":
+                projected = projectDefinition(stored[key], definition, taskDefDefaults)
+            else:
+                projected = projectDefinition(stored[key], definition, workflowDefDefaults, workflowTaskDefaults)
+            if definitionHash(projected) == definitionHash(definition):
+                unchanged += 1
+            else:
+                changes.append((kind, key, "update", definition, projected))
+    return changes, unchanged
+
+def definitionDiff(stored, local, name):
+    return difflib.unified_diff(json.dumps(stored, indent=2, sort_keys=True).splitlines(),
+                                json.dumps(local, indent=2, sort_keys=True).splitlines(),
+                                "server/" + name, "local/" + name, lineterm="")
+
+def syncMetadata(directory, batchSize=25, concurrency=8, dryRun=False, showDiff=True, output=sys.stdout):
+    """Push the task and workflow definitions of directory that are new or differ from Conductor Server
+        Writes the plan (with a diff of every updated definition when showDiff) to output,
+        then, unless dryRun, creates new task definitions in batches of batchSize, updates
+        changed ones concurrently and then creates or updates workflow definitions in
+        batches, task definitions first since workflows refer to them. Returns (pushed,
+        failed) counts of definitions.
+    """
+
+    taskDefs, workflowDefs, paths = readDefinitions(directory)
+    changes, unchanged = planMetadataSync(taskDefs, workflowDefs)
+
+    for kind, key, action, local, stored in changes:
+        name = key if kind == "task" else key[0] + " v" + str(key[1])
+        path = paths[(kind, key)] if kind == "task" else paths[(kind,) + key]
+        output.write("%s %s %s (%s)\n" % ("+" if action == "create" else "~", kind, name, path))
+        if showDiff and stored != None:
+            for line in definitionDiff(stored, local, name):
+                output.write("    " + line + "\n")
+    output.write("%d to create, %d to update, %d unchanged\n" % (
+        sum(1 for change in changes if change[2] == "create"), sum(1 for change in changes if change[2] == "update"), unchanged))
+    output.flush()
+    if dryRun or not changes:
+        return 0, 0
+
+    def batches(definitions):
+        return [definitions[i:i + batchSize] for i in range(0, len(definitions), batchSize)]
+
+    newTasks = [local for kind, key, action, local, stored in changes if kind == "task" and action == "create"]
+    changedTasks = [local for kind, key, action, local, stored in changes if kind == "task" and action == "update"]
+    workflows = [local for kind, key, action, local, stored in changes if kind == "workflow"]
+
+    # (function, definitions) of every request; a stage only starts once the previous one succeeded
+    stages = [
+        [(createTaskMetadata, batch) for batch in batches(newTasks)] + [(modifyTaskMetadata, [definition]) for definition in changedTasks],
+        [(modifyWorkflowMetadata, batch) for batch in batches(workflows)],
+    ]
+
+    def push(request):
+        function, definitions = request
+        body = definitions if function != modifyTaskMetadata else definitions[0]
+        if function(json.dumps(body)) == None:
+            raise RuntimeError("Status " + str(getLastStatus()) + ": " + function.__name__ + " failed for " + ", ".join(definition["name"] for definition in definitions))
+        return len(definitions)
+
+    pushed = 0
+    failed = 0
+    client = AsyncClient(maxConcurrency=concurrency)
+    try:
+        for stage in stages:
+            for (function, definitions), future in client.imapUnordered(push, stage):
+                error = future.exception()
+                if error == None:
+                    pushed += len(definitions)
+                else:
+                    failed += len(definitions)
+                    output.write("Error: " + str(error) + "\n")
+            if failed:
+                break
+    finally:
+        output.flush()
+        client.shutdown()
+    return pushed, failed
+
+
+#########################################################################################
+# Admin #                                                                               #
+#########################################################################################
+
+def getConfiguration():
+    """Get all the Conductor Configuration Parameters
+        Will invoke GET request with format http://<ip>:<port>/api/admin/config
+    """
+
+    path = "/api/admin/config"
+    response, responseData = httpGet(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def sweepWorkflow(workflowId):
+    """Queue up all the running workflows for sweep
+        Will invoke POST request with format http://<ip>:<port>/api/admin/sweep/requeue/<workflowId>
+    """
+
+    path = "/api/admin/sweep/requeue/" + workflowId
+    response, responseData = httpPost(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def getPendingTasks(taskType, start=None, count=100):
+    """Get the list of pending tasks for a given task type
+        Will invoke GET request with format http://<ip>:<port>/api/admin/task/<taskType>?start=<start>&count=<count>
+    """
+
+    parameterString = "?"
+    if start != None:
+        parameterString += "start=" + str(start)
+        parameterString += "&"
+
+    parameterString += "count=" + str(count)
+
+    path = "/api/admin/task/" + taskType + parameterString
+    response, responseData = httpGet(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def iterPendingTasks(taskType, start=0, pageSize=100, prefetch=1):
+    """Yield every pending task (dict) of taskType, following start offsets page by page
+        Up to prefetch pages beyond the current one are fetched in parallel.
+    """
+
+    def fetchPage(pageStart):
+        responseJSON = getPendingTasks(taskType, start=pageStart, count=pageSize)
+        if responseJSON == None:
+            raise RuntimeError("Pending tasks request failed at start=" + str(pageStart))
+        return json.loads(responseJSON)
+
+    return iterOffsetPages(fetchPage, start, pageSize, prefetch)
+
+#########################################################################################
+# Task Management #                                                                     #
+#########################################################################################
+
+def updateTask(body):
+    """Update Task with information of body passed in
+        Will invoke POST request with format http://<ip>:<port>/api/tasks
+    """
+
+    path = "/api/tasks"
+    response, responseData = httpPost(path, body)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def getInProgressTask(taskType, startKey=None, count=100):
+    """Get in progress tasks for a given task type
+        Will invoke GET request with format http://<ip>:<port>/api/tasks/in_progress/<taskType>?startKey=<startKey>&count=<count>
+    """
+
+    parameterString = "?"
+    if startKey != None:
+        parameterString += "startKey=" + startKey
+        parameterString += "&"
+
+    parameterString += "count=" + str(count)
+
+    path = "/api/tasks/in_progress/" + taskType + parameterString
+    response, responseData = httpGet(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def iterInProgressTasks(taskType, startKey=None, pageSize=100, prefetch=True):
+    """Yield every in progress task (dict) of taskType, following the startKey cursor page by page
+        Each page starts after the last taskId of the previous one; with prefetch the next
+        page is requested while the current one is consumed.
+    """
+
+    def fetchPage(pageKey):
+        responseJSON = getInProgressTask(taskType, startKey=pageKey or None, count=pageSize)
+        if responseJSON == None:
+            raise RuntimeError("In progress tasks request failed at startKey=" + str(pageKey))
+        tasks = json.loads(responseJSON)
+        nextKey = None
+        if len(tasks) >= pageSize:
+            nextKey = tasks[-1].get("taskId")
+        # Do not repeat the task the page was keyed on, should the server include it
+        if pageKey and tasks and tasks[0].get("taskId") == pageKey:
+            tasks = tasks[1:]
+        return tasks, nextKey
+
+    return iterPages(fetchPage, startKey or "", prefetch)
+
+def getInProgressTaskForWorkflowInstance(workflowId, taskName):
+    """Get a Conductor Task Instance information with given workflowId and task name
+        Will invoke GET request with format http://<ip>:<port>/api/tasks/in_progress/<workflowId>/<taskName>
+    """
+
+    path = "/api/tasks/in_progress/" + workflowId + "/" + taskName
+    response, responseData = httpGet(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def batchPollTask(taskType, workerid=None, count=1, timeout=100):
+    """This method will batch poll for a given task
+        Will invoke GET request with format http://<ip>:<port>/api/tasks/poll/batch/<taskType>?workerid=<workerid>&count=<count>&timeout=<timeout>
+    """
+    parameterString = "?"
+    if workerid != None:
+        parameterString += "workerid=" + workerid
+        parameterString += "&"
+
+    parameterString += "count=" + str(count)
+    parameterString += "&timeout=" + str(timeout)
+
+    path = "/api/tasks/poll/batch/" + taskType + parameterString
+    response, responseData = httpGet(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def pollTask(taskType, workerid=None):
+    """This method will poll for a given task
+        Will invoke GET request with format http://<ip>:<port>/api/tasks/poll/<taskType>?workerid=<workerid>&count=<count>&timeout=<timeout>
+    """
+    path = "/api/tasks/poll/" + taskType
+    if workerid != None:
+        path += "?workerid=" + workerid
+
+    response, responseData = httpGet(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def getTasksQueue():
+    """Get details about each queue
+        Will invoke GET request with format http://<ip>:<port>/api/tasks/queue/all
+    """
+
+    path = "/api/tasks/queue/all"
+    response, responseData = httpGet(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def getTasksQueueVerbose():
+    """Get verbose details about each queue
+        Will invoke GET request with format http://<ip>:<port>/api/tasks/queue/all/verbose
+    """
+
+    path = "/api/tasks/queue/all/verbose"
+    response, responseData = httpGet(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def requeueAllPendingTasks():
+    """Requeue pending tasks for all the running workflows
+        Will invoke POST request with format http://<ip>:<port>/api/tasks/queue/requeue
+        Returns workflow instance id
+    """
+
+    path = "/api/tasks/queue/requeue"
+    response, responseData = httpPost(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def requeuePendingTasks(taskType):
+    """Requeue pending tasks for taskType
+        Will invoke POST request with format http://<ip>:<port>/api/tasks/queue/requeue/<taskType>
+        Returns workflow instance id
+    """
+
+    path = "/api/tasks/queue/requeue/" + taskType
+    response, responseData = httpPost(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def getTaskTypeQueueSizes(body):
+    """Create Workflow definition of metadata passed in
+        Will invoke POST request with format http://<ip>:<port>/api/tasks/queue/sizes
+    """
+
+    path = "/api/tasks/queue/sizes"
+    response, responseData = httpPost(path, body)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def deleteTaskFromQueue(taskType, taskId):
+    """Delete Task of taskType with taskId from queue
+        Will invoke DELETE request with format http://<ip>:<port>/api/tasks/queue/<tasktype>/<taskId>
+    """
+
+    path = "/api/tasks/queue/" + taskType + "/" + taskId
+    response, responseData = httpDelete(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def getTask(taskId):
+    """Get Task Instance of taskId passed in
+        Will invoke GET request with format http://<ip>:<port>/api/tasks/<taskId>
+    """
+
+    path = "/api/tasks/" + taskId
+    response, responseData = httpGet(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def ackTask(taskId, workerid=None):
+    """This method will ack a given task
+        Will invoke POST request with format http://<ip>:<port>/api/tasks/<taskId>/ack?workerid=<workerid>
+    """
+    path = "/api/tasks/" + taskId + "/ack"
+    if workerid != None:
+        path += "?workerid=" + workerid
+
+    response, responseData = httpPost(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+#########################################################################################
+# Workflow Management #                                                                 #
+#########################################################################################
+
+def startDecision(workflowId):
+    """Start Decision Task for a workflow with given id
+        Will invoke PUT request with format http://<ip>:<port>/api/workflow/decide/<workflowId>
+    """
+
+    path = "/api/workflow/decide/" + workflowId
+    response, responseData = httpPut(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def getRunningWorkflows(name, version=1, startTime=None, endTime=None):
+    """Retrieve all the running workflows with a given name
+        Will invoke GET request with format http://<ip>:<port>/api/workflow/running/<name>?version=<version>&startTime=<startTime>&endTime=<endTime>
+    """
+
+    parameterString = "?"
+    if startTime != None:
+        parameterString += "startTime=" + str(startTime)
+        parameterString += "&"
+
+    if endTime != None:
+        parameterString += "endTime=" + str(endTime)
+        parameterString += "&"
+
+    parameterString += "version=" + str(version)
+
+    path = "/api/workflow/running/" + name + parameterString
+    response, responseData = httpGet(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def searchWorkflows(start=None, size=100, sort=None, freeText='*', query=None):
+    """Search for workloads based on parameters
+        Will invoke GET request with format http://<ip>:<port>/api/workflow/search?start=<start>&size=<size>&sort=<sort>&freeText=<freeText>&query=<query>
+    """
+
+    path = searchWorkflowsPath(start, size, sort, freeText, query)
+    response, responseData = httpGet(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def streamSearchWorkflows(start=None, size=100, sort=None, freeText='*', query=None):
+    """Yield the workflow summaries (dicts) of one search request as they are read from the response
+        Unlike searchWorkflows, the results are never held in memory all at once, which
+        keeps a search with a large size bounded in memory.
+    """
+
+    return httpStream(searchWorkflowsPath(start, size, sort, freeText, query), "results")
+
+def searchWorkflowsPath(start=None, size=100, sort=None, freeText='*', query=None):
+    """Build the /api/workflow/search path of searchWorkflows"""
+
+    parameterString = "?"
+    if start != None:
+        parameterString += "start=" + str(start)
+        parameterString += "&"
+
+    if sort != None:
+        parameterString += "sort=" + sort
+        parameterString += "&"
+
+    if query != None:
+        parameterString += "query=" + urllib.quote(query, safe='')
+        parameterString += "&"
+
+    parameterString += "size=" + str(size)
+    parameterString += "&freeText=" + urllib.quote(freeText, safe='*')
+
+    return "/api/workflow/search" + parameterString
+
+def iterSearchWorkflows(query=None, freeText='*', sort=None, start=0, pageSize=100, prefetch=True):
+    """Yield the workflow summaries (dicts) of every page of a search, one at a time
+        Pages of pageSize results are fetched lazily; with prefetch the next page is requested
+        while the caller handles the current one, so at most two pages are held in memory.
+    """
+
+    def fetchPage(pageStart):
+        responseJSON = searchWorkflows(start=pageStart, size=pageSize, sort=sort, freeText=freeText, query=query)
+        if responseJSON == None:
+            raise RuntimeError("Search request failed at start=" + str(pageStart))
+        page = json.loads(responseJSON)
+        results = page.get("results") or []
+        nextStart = pageStart + len(results)
+        if len(results) < pageSize or nextStart >= page.get("totalHits", 0):
+            nextStart = None
+        return results, nextStart
+
+    return iterPages(fetchPage, start, prefetch)
+
+def startWorkflowPath(name, version=None, correlationId=None):
+    """Build the /api/workflow/<name>?version=<version>&correlationId=<correlationId> path of startWorkflow"""
+
+    parameterString = "?"
+    if version != None:
+        parameterString += "version=" + str(version)
+        parameterString += "&"
+
+    if correlationId != None:
+        parameterString += "correlationId=" + correlationId
+        parameterString += "&"
+
+    return "/api/workflow/" + name + parameterString
+
+def startWorkflow(name, version=None, correlationId=None, body=None):
+    """Start a Conductor Workflow with given name
+        Will invoke POST request with format http://<ip>:<port>/api/workflow/<name>?version=<version>&correlationId=<correlationId>
+        Returns workflow instance id
+    """
+
+    if body == None:
+        body = '{}'
+
+    path = startWorkflowPath(name, version, correlationId)
+    response, responseData = httpPost(path, body)
+    workflowInstanceId = None
+    
+    if response.status >= 200 and response.status < 300:
+        workflowInstanceId = responseData
+
+    return workflowInstanceId
+
+def getWorkflowByCorrelationId(name, correlationId, includeClosed='false', includeTasks='false'):
+    """Retrieve workflows with name for given correlationId
+        Will invoke GET request with format http://<ip>:<port>/api/workflow/<name>/correlated/<correlationId>?includeClosed=<includeClosed>&includeTasks=<includeTasks>
+    """
+
+    parameterString = "?includeClosed=" + includeClosed
+    parameterString += "&includeTasks=" + includeTasks
+
+    path = "/api/workflow/" + name + "/correlated/" + correlationId + parameterString
+    response, responseData = httpGet(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def stopWorkflow(workflowId, reason=None):
+    """Terminate/Stope Workflow of <workflowId> passed in
+        Will invoke DELETE request with format http://<ip>:<port>/api/workflow/<workflowId>?reason=<reason>
+    """
+
+    path = "/api/workflow/" + workflowId
+
+    if reason != None:
+        path += "?reason=" + reason
+
+    response, responseData = httpDelete(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def getWorkflow(workflowId, includeTasks='true'):
+    """Get a Conductor Workflow Instance information with given workflowId
+        Will invoke GET request with format http://<ip>:<port>/api/workflow/<workflowId>?includeTasks=<includeTasks>
+    """
+
+    path = "/api/workflow/" + workflowId + "?includeTasks=" + includeTasks
+    response, responseData = httpGet(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def streamWorkflowTasks(workflowId):
+    """Yield the tasks (dicts) of a Conductor Workflow Instance one at a time as they are read from the response
+        Will invoke GET request with format http://<ip>:<port>/api/workflow/<workflowId>?includeTasks=true
+        Memory stays bounded by the largest task, however many tasks the execution has.
+    """
+
+    return httpStream("/api/workflow/" + workflowId + "?includeTasks=true", "tasks")
+
+def pauseWorkflow(workflowId):
+    """Pause a Conductor Workflow Instance information with given workflowId
+        Will invoke PUT request with format http://<ip>:<port>/api/workflow/<workflowId>/pause
+    """
+
+    path = "/api/workflow/" + workflowId + "/pause"
+    response, responseData = httpPut(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def removeWorkflow(workflowId):
+    """Remove a Conductor Workflow Instance information with given workflowId
+        Will invoke DELETE request with format http://<ip>:<port>/api/workflow/<workflowId>/remove
+    """
+
+    path = "/api/workflow/" + workflowId + "/remove"
+    response, responseData = httpDelete(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+        invalidateCachedWorkflow(workflowId)
+
+    return responseJSON
+
+def rerunWorkflow(workflowId, body=None):
+    """Rerun a Conductor Workflow from a specific task (passed in body)
+        Will invoke POST request with format http://<ip>:<port>/api/workflow/<workflowId>/rerun
+        Returns workflow instance id
+    """
+    if body == None:
+        body = '{}'
+
+    path = "/api/workflow/" + workflowId + "/rerun"
+    response, responseData = httpPost(path, body)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+        invalidateCachedWorkflow(workflowId)
+
+    return responseJSON
+
+def restartWorkflow(workflowId):
+    """Restart a completed Conductor Workflow
+        Will invoke POST request with format http://<ip>:<port>/api/workflow/<workflowId>/restart
+        Returns workflow instance id
+    """
+
+    path = "/api/workflow/" + workflowId + "/restart"
+    response, responseData = httpPost(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+        invalidateCachedWorkflow(workflowId)
+
+    return responseJSON
+
+def resumeWorkflow(workflowId):
+    """Resume a Conductor Workflow Instance information with given workflowId
+        Will invoke PUT request with format http://<ip>:<port>/api/workflow/<workflowId>/resume
+    """
+
+    path = "/api/workflow/" + workflowId + "/resume"
+    response, responseData = httpPut(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+def retryWorkflow(workflowId):
+    """Retries the last failed task of a Conductor Workflow
+        Will invoke POST request with format http://<ip>:<port>/api/workflow/<workflowId>/retry
+        Returns workflow instance id
+    """
+
+    path = "/api/workflow/" + workflowId + "/retry"
+    response, responseData = httpPost(path)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+        invalidateCachedWorkflow(workflowId)
+
+    return responseJSON
+
+def skipWorkflowTask(workflowId, taskReferenceName, body=None):
+    """Skip a given task from a current running Conductor Workflow
+        Will invoke PUT request with format http://<ip>:<port>/api/workflow/<workflowId>/skiptask/<taskReferenceName>
+        Returns workflow instance id
+    """
+    if body == None:
+        body = '{}'
+
+    path = "/api/workflow/" + workflowId + "/skiptask/" + taskReferenceName
+    response, responseData = httpPut(path, body)
+    responseJSON = None
+    
+    if response.status >= 200 and response.status < 300:
+        responseJSON = responseData
+
+    return responseJSON
+
+
+#########################################################################################
+# Task Workers #                                                                        #
+#########################################################################################
+
+def taskResult(task, workerId, output=None, error=None):
+    """Build the updateTask body for a task from its handler's output or exception
+        A handler may return the task output (dict), or a full result dict carrying its own
+        'status' (e.g. IN_PROGRESS with callbackAfterSeconds).
+    """
+
+    if error != None:
+        result = {"status": "FAILED", "reasonForIncompletion": str(error)}
+    elif isinstance(output, dict) and 'status' in output:
+        result = dict(output)
+    else:
+        result = {"status": "COMPLETED", "outputData": output if output != None else {}}
+
+    result["taskId"] = task["taskId"]
+    result["workflowInstanceId"] = task["workflowInstanceId"]
+    if workerId != None:
+        result["workerId"] = workerId
+    return result
+
+
+class ResultPublisher(object):
+    """Post task results with updateTask on background threads, so handlers never wait on Conductor Server
+
+            publisher = ResultPublisher(threads=4)
+            future = publisher.publish(taskResult(task, workerId, output))
+            ...
+            publisher.close()
+
+        publish() queues a result and returns a Future resolved with the updateTask response
+        once it was accepted. A result queued for a taskId that already has one waiting
+        replaces it (e.g. successive IN_PROGRESS updates), both futures resolving with the
+        outcome of the newer one; results of the same taskId are never sent concurrently.
+        updateTask is retried on connection errors and overload statuses by the request layer
+        (see getRetryPolicy). At most maxPending results wait at once, publish() blocking
+        beyond that, and close() returns once every queued result has been sent.
+    """
+
+    def __init__(self, threads=4, maxPending=1000):
+        self.maxPending = maxPending
+        self.lock = threading.Condition()
+        # taskId -> (result, futures), in publish order
+        self.pending = collections.OrderedDict()
+        self.inFlight = set()
+        self.closed = False
+        ensurePoolSize(threads)
+        self.threads = []
+        for i in range(threads):
+            thread = threading.Thread(target=self.work, name="conductor-publish-%d" % i)
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+    def publish(self, result):
+        """Queue result (an updateTask body as a dict) and return a Future of the updateTask response"""
+
+        future = Future()
+        taskId = result["taskId"]
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("ResultPublisher is closed")
+            entry = self.pending.get(taskId)
+            if entry != None:
+                futures = entry[1] + [future]
+            else:
+                while len(self.pending) >= self.maxPending and not self.closed:
+                    self.lock.wait()
+                futures = [future]
+            self.pending[taskId] = (result, futures)
+            self.lock.notify_all()
+        return future
+
+    def next(self):
+        """Take the oldest queued result whose task has no result being sent, None once closed and drained"""
+
+        with self.lock:
+            while True:
+                for taskId in self.pending:
+                    if taskId not in self.inFlight:
+                        result, futures = self.pending.pop(taskId)
+                        self.inFlight.add(taskId)
+                        self.lock.notify_all()
+                        return result, futures
+                if self.closed and not self.pending:
+                    return None
+                self.lock.wait()
+
+    def send(self, result):
+        responseData = updateTask(json.dumps(result))
+        if responseData == None:
+            raise RuntimeError("Status " + str(getLastStatus()) + ": updateTask failed for " + result["taskId"])
+        return responseData
+
+    def work(self):
+        while True:
+            entry = self.next()
+            if entry == None:
+                return
+            result, futures = entry
+            try:
+                responseData = self.send(result)
+                error = None
+            except Exception as e:
+                error = e
+            with self.lock:
+                self.inFlight.discard(result["taskId"])
+                self.lock.notify_all()
+            for future in futures:
+                if error == None:
+                    future.setResult(responseData)
+                else:
+                    future.setException(error)
+
+    def flush(self):
+        """Wait until every result queued so far has been sent"""
+
+        with self.lock:
+            while self.pending or self.inFlight:
+                self.lock.wait()
+
+    def close(self):
+        """Send every queued result and stop the publisher threads"""
+
+        with self.lock:
+            self.closed = True
+            self.lock.notify_all()
+        for thread in self.threads:
+            thread.join()
+
+
+class AdaptivePollController(object):
+    """Choose the batch size, long poll timeout and timing of the polls of a TaskWorker
+
+            controller = AdaptivePollController(["encode_video"], maxBatch=16)
+            controller.start()
+            count, timeout, delay = controller.plan("encode_video", freeSlots)
+
+        A background thread reads the depth of every task queue with a single
+        getTaskTypeQueueSizes call every refreshInterval seconds; in between, the depth is
+        estimated from the tasks polled. plan() then weighs depth, free handler threads and
+        the moving average of handler latency:
+
+        - a deep queue is polled right away for as many tasks as there are free threads
+          (up to maxBatch) with a short timeout, draining it as fast as handlers free up.
+          When only a few threads are free, the poll first waits up to a handler latency
+          (minInterval until one was observed, at most maxCoalesceDelay) for half a batch
+          of them, taking bigger batches in fewer requests.
+        - a shallow queue is polled for just the tasks it holds, so the server does not
+          hold the poll open waiting for more.
+        - an empty queue is long polled with exponential backoff (with jitter) from
+          minInterval up to maxInterval seconds, until a refresh finds tasks in it and
+          wakes its poller: idle task types cost next to no requests besides the shared
+          queue size refreshes, yet new tasks are picked up within refreshInterval.
+
+        Task types whose queue size could not be read are long polled for every free thread,
+        with the same backoff on empty polls.
+    """
+
+    def __init__(self, taskTypes, maxBatch=8, refreshInterval=1.0, pollTimeout=100, minPollTimeout=10, minInterval=0.1, maxInterval=10, maxCoalesceDelay=0.05, smoothing=0.3):
+        self.taskTypes = list(taskTypes)
+        self.maxBatch = maxBatch
+        self.refreshInterval = refreshInterval
+        self.pollTimeout = pollTimeout
+        self.minPollTimeout = minPollTimeout
+        self.minInterval = minInterval
+        self.maxInterval = maxInterval
+        self.maxCoalesceDelay = maxCoalesceDelay
+        self.smoothing = smoothing
+        # Notified when queue sizes are refreshed and on stop(), waking the pollers in wait()
+        self.lock = threading.Condition()
+        # taskType -> queue depth, None while unknown
+        self.depths = dict.fromkeys(self.taskTypes)
+        # taskType -> moving average of handler latency in seconds
+        self.latencies = {}
+        self.emptyPolls = dict.fromkeys(self.taskTypes, 0)
+        self.nextPolls = dict.fromkeys(self.taskTypes, 0.0)
+        self.coalesced = set()
+        self.stopped = threading.Event()
+
+    def start(self):
+        """Read the queue sizes and keep refreshing them in the background"""
+
+        self.refresh()
+        refresher = threading.Thread(target=self.refreshLoop, name="conductor-queue-sizes")
+        refresher.daemon = True
+        refresher.start()
+
+    def stop(self):
+        self.stopped.set()
+        with self.lock:
+            self.lock.notify_all()
+
+    def refresh(self):
+        try:
+            responseJSON = getTaskTypeQueueSizes(json.dumps(self.taskTypes))
+            sizes = json.loads(responseJSON) if responseJSON else None
+        except (CircuitOpenError, httplib.HTTPException, socket.error, ValueError) as e:
+            sys.stderr.write("Reading queue sizes failed: " + str(e) + "\n")
+            sizes = None
+        if not isinstance(sizes, dict):
+            sizes = {}
+
+        with self.lock:
+            for taskType in self.taskTypes:
+                depth = sizes.get(taskType)
+                self.depths[taskType] = depth if isinstance(depth, (int, long)) else None
+                if depth > 0:
+                    # Tasks arrived, end the backoff of an idle poller
+                    self.emptyPolls[taskType] = 0
+                    self.nextPolls[taskType] = 0.0
+            self.lock.notify_all()
+
+    def refreshLoop(self):
+        while not self.stopped.wait(self.refreshInterval):
+            self.refresh()
+
+    def wait(self, delay):
+        """Sleep up to delay seconds, returning early when queue sizes are refreshed or on stop()"""
+
+        with self.lock:
+            if not self.stopped.is_set():
+                self.lock.wait(delay)
+
+    def observeHandler(self, taskType, elapsed):
+        """Record that a handler of taskType ran for elapsed seconds"""
+
+        with self.lock:
+            latency = self.latencies.get(taskType)
+            if latency == None:
+                self.latencies[taskType] = elapsed
+            else:
+                self.latencies[taskType] = latency + self.smoothing * (elapsed - latency)
+
+    def plan(self, taskType, freeSlots):
+        """Return (count, timeout in ms, delay in seconds) of the next poll of taskType
+            A delay above 0 means not to poll yet: wait up to delay seconds for count free
+            handler threads, or with count 0 for a queue size refresh (see wait()), then
+            plan again.
+        """
+
+        now = time.time()
+        with self.lock:
+            depth = self.depths[taskType]
+            latency = self.latencies.get(taskType)
+            count = min(freeSlots, self.maxBatch)
+
+            if not depth:
+                if now < self.nextPolls[taskType]:
+                    return 0, 0, self.nextPolls[taskType] - now
+                return count, self.pollTimeout, 0
+
+            wanted = min(depth, self.maxBatch)
+            if count < wanted / 2 and taskType not in self.coalesced:
+                # Handlers will be done shortly, poll for several of them at once. Polls sent
+                # right away never ask for more tasks than there are free threads.
+                delay = min(latency or self.minInterval, self.maxCoalesceDelay)
+                if delay > 0:
+                    self.coalesced.add(taskType)
+                    return wanted / 2, 0, delay
+            return min(count, wanted), self.minPollTimeout, 0
+
+    def polled(self, taskType, requested, received):
+        """Record that a poll of taskType for requested tasks returned received tasks"""
+
+        now = time.time()
+        with self.lock:
+            self.coalesced.discard(taskType)
+            depth = self.depths[taskType]
+            if received:
+                self.emptyPolls[taskType] = 0
+                self.nextPolls[taskType] = 0.0
+                if depth != None:
+                    # A full batch suggests more are waiting, let the next refresh tell
+                    self.depths[taskType] = max(depth - received, 1 if received >= requested else 0)
+                return
+
+            delay = min(self.maxInterval, self.minInterval * (2 ** self.emptyPolls[taskType]))
+            self.emptyPolls[taskType] = min(self.emptyPolls[taskType] + 1, 30)
+            self.nextPolls[taskType] = now + random.uniform(delay / 2, delay)
+            if depth != None:
+                self.depths[taskType] = 0
+
+
+class TaskWorker(object):
+    """Long running worker that polls Conductor Server for tasks and runs their handlers
+
+            worker = TaskWorker(workerId="host-1", threads=16)
+            worker.register("encode_video", encodeVideo)
+            worker.run()
+
+        One poller thread per task type batch polls for as many tasks as there are free
+        handler threads, acks them and hands them to the shared handler threads. Results are
+        posted by a ResultPublisher of publishThreads threads, so a handler thread is free
+        for the next task as soon as its handler returns. Empty polls back off exponentially
+        (with jitter) from minPollInterval up to maxPollInterval seconds; the first non-empty
+        poll resets it. With adaptive set, an AdaptivePollController sizes and times the
+        polls from the queue depths instead.
+    """
+
+    def __init__(self, workerId=None, threads=8, batchSize=None, pollTimeout=100, minPollInterval=0.1, maxPollInterval=10, publishThreads=4, adaptive=False):
+        self.workerId = workerId
+        self.threads = threads
+        self.batchSize = batchSize if batchSize != None else threads
+        self.pollTimeout = pollTimeout
+        self.minPollInterval = minPollInterval
+        self.maxPollInterval = maxPollInterval
+        self.publishThreads = publishThreads
+        self.publisher = None
+        self.adaptive = adaptive
+        self.controller = None
+        self.handlers = {}
+        self.slots = threading.Condition()
+        self.busy = 0
+        self.stopped = threading.Event()
+        self.completed = 0
+        self.failed = 0
+
+    def register(self, taskType, handler):
+        """Run handler(task) for every task of taskType, task being the polled task as a dict"""
+
+        self.handlers[taskType] = handler
+
+    def stop(self):
+        self.stopped.set()
+        if self.controller != None:
+            self.controller.stop()
+        with self.slots:
+            self.slots.notify_all()
+
+    def reserveSlots(self):
+        """Block until handler threads are free and return how many tasks to poll for (0 once stopped)"""
+
+        with self.slots:
+            while self.busy >= self.threads and not self.stopped.is_set():
+                self.slots.wait(1)
+            if self.stopped.is_set():
+                return 0
+            return min(self.batchSize, self.threads - self.busy)
+
+    def waitForSlots(self, count, timeout):
+        """Block up to timeout seconds until count handler threads are free"""
+
+        deadline = time.time() + timeout
+        with self.slots:
+            while self.threads - self.busy < count and not self.stopped.is_set():
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return
+                self.slots.wait(remaining)
+
+    def releaseSlot(self):
+        with self.slots:
+            self.busy -= 1
+            self.slots.notify_all()
+
+    def countResult(self, succeeded):
+        with self.slots:
+            if succeeded:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def poll(self, taskType, count, timeout):
+        """Batch poll for up to count tasks of taskType, returning [] on failure"""
+
+        try:
+            responseJSON = batchPollTask(taskType, workerid=self.workerId, count=count, timeout=timeout)
+        except (CircuitOpenError, httplib.HTTPException, socket.error) as e:
+            sys.stderr.write("Poll for " + taskType + " failed: " + str(e) + "\n")
+            return []
+        if not responseJSON:
+            return []
+        try:
+            return json.loads(responseJSON)
+        except ValueError:
+            sys.stderr.write("Poll for " + taskType + " returned invalid JSON\n")
+            return []
+
+    def pollLoop(self, taskType, pool):
+        emptyPolls = 0
+        while not self.stopped.is_set():
+            count = self.reserveSlots()
+            if count == 0:
+                continue
+
+            if self.controller != None:
+                count, timeout, delay = self.controller.plan(taskType, count)
+                if delay > 0:
+                    if count:
+                        self.waitForSlots(count, delay)
+                    else:
+                        self.controller.wait(delay)
+                    continue
+                tasks = self.poll(taskType, count, timeout)
+                self.controller.polled(taskType, count, len(tasks))
+            else:
+                tasks = self.poll(taskType, count, self.pollTimeout)
+
+            if not tasks and self.controller != None:
+                continue
+            if not tasks:
+                delay = min(self.maxPollInterval, self.minPollInterval * (2 ** emptyPolls))
+                emptyPolls = min(emptyPolls + 1, 30)
+                self.stopped.wait(random.uniform(delay / 2, delay))
+                continue
+
+            emptyPolls = 0
+            with self.slots:
+                self.busy += len(tasks)
+            for task in tasks:
+                pool.submit(self.execute, taskType, task)
+
+    def execute(self, taskType, task):
+        started = time.time()
+        try:
+            if ackTask(task["taskId"], self.workerId) in (None, "false"):
+                self.countResult(False)
+                return
+
+            try:
+                result = taskResult(task, self.workerId, output=self.handlers[taskType](task))
+            except Exception as e:
+                result = taskResult(task, self.workerId, error=e)
+            if self.controller != None:
+                # The time a handler thread is held, ack included
+                self.controller.observeHandler(taskType, time.time() - started)
+
+            def published(future):
+                error = future.exception()
+                if error != None:
+                    sys.stderr.write("Task " + task["taskId"] + " of " + taskType + " failed: " + str(error) + "\n")
+                self.countResult(error == None and result["status"] != "FAILED")
+            self.publisher.publish(result).addDoneCallback(published)
+        except Exception as e:
+            self.countResult(False)
+            sys.stderr.write("Task " + str(task.get("taskId")) + " of " + taskType + " failed: " + str(e) + "\n")
+        finally:
+            self.releaseSlot()
+
+    def run(self):
+        """Poll and execute tasks until stop() is called or the process is interrupted"""
+
+        self.publisher = ResultPublisher(threads=self.publishThreads)
+        if self.adaptive:
+            self.controller = AdaptivePollController(self.handlers, maxBatch=self.batchSize, pollTimeout=self.pollTimeout, minInterval=self.minPollInterval, maxInterval=self.maxPollInterval)
+            self.controller.start()
+        pool = AsyncClient(maxConcurrency=self.threads)
+        pollers = []
+        for taskType in self.handlers:
+            poller = threading.Thread(target=self.pollLoop, args=(taskType, pool), name="conductor-poll-" + taskType)
+            poller.daemon = True
+            poller.start()
+            pollers.append(poller)
+
+        try:
+            while not self.stopped.wait(1):
+                pass
+        except KeyboardInterrupt:
+            self.stop()
+        finally:
+            if self.controller != None:
+                self.controller.stop()
+            for poller in pollers:
+                poller.join()
+            # Let the tasks already acked finish and post their results
+            pool.shutdown()
+            self.publisher.close()
+
+
+#########################################################################################
+# Bulk Operations #                                                                     #
+#########################################################################################
+
+def readWorkflowRecords(stream, format='jsonl'):
+    """Yield (lineNumber, record) for each {name, version, correlationId, input} record of stream
+        format is 'jsonl' (one JSON object per line) or 'csv' (header row naming the columns,
+        input given as a JSON string). Records that cannot be parsed are yielded as exceptions.
+    """
+
+    if format == 'csv':
+        import csv
+        reader = csv.DictReader(stream)
+        for row in reader:
+            try:
+                record = dict((key, value) for key, value in row.items() if value not in (None, ''))
+                if 'input' in record:
+                    record['input'] = json.loads(record['input'])
+            except ValueError as e:
+                record = e
+            yield reader.line_num, record
+        return
+
+    lineNumber = 0
+    for line in stream:
+        lineNumber += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            record = e
+        yield lineNumber, record
+
+def startWorkflowRecord(record, rateLimiter=None):
+    """Start the workflow described by a bulk record, returning its workflow instance id
+        Raises ValueError for an invalid record and RuntimeError for a non 2xx response
+    """
+
+    if isinstance(record, Exception):
+        raise record
+    if not isinstance(record, dict) or not record.get('name'):
+        raise ValueError("Record has no workflow name")
+
+    path = startWorkflowPath(record['name'], record.get('version'), record.get('correlationId'))
+    body = json.dumps(record.get('input', {}))
+    if rateLimiter != None:
+        rateLimiter.acquire()
+
+    response, responseData = httpPost(path, body)
+    if response.status < 200 or response.status >= 300:
+        raise RuntimeError("Status " + str(response.status) + ": " + responseData)
+    return responseData
+
+def bulkStartWorkflow(records, workers=16, rate=None, output=sys.stdout):
+    """Start the workflows of (lineNumber, record) pairs concurrently
+        Writes one JSON line per record to output, in completion order, with either the
+        workflowId or the error. Returns (started, failed) counts.
+    """
+
+    client = AsyncClient(maxConcurrency=workers)
+    rateLimiter = None
+    if rate != None:
+        rateLimiter = RateLimiter(rate)
+
+    started = 0
+    failed = 0
+    try:
+        for (lineNumber, record), future in client.imapUnordered(lambda item: startWorkflowRecord(item[1], rateLimiter), records):
+            result = {"line": lineNumber}
+            if isinstance(record, dict) and record.get('correlationId') != None:
+                result["correlationId"] = record['correlationId']
+
+            error = future.exception()
+            if error == None:
+                result["workflowId"] = future.result()
+                started += 1
+            else:
+                result["error"] = str(error)
+                failed += 1
+            output.write(json.dumps(result) + "\n")
+    finally:
+        output.flush()
+        client.shutdown()
+
+    return started, failed
+
+# Workflow actions that can be applied in bulk, each taking a workflow id
+workflowActions = {
+    'retryWorkflow': retryWorkflow,
+    'restartWorkflow': restartWorkflow,
+    'pauseWorkflow': pauseWorkflow,
+    'resumeWorkflow': resumeWorkflow,
+    'stopWorkflow': stopWorkflow,
+    'removeWorkflow': removeWorkflow,
+}
+
+def readWorkflowIds(stream):
+    """Yield the workflow ids of stream, one per line, skipping blank lines and # comments"""
+
+    for line in stream:
+        workflowId = line.strip()
+        if workflowId and not workflowId.startswith("#"):
+            yield workflowId
+
+def searchWorkflowIds(query=None, freeText='*', pageSize=100):
+    """Return the ids of every workflow matching a search, without duplicates
+        The ids are collected before anything acts on them, since acting on the workflows
+        changes which of them match the query and would shift the pages of a live search.
+    """
+
+    workflowIds = []
+    seen = set()
+    for summary in iterSearchWorkflows(query=query, freeText=freeText, pageSize=pageSize):
+        workflowId = summary.get("workflowId")
+        if workflowId and workflowId not in seen:
+            seen.add(workflowId)
+            workflowIds.append(workflowId)
+    return workflowIds
+
+def writeProgress(progress, succeeded, failed):
+    progress.write("\rProcessed " + str(succeeded + failed) + " workflows (" + str(succeeded) + " succeeded, " + str(failed) + " failed)")
+    progress.flush()
+
+def bulkWorkflowAction(action, workflowIds, concurrency=16, reason=None, dryRun=False, checkpoint=None, output=sys.stdout, progress=sys.stderr):
+    """Apply a workflowActions action to every workflow id of workflowIds concurrently
+        Writes one JSON line per workflow to output and a running counter to progress, never
+        to output itself since the counter would corrupt the NDJSON results.
+        Ids listed in the checkpoint file are skipped, and every id the action succeeds on
+        is appended to it, so an interrupted run can be resumed with the same checkpoint.
+        With dryRun the ids are only listed. Returns (succeeded, failed) counts.
+    """
+
+    function = workflowActions[action]
+    if progress is output:
+        progress = None
+    completed = set()
+    if checkpoint != None and os.path.exists(checkpoint):
+        with open(checkpoint) as checkpointFile:
+            completed = set(readWorkflowIds(checkpointFile))
+
+    def pendingIds():
+        for workflowId in workflowIds:
+            if workflowId not in completed:
+                completed.add(workflowId)
+                yield workflowId
+
+    if dryRun:
+        count = 0
+        for workflowId in pendingIds():
+            output.write(json.dumps({"workflowId": workflowId, "action": action, "dryRun": True}) + "\n")
+            count += 1
+        output.flush()
+        return count, 0
+
+    def apply(workflowId):
+        if action == 'stopWorkflow':
+            result = function(workflowId, reason)
+        else:
+            result = function(workflowId)
+        if result == None:
+            raise RuntimeError("Status " + str(getLastStatus()))
+        return result
+
+    client = AsyncClient(maxConcurrency=concurrency)
+    checkpointFile = open(checkpoint, "a") if checkpoint != None else None
+    succeeded = 0
+    failed = 0
+    lastProgress = 0
+    try:
+        for workflowId, future in client.imapUnordered(apply, pendingIds()):
+            result = {"workflowId": workflowId, "action": action}
+            error = future.exception()
+            if error == None:
+                result["ok"] = True
+                succeeded += 1
+                if checkpointFile != None:
+                    checkpointFile.write(workflowId + "\n")
+                    checkpointFile.flush()
+            else:
+                result["ok"] = False
+                result["error"] = str(error)
+                failed += 1
+            output.write(json.dumps(result) + "\n")
+            if progress != None and time.time() - lastProgress >= 0.5:
+                lastProgress = time.time()
+                writeProgress(progress, succeeded, failed)
+    finally:
+        output.flush()
+        if progress != None:
+            writeProgress(progress, succeeded, failed)
+            progress.write("\n")
+        if checkpointFile != None:
+            checkpointFile.close()
+        client.shutdown()
+
+    return succeeded, failed
+
+def uniqueWorkflowIds(workflowIds):
+    """Yield every workflow id of workflowIds once, in order of first appearance"""
+
+    seen = set()
+    for workflowId in workflowIds:
+        if workflowId not in seen:
+            seen.add(workflowId)
+            yield workflowId
+
+def fetchWorkflow(workflowId, includeTasks='true'):
+    """Return the Conductor Workflow Instance with given workflowId (dict), raising RuntimeError if the request fails"""
+
+    responseJSON = getWorkflow(workflowId, includeTasks)
+    if responseJSON == None:
+        raise RuntimeError("Status " + str(getLastStatus()) + ": getWorkflow failed for " + workflowId)
+    return json.loads(responseJSON)
+
+def getWorkflows(workflowIds, includeTasks='true', needsTasks=None, concurrency=16):
+    """Yield (workflowId, workflow, error) for every distinct id of workflowIds, in completion order
+        Ids are read lazily, so workflowIds may be a stream, and up to concurrency workflows
+        are fetched at once. With needsTasks, a function(workflow) -> bool, each workflow is
+        first fetched without its tasks and fetched again with them only when needsTasks
+        returns True. workflow is None and error the exception when a fetch failed.
+    """
+
+    def fetch(workflowId):
+        if needsTasks == None:
+            return fetchWorkflow(workflowId, includeTasks)
+        workflow = fetchWorkflow(workflowId, 'false')
+        if needsTasks(workflow):
+            workflow = fetchWorkflow(workflowId, 'true')
+        return workflow
+
+    client = AsyncClient(maxConcurrency=concurrency)
+    try:
+        for workflowId, future in client.imapUnordered(fetch, uniqueWorkflowIds(workflowIds)):
+            error = future.exception()
+            if error == None:
+                yield workflowId, future.result(), None
+            else:
+                yield workflowId, None, error
+    finally:
+        client.shutdown()
+
+# Workflow statuses an ExecutionCache serves without asking Conductor Server. FAILED,
+# TERMINATED and TIMED_OUT workflows can still be retried or restarted from anywhere, so
+# they are checked like running ones.
+finalWorkflowStatuses = frozenset(["COMPLETED"])
+
+# Every live ExecutionCache, see invalidateCachedWorkflow()
+executionCaches = weakref.WeakSet()
+executionCachesLock = threading.Lock()
+
+def invalidateCachedWorkflow(workflowId):
+    """Drop workflowId from every ExecutionCache of this process, once it was retried, restarted, rerun or removed"""
+
+    with executionCachesLock:
+        caches = list(executionCaches)
+    for cache in caches:
+        cache.invalidate(workflowId)
+
+class ExecutionCache(object):
+    """Cache of workflow executions that only asks Conductor Server about workflows that can still change
+
+        COMPLETED workflows are kept for good and served without any request. Any other
+        cached workflow is fetched again without its tasks first, and with them only if its
+        updateTime moved since it was cached. When a directory is given every entry is also
+        stored there, so that separate invocations share the cache. Workflows retried,
+        restarted, rerun or removed through this module are invalidated in every cache of
+        the process; one restarted or rerun elsewhere must be invalidated explicitly.
+
+            cache = ExecutionCache(directory="executions")
+            for workflowId, workflow, error in cache.getWorkflows(watchList):
+                ...
+    """
+
+    def __init__(self, directory=None, concurrency=16):
+        self.directory = directory
+        self.concurrency = concurrency
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.hits = 0
+        self.unchanged = 0
+        self.fetched = 0
+        if directory != None and not os.path.isdir(directory):
+            os.makedirs(directory)
+        with executionCachesLock:
+            executionCaches.add(self)
+
+    def entryFile(self, workflowId):
+        return os.path.join(self.directory, urllib.quote(workflowId, safe='') + ".json")
+
+    def lookup(self, workflowId):
+        """Return the cached (workflow, withTasks) of workflowId, or None"""
+
+        with self.lock:
+            entry = self.entries.get(workflowId)
+        if entry == None and self.directory != None:
+            try:
+                with open(self.entryFile(workflowId)) as entryFile:
+                    stored = json.load(entryFile)
+                entry = (stored["workflow"], stored["withTasks"])
+            except (IOError, ValueError, KeyError):
+                return None
+            with self.lock:
+                self.entries[workflowId] = entry
+        return entry
+
+    def store(self, workflow, withTasks):
+        workflowId = workflow["workflowId"]
+        with self.lock:
+            self.entries[workflowId] = (workflow, withTasks)
+        if self.directory != None:
+            # Write then rename so concurrent invocations never read a partial entry
+            tempFile = self.entryFile(workflowId) + "." + str(os.getpid()) + "." + str(threading.current_thread().ident) + ".tmp"
+            with open(tempFile, "w") as entryFile:
+                json.dump({"workflow": workflow, "withTasks": withTasks}, entryFile)
+            os.rename(tempFile, self.entryFile(workflowId))
+
+    def invalidate(self, workflowId):
+        with self.lock:
+            self.entries.pop(workflowId, None)
+        if self.directory != None and os.path.exists(self.entryFile(workflowId)):
+            os.remove(self.entryFile(workflowId))
+
+    def fetch(self, workflowId, includeTasks):
+        """Return the current workflowId, making as few and as small requests as the cache allows"""
+
+        entry = self.lookup(workflowId)
+        if entry == None:
+            workflow = fetchWorkflow(workflowId, includeTasks)
+            withTasks = includeTasks == 'true'
+        else:
+            cached, cachedWithTasks = entry
+            workflow = fetchWorkflow(workflowId, 'false')
+            if workflow.get("updateTime") == cached.get("updateTime") and (cachedWithTasks or includeTasks != 'true'):
+                with self.lock:
+                    self.unchanged += 1
+                return cached if includeTasks == 'true' else workflow
+            withTasks = False
+            if includeTasks == 'true':
+                workflow = fetchWorkflow(workflowId, 'true')
+                withTasks = True
+
+        with self.lock:
+            self.fetched += 1
+        self.store(workflow, withTasks)
+        return workflow
+
+    def getWorkflows(self, workflowIds, includeTasks='true'):
+        """Yield (workflowId, workflow, error) for every distinct id of workflowIds, like getWorkflows()
+            COMPLETED workflows found in the cache are yielded without any request, the others
+            are refreshed concurrently; all are yielded in completion order.
+        """
+
+        def remoteIds():
+            for workflowId in uniqueWorkflowIds(workflowIds):
+                entry = self.lookup(workflowId)
+                if entry != None and entry[0].get("status") in finalWorkflowStatuses and (entry[1] or includeTasks != 'true'):
+                    with self.lock:
+                        self.hits += 1
+                    cachedWorkflows.put(entry[0])
+                else:
+                    yield workflowId
+
+        cachedWorkflows = Queue.Queue()
+        client = AsyncClient(maxConcurrency=self.concurrency)
+        try:
+            for workflowId, future in client.imapUnordered(lambda workflowId: self.fetch(workflowId, includeTasks), remoteIds()):
+                while not cachedWorkflows.empty():
+                    workflow = cachedWorkflows.get()
+                    yield workflow["workflowId"], workflow, None
+                error = future.exception()
+                if error == None:
+                    yield workflowId, future.result(), None
+                else:
+                    yield workflowId, None, error
+            while not cachedWorkflows.empty():
+                workflow = cachedWorkflows.get()
+                yield workflow["workflowId"], workflow, None
+        finally:
+            client.shutdown()
+
+    def refresh(self, includeTasks='true'):
+        """Bring every cached workflow that is not COMPLETED up to date, yielding them like getWorkflows()"""
+
+        with self.lock:
+            workflowIds = set(self.entries)
+        if self.directory != None:
+            workflowIds.update(urllib.unquote(name[:-len(".json")]) for name in os.listdir(self.directory) if name.endswith(".json"))
+        activeIds = []
+        for workflowId in workflowIds:
+            entry = self.lookup(workflowId)
+            if entry != None and entry[0].get("status") not in finalWorkflowStatuses:
+                activeIds.append(workflowId)
+        return self.getWorkflows(activeIds, includeTasks)
+
+
+#########################################################################################
+# Queue Monitoring #                                                                    #
+#########################################################################################
+
+class QueueRates(object):
+    """Estimate per task type queue rates from successive queue size samples
+
+        Queue sizes alone only tell the net rate of change, so netRate (tasks/second, an
+        exponentially weighted moving average) is positive while a queue grows and negative
+        while it drains; timeToDrain extrapolates the current drain rate to an empty queue.
+    """
+
+    def __init__(self, smoothing=0.3):
+        self.smoothing = smoothing
+        self.previous = {}
+        self.rates = {}
+
+    def update(self, timestamp, sizes):
+        """Return one sample record per task type of sizes, a {taskType: size} dict taken at timestamp"""
+
+        records = []
+        for taskType in sorted(sizes):
+            size = sizes[taskType]
+            record = {"time": round(timestamp, 3), "taskType": taskType, "size": size, "netRate": None, "drainRate": None, "timeToDrain": None}
+
+            previous = self.previous.get(taskType)
+            if previous != None and timestamp > previous[0]:
+                rate = (size - previous[1]) / (timestamp - previous[0])
+                if taskType in self.rates:
+                    rate = self.smoothing * rate + (1 - self.smoothing) * self.rates[taskType]
+                self.rates[taskType] = rate
+                record["netRate"] = round(rate, 3)
+                record["drainRate"] = round(max(0.0, -rate), 3)
+                if rate < 0:
+                    record["timeToDrain"] = round(size / -rate, 1)
+
+            self.previous[taskType] = (timestamp, size)
+            records.append(record)
+        return records
+
+
+def csvValue(value):
+    if value == None:
+        return ""
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+class TimeSeriesWriter(object):
+    """Append records to stdout or a file as CSV or NDJSON, rotating the file by size
+
+        When the file reaches maxBytes it is renamed to <path>.1 (older files shifting up to
+        <path>.<backupCount>) and a new file is started, with its own CSV header.
+    """
+
+    columns = ["time", "taskType", "size", "netRate", "drainRate", "timeToDrain"]
+
+    def __init__(self, path=None, format='csv', maxBytes=None, backupCount=5):
+        self.path = path
+        self.format = format
+        self.maxBytes = maxBytes
+        self.backupCount = backupCount
+        self.stream = None
+        self.open()
+
+    def open(self):
+        if self.path == None:
+            self.stream = sys.stdout
+        else:
+            self.stream = open(self.path, "a")
+        if self.format == 'csv' and (self.path == None or self.stream.tell() == 0):
+            self.stream.write(",".join(TimeSeriesWriter.columns) + "\n")
+
+    def rotate(self):
+        self.stream.close()
+        for index in range(self.backupCount - 1, 0, -1):
+            if os.path.exists(self.path + "." + str(index)):
+                os.rename(self.path + "." + str(index), self.path + "." + str(index + 1))
+        if self.backupCount > 0:
+            os.rename(self.path, self.path + ".1")
+        else:
+            os.remove(self.path)
+        self.open()
+
+    def write(self, records):
+        for record in records:
+            if self.format == 'csv':
+                values = [record.get(column) for column in TimeSeriesWriter.columns]
+                self.stream.write(",".join(csvValue(value) for value in values) + "\n")
+            else:
+                self.stream.write(json.dumps(record) + "\n")
+        self.stream.flush()
+        if self.path != None and self.maxBytes != None and self.stream.tell() >= self.maxBytes:
+            self.rotate()
+
+    def close(self):
+        if self.path != None:
+            self.stream.close()
+
+
+def sampleQueueSizes(taskTypes=None):
+    """Return {taskType: size} for taskTypes, or for every queue when no task types are given"""
+
+    if taskTypes:
+        responseJSON = getTaskTypeQueueSizes(json.dumps(list(taskTypes)))
+    else:
+        responseJSON = getTasksQueue()
+    if responseJSON == None:
+        raise RuntimeError("Queue size request failed with status " + str(getLastStatus()))
+    return json.loads(responseJSON)
+
+def monitorQueues(taskTypes, writer, interval=5, samples=None):
+    """Sample the queue sizes of taskTypes every interval seconds and write them with their rates
+        Samples are taken on a fixed schedule so slow requests do not make the series drift;
+        the slots a slow sample overran are skipped rather than caught up in a burst.
+        Runs until interrupted, or for samples samples if given.
+    """
+
+    rates = QueueRates()
+    start = time.time()
+    taken = 0
+    slot = 0
+    while samples == None or taken < samples:
+        try:
+            sizes = sampleQueueSizes(taskTypes)
+            writer.write(rates.update(time.time(), sizes))
+        except (RuntimeError, ValueError, httplib.HTTPException, socket.error) as e:
+            sys.stderr.write("Queue size sample failed: " + str(e) + "\n")
+        taken += 1
+
+        if samples != None and taken >= samples:
+            break
+        # A single clock reading, a negative sleep raises IOError on Python 2
+        now = time.time()
+        slot = max(slot + 1, int((now - start) / interval) + 1)
+        time.sleep(max(0, start + slot * interval - now))
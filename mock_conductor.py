@@ -0,0 +1,675 @@
+import sys
+import argparse
+import BaseHTTPServer, SocketServer
+import collections
+import json
+import random
+import re
+import socket
+import threading
+import time
+import urlparse
+import uuid
+import zlib
+
+#########################################################################################
+# Mock Conductor Server #                                                               #
+#########################################################################################
+
+# Lightweight in-memory stand-in for the Conductor Server REST API, to measure the
+# throughput and failure handling of conductor_client without a real server:
+#
+#   python mock_conductor.py --port 8080 --latency 5 --jitter 2 --errorRate 0.01
+#
+# Workflows run their SIMPLE tasks in sequence: starting a workflow schedules its first
+# task, and every COMPLETED updateTask schedules the next one until the workflow completes.
+# Polled tasks that are not updated within their responseTimeoutSeconds are requeued.
+
+TERMINAL_WORKFLOW_STATUSES = frozenset(["COMPLETED", "FAILED", "TERMINATED", "TIMED_OUT"])
+
+def now():
+    return int(time.time() * 1000)
+
+
+class HttpError(Exception):
+    """Error response of the mock server"""
+
+    def __init__(self, status, message):
+        Exception.__init__(self, message)
+        self.status = status
+
+
+class ConductorState(object):
+    """Workflows, tasks, task queues and metadata of the mock server, guarded by one lock"""
+
+    def __init__(self):
+        self.lock = threading.Condition()
+        self.taskDefs = {}
+        self.workflowDefs = {}
+        self.workflows = collections.OrderedDict()
+        self.tasks = {}
+        self.queues = collections.defaultdict(collections.deque)
+
+    # Metadata #
+
+    def putTaskDefs(self, taskDefs):
+        with self.lock:
+            for taskDef in taskDefs:
+                if not taskDef.get("name"):
+                    raise HttpError(400, "Task definition has no name")
+                taskDef.setdefault("responseTimeoutSeconds", 3600)
+                taskDef["updateTime"] = now()
+                self.taskDefs[taskDef["name"]] = taskDef
+
+    def getTaskDef(self, name):
+        with self.lock:
+            if name not in self.taskDefs:
+                raise HttpError(404, "No such task definition " + name)
+            return self.taskDefs[name]
+
+    def deleteTaskDef(self, name):
+        with self.lock:
+            if self.taskDefs.pop(name, None) == None:
+                raise HttpError(404, "No such task definition " + name)
+
+    def putWorkflowDefs(self, workflowDefs):
+        with self.lock:
+            for workflowDef in workflowDefs:
+                if not workflowDef.get("name"):
+                    raise HttpError(400, "Workflow definition has no name")
+                workflowDef.setdefault("version", 1)
+                workflowDef.setdefault("tasks", [])
+                workflowDef["updateTime"] = now()
+                self.workflowDefs.setdefault(workflowDef["name"], {})[workflowDef["version"]] = workflowDef
+
+    def getWorkflowDef(self, name, version=None):
+        with self.lock:
+            versions = self.workflowDefs.get(name)
+            if not versions:
+                raise HttpError(404, "No such workflow defined. name=" + name)
+            if version == None:
+                version = max(versions)
+            if version not in versions:
+                raise HttpError(404, "No such workflow defined. name=" + name + ", version=" + str(version))
+            return versions[version]
+
+    def allWorkflowDefs(self):
+        with self.lock:
+            return [workflowDef for versions in self.workflowDefs.values() for workflowDef in versions.values()]
+
+    # Workflows #
+
+    def startWorkflow(self, name, version, correlationId, workflowInput):
+        workflowDef = self.getWorkflowDef(name, version)
+        with self.lock:
+            workflowId = str(uuid.uuid4())
+            self.workflows[workflowId] = {
+                "workflowId": workflowId,
+                "workflowType": name,
+                "workflowName": name,
+                "version": workflowDef["version"],
+                "correlationId": correlationId,
+                "input": workflowInput,
+                "output": {},
+                "status": "RUNNING",
+                "startTime": now(),
+                "updateTime": now(),
+                "endTime": 0,
+                "tasks": [],
+            }
+            self.scheduleNext(self.workflows[workflowId], workflowDef)
+            return workflowId
+
+    def scheduleNext(self, workflow, workflowDef=None):
+        """Schedule the task after the last one of workflow, or complete it if there is none left"""
+
+        if workflowDef == None:
+            workflowDef = self.getWorkflowDef(workflow["workflowType"], workflow["version"])
+        position = len(workflow["tasks"])
+        workflow["updateTime"] = now()
+        if position >= len(workflowDef["tasks"]):
+            workflow["status"] = "COMPLETED"
+            workflow["endTime"] = now()
+            if workflow["tasks"]:
+                workflow["output"] = workflow["tasks"][-1].get("outputData", {})
+            return
+
+        taskDef = workflowDef["tasks"][position]
+        task = {
+            "taskId": str(uuid.uuid4()),
+            "taskType": taskDef.get("name"),
+            "taskDefName": taskDef.get("name"),
+            "referenceTaskName": taskDef.get("taskReferenceName", taskDef.get("name")),
+            "status": "SCHEDULED",
+            "workflowInstanceId": workflow["workflowId"],
+            "workflowType": workflow["workflowType"],
+            "correlationId": workflow["correlationId"],
+            "inputData": dict(workflow["input"]) if isinstance(workflow["input"], dict) else {},
+            "outputData": {},
+            "seq": position + 1,
+            "pollCount": 0,
+            "scheduledTime": now(),
+            "startTime": 0,
+            "endTime": 0,
+            "updateTime": now(),
+        }
+        workflow["tasks"].append(task)
+        self.tasks[task["taskId"]] = task
+        self.queues[task["taskType"]].append(task["taskId"])
+        self.lock.notify_all()
+
+    def getWorkflow(self, workflowId, includeTasks=True):
+        with self.lock:
+            workflow = self.workflows.get(workflowId)
+            if workflow == None:
+                raise HttpError(404, "No such workflow found by id: " + workflowId)
+            workflow = dict(workflow)
+            workflow["tasks"] = [dict(task) for task in workflow["tasks"]] if includeTasks else []
+            return workflow
+
+    def search(self, start, size, freeText, query):
+        matches = parseQuery(query)
+        with self.lock:
+            results = [workflow for workflow in self.workflows.values()
+                       if matches(workflow) and (freeText in ("", "*") or freeText in workflow["workflowId"] or freeText == workflow["correlationId"])]
+            summaries = [workflowSummary(workflow) for workflow in results[start:start + size]]
+            return {"totalHits": len(results), "results": summaries}
+
+    def setWorkflowStatus(self, workflowId, status, allowed):
+        with self.lock:
+            workflow = self.workflows.get(workflowId)
+            if workflow == None:
+                raise HttpError(404, "No such workflow found by id: " + workflowId)
+            if workflow["status"] not in allowed:
+                raise HttpError(409, "Workflow " + workflowId + " is " + workflow["status"])
+            workflow["status"] = status
+            workflow["updateTime"] = now()
+            if status in TERMINAL_WORKFLOW_STATUSES:
+                workflow["endTime"] = now()
+                for task in workflow["tasks"]:
+                    if task["status"] in ("SCHEDULED", "IN_PROGRESS"):
+                        task["status"] = "CANCELED"
+
+    def retryWorkflow(self, workflowId):
+        with self.lock:
+            workflow = self.workflows.get(workflowId)
+            if workflow == None:
+                raise HttpError(404, "No such workflow found by id: " + workflowId)
+            if workflow["status"] not in ("FAILED", "TIMED_OUT", "TERMINATED"):
+                raise HttpError(409, "Workflow " + workflowId + " is " + workflow["status"])
+            if workflow["tasks"] and workflow["tasks"][-1]["status"] != "COMPLETED":
+                workflow["tasks"].pop()
+            workflow["status"] = "RUNNING"
+            workflow["endTime"] = 0
+            self.scheduleNext(workflow)
+
+    def restartWorkflow(self, workflowId):
+        with self.lock:
+            workflow = self.workflows.get(workflowId)
+            if workflow == None:
+                raise HttpError(404, "No such workflow found by id: " + workflowId)
+            if workflow["status"] not in TERMINAL_WORKFLOW_STATUSES:
+                raise HttpError(409, "Workflow " + workflowId + " is " + workflow["status"])
+            for task in workflow["tasks"]:
+                self.tasks.pop(task["taskId"], None)
+            workflow["tasks"] = []
+            workflow["status"] = "RUNNING"
+            workflow["startTime"] = now()
+            workflow["endTime"] = 0
+            self.scheduleNext(workflow)
+
+    def removeWorkflow(self, workflowId):
+        with self.lock:
+            workflow = self.workflows.pop(workflowId, None)
+            if workflow == None:
+                raise HttpError(404, "No such workflow found by id: " + workflowId)
+            for task in workflow["tasks"]:
+                self.tasks.pop(task["taskId"], None)
+
+    # Tasks #
+
+    def poll(self, taskType, workerId, count, timeout):
+        """Take up to count scheduled tasks of taskType, waiting up to timeout seconds for the first"""
+
+        deadline = time.time() + timeout
+        with self.lock:
+            queue = self.queues[taskType]
+            while not queue and time.time() < deadline:
+                self.lock.wait(deadline - time.time())
+
+            polled = []
+            while queue and len(polled) < count:
+                task = self.tasks.get(queue.popleft())
+                if task == None or task["status"] != "SCHEDULED":
+                    continue
+                task["status"] = "IN_PROGRESS"
+                task["workerId"] = workerId
+                task["pollCount"] += 1
+                task["startTime"] = now()
+                task["updateTime"] = now()
+                polled.append(dict(task))
+            return polled
+
+    def ack(self, taskId):
+        with self.lock:
+            task = self.tasks.get(taskId)
+            return task != None and task["status"] == "IN_PROGRESS"
+
+    def updateTask(self, result):
+        with self.lock:
+            task = self.tasks.get(result.get("taskId"))
+            if task == None:
+                raise HttpError(404, "No such task found by id: " + str(result.get("taskId")))
+            workflow = self.workflows.get(task["workflowInstanceId"])
+            if task["status"] not in ("IN_PROGRESS", "SCHEDULED") or workflow == None or workflow["status"] != "RUNNING":
+                return task["taskId"]
+
+            status = result.get("status", "COMPLETED")
+            task["outputData"] = result.get("outputData", {})
+            task["updateTime"] = now()
+            if status == "IN_PROGRESS":
+                task["callbackAfter"] = time.time() + result.get("callbackAfterSeconds", 0)
+                return task["taskId"]
+
+            task["status"] = status
+            task["endTime"] = now()
+            if status == "COMPLETED":
+                self.scheduleNext(workflow)
+            else:
+                task["reasonForIncompletion"] = result.get("reasonForIncompletion")
+                workflow["status"] = "FAILED"
+                workflow["endTime"] = now()
+                workflow["updateTime"] = now()
+                workflow["reasonForIncompletion"] = result.get("reasonForIncompletion")
+            return task["taskId"]
+
+    def getTask(self, taskId):
+        with self.lock:
+            if taskId not in self.tasks:
+                raise HttpError(404, "No such task found by id: " + taskId)
+            return dict(self.tasks[taskId])
+
+    def queueSizes(self, taskTypes=None):
+        with self.lock:
+            if taskTypes == None:
+                taskTypes = self.queues.keys()
+            return dict((taskType, len(self.queues.get(taskType, ()))) for taskType in taskTypes)
+
+    def tasksWithStatus(self, taskType, status):
+        with self.lock:
+            tasks = [task for task in self.tasks.values() if task["taskType"] == taskType and task["status"] == status]
+            tasks.sort(key=lambda task: task["taskId"])
+            return [dict(task) for task in tasks]
+
+    def requeueTimedOut(self):
+        """Put back in progress tasks whose worker went silent for responseTimeoutSeconds, or whose callback is due"""
+
+        current = time.time()
+        with self.lock:
+            for task in self.tasks.values():
+                if task["status"] != "IN_PROGRESS":
+                    continue
+                callbackAfter = task.get("callbackAfter")
+                if callbackAfter == None:
+                    timeout = self.taskDefs.get(task["taskType"], {}).get("responseTimeoutSeconds", 3600)
+                    if current - task["updateTime"] / 1000.0 < timeout:
+                        continue
+                elif current < callbackAfter:
+                    continue
+                task.pop("callbackAfter", None)
+                task["status"] = "SCHEDULED"
+                self.queues[task["taskType"]].append(task["taskId"])
+            self.lock.notify_all()
+
+
+def workflowSummary(workflow):
+    summary = dict((key, value) for key, value in workflow.items() if key not in ("tasks", "input", "output"))
+    summary["input"] = json.dumps(workflow["input"])
+    summary["output"] = json.dumps(workflow["output"])
+    return summary
+
+def parseQuery(query):
+    """Return a predicate for a search query made of 'field = value' and 'field IN (a,b)' clauses joined by AND"""
+
+    clauses = []
+    for clause in re.split(r"\s+AND\s+", query or "", flags=re.IGNORECASE):
+        clause = clause.strip()
+        if not clause:
+            continue
+        match = re.match(r"^(\w+)\s+IN\s*\((.*)\)$", clause, re.IGNORECASE) or re.match(r"^(\w+)\s*=\s*(.*)$", clause)
+        if match == None:
+            raise HttpError(400, "Unsupported query clause: " + clause)
+        values = set(value.strip().strip("'\"") for value in match.group(2).split(","))
+        clauses.append((match.group(1), values))
+
+    return lambda workflow: all(str(workflow.get(field)) in values for field, values in clauses)
+
+
+#########################################################################################
+# HTTP Server #                                                                         #
+#########################################################################################
+
+class MockConductorHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Route requests to the ConductorState of the server, with injected latency and errors"""
+
+    protocol_version = "HTTP/1.1"
+    # Buffer the whole response and send it without Nagle delays, like a real server would
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    routes = []
+
+    def setup(self):
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+        with self.server.connectionsLock:
+            self.server.connections.add(self.connection)
+
+    def finish(self):
+        with self.server.connectionsLock:
+            self.server.connections.discard(self.connection)
+        BaseHTTPServer.BaseHTTPRequestHandler.finish(self)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPServer.BaseHTTPRequestHandler.log_message(self, format, *args)
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def do_PUT(self):
+        self.dispatch("PUT")
+
+    def do_DELETE(self):
+        self.dispatch("DELETE")
+
+    def dispatch(self, method):
+        url = urlparse.urlparse(self.path)
+        self.query = dict((key, values[-1]) for key, values in urlparse.parse_qs(url.query, keep_blank_values=True).items())
+        length = int(self.headers.get("Content-Length") or 0)
+        self.body = self.rfile.read(length) if length else ""
+        if self.headers.get("Content-Encoding", "").lower() == "gzip":
+            self.body = zlib.decompress(self.body, 16 + zlib.MAX_WBITS)
+
+        server = self.server
+        if server.latency or server.jitter:
+            time.sleep(max(0.0, random.gauss(server.latency, server.jitter)) / 1000.0)
+        if server.errorRate and random.random() < server.errorRate:
+            self.reply(server.errorStatus, {"status": server.errorStatus, "message": "Injected error"}, {"Retry-After": "1"})
+            return
+
+        for routeMethod, pattern, handler in MockConductorHandler.routes:
+            match = pattern.match(url.path)
+            if routeMethod == method and match != None:
+                try:
+                    status, body = handler(self, server.state, *[urlparse.unquote(group) for group in match.groups()])
+                except HttpError as e:
+                    status, body = e.status, {"status": e.status, "message": str(e)}
+                except ValueError as e:
+                    status, body = 400, {"status": 400, "message": str(e)}
+                self.reply(status, body)
+                return
+        self.reply(404, {"status": 404, "message": "No route for " + method + " " + url.path})
+
+    def reply(self, status, body, headers=None):
+        if body == None:
+            data, contentType = "", "application/json"
+        elif isinstance(body, basestring):
+            data, contentType = body, "text/plain"
+        else:
+            data, contentType = json.dumps(body), "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", contentType)
+        if self.server.compress and len(data) >= 1024 and "gzip" in self.headers.get("Accept-Encoding", ""):
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            data = compressor.compress(data) + compressor.flush()
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def json(self):
+        return json.loads(self.body or "null")
+
+    def flag(self, name, default):
+        return self.query.get(name, default).lower() == "true"
+
+
+def route(method, path):
+    """Register the decorated function(handler, state, *pathParameters) -> (status, body) for method and path"""
+
+    pattern = re.compile("^" + re.sub(r"\{[^}]+\}", "([^/]+)", path) + "$")
+
+    def register(function):
+        MockConductorHandler.routes.append((method, pattern, function))
+        return function
+    return register
+
+
+# Metadata #
+@route("GET", "/api/metadata/taskdefs")
+def getAllTaskDefs(handler, state):
+    return 200, state.taskDefs.values()
+
+@route("POST", "/api/metadata/taskdefs")
+def createTaskDefs(handler, state):
+    state.putTaskDefs(handler.json())
+    return 204, None
+
+@route("PUT", "/api/metadata/taskdefs")
+def modifyTaskDef(handler, state):
+    state.putTaskDefs([handler.json()])
+    return 204, None
+
+@route("GET", "/api/metadata/taskdefs/{taskType}")
+def getTaskDef(handler, state, taskType):
+    return 200, state.getTaskDef(taskType)
+
+@route("DELETE", "/api/metadata/taskdefs/{taskType}")
+def deleteTaskDef(handler, state, taskType):
+    state.deleteTaskDef(taskType)
+    return 204, None
+
+@route("GET", "/api/metadata/workflow")
+def getAllWorkflowDefs(handler, state):
+    return 200, state.allWorkflowDefs()
+
+@route("POST", "/api/metadata/workflow")
+def createWorkflowDef(handler, state):
+    state.putWorkflowDefs([handler.json()])
+    return 204, None
+
+@route("PUT", "/api/metadata/workflow")
+def modifyWorkflowDefs(handler, state):
+    state.putWorkflowDefs(handler.json())
+    return 204, None
+
+@route("GET", "/api/metadata/workflow/{name}")
+def getWorkflowDef(handler, state, name):
+    version = handler.query.get("version")
+    return 200, state.getWorkflowDef(name, int(version) if version else None)
+
+
+# Admin #
+@route("GET", "/api/admin/config")
+def getConfiguration(handler, state):
+    return 200, {"mock": "true"}
+
+@route("GET", "/api/admin/task/{taskType}")
+def getPendingTasks(handler, state, taskType):
+    start = int(handler.query.get("start", 0))
+    count = int(handler.query.get("count", 100))
+    return 200, state.tasksWithStatus(taskType, "SCHEDULED")[start:start + count]
+
+
+# Tasks #
+@route("GET", "/api/tasks/poll/batch/{taskType}")
+def batchPoll(handler, state, taskType):
+    count = int(handler.query.get("count", 1))
+    timeout = int(handler.query.get("timeout", 100)) / 1000.0
+    return 200, state.poll(taskType, handler.query.get("workerid"), count, timeout)
+
+@route("GET", "/api/tasks/poll/{taskType}")
+def poll(handler, state, taskType):
+    tasks = state.poll(taskType, handler.query.get("workerid"), 1, 0)
+    if not tasks:
+        return 204, None
+    return 200, tasks[0]
+
+@route("POST", "/api/tasks/{taskId}/ack")
+def ack(handler, state, taskId):
+    return 200, "true" if state.ack(taskId) else "false"
+
+@route("POST", "/api/tasks")
+def updateTask(handler, state):
+    return 200, state.updateTask(handler.json())
+
+@route("POST", "/api/tasks/queue/sizes")
+def queueSizes(handler, state):
+    return 200, state.queueSizes(handler.json())
+
+@route("GET", "/api/tasks/queue/all")
+def allQueueSizes(handler, state):
+    return 200, state.queueSizes()
+
+@route("GET", "/api/tasks/in_progress/{taskType}")
+def inProgressTasks(handler, state, taskType):
+    tasks = state.tasksWithStatus(taskType, "IN_PROGRESS")
+    startKey = handler.query.get("startKey")
+    if startKey:
+        tasks = [task for task in tasks if task["taskId"] > startKey]
+    return 200, tasks[:int(handler.query.get("count", 100))]
+
+@route("GET", "/api/tasks/{taskId}")
+def getTask(handler, state, taskId):
+    return 200, state.getTask(taskId)
+
+
+# Workflows #
+@route("GET", "/api/workflow/search")
+def search(handler, state):
+    start = int(handler.query.get("start", 0))
+    size = int(handler.query.get("size", 100))
+    return 200, state.search(start, size, handler.query.get("freeText", "*"), handler.query.get("query"))
+
+@route("POST", "/api/workflow/{name}")
+def startWorkflow(handler, state, name):
+    version = handler.query.get("version")
+    return 200, state.startWorkflow(name, int(version) if version else None, handler.query.get("correlationId"), handler.json() or {})
+
+@route("GET", "/api/workflow/{workflowId}")
+def getWorkflow(handler, state, workflowId):
+    return 200, state.getWorkflow(workflowId, handler.flag("includeTasks", "true"))
+
+@route("DELETE", "/api/workflow/{workflowId}")
+def terminateWorkflow(handler, state, workflowId):
+    state.setWorkflowStatus(workflowId, "TERMINATED", ("RUNNING", "PAUSED"))
+    return 204, None
+
+@route("PUT", "/api/workflow/{workflowId}/pause")
+def pauseWorkflow(handler, state, workflowId):
+    state.setWorkflowStatus(workflowId, "PAUSED", ("RUNNING",))
+    return 204, None
+
+@route("PUT", "/api/workflow/{workflowId}/resume")
+def resumeWorkflow(handler, state, workflowId):
+    state.setWorkflowStatus(workflowId, "RUNNING", ("PAUSED",))
+    return 204, None
+
+@route("POST", "/api/workflow/{workflowId}/retry")
+def retryWorkflow(handler, state, workflowId):
+    state.retryWorkflow(workflowId)
+    return 204, None
+
+@route("POST", "/api/workflow/{workflowId}/restart")
+def restartWorkflow(handler, state, workflowId):
+    state.restartWorkflow(workflowId)
+    return 204, None
+
+@route("DELETE", "/api/workflow/{workflowId}/remove")
+def removeWorkflow(handler, state, workflowId):
+    state.removeWorkflow(workflowId)
+    return 204, None
+
+
+class MockConductorServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """Threaded mock Conductor Server, port 0 picking a free port (see serverPort)
+
+            server = MockConductorServer(port=0, latency=2)
+            server.start()
+            ...
+            server.stop()
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(self, host="127.0.0.1", port=8080, latency=0, jitter=0, errorRate=0, errorStatus=503, compress=False, verbose=False):
+        BaseHTTPServer.HTTPServer.__init__(self, (host, port), MockConductorHandler)
+        self.state = ConductorState()
+        self.latency = latency
+        self.jitter = jitter
+        self.errorRate = errorRate
+        self.errorStatus = errorStatus
+        self.compress = compress
+        self.verbose = verbose
+        self.serverPort = self.server_address[1]
+        self.stopped = threading.Event()
+        self.connections = set()
+        self.connectionsLock = threading.Lock()
+
+    def sweep(self):
+        while not self.stopped.wait(1):
+            self.state.requeueTimedOut()
+
+    def start(self):
+        """Serve requests and sweep timed out tasks on daemon threads"""
+
+        for target in (self.serve_forever, self.sweep):
+            thread = threading.Thread(target=target)
+            thread.daemon = True
+            thread.start()
+
+    def stop(self):
+        """Stop serving and close the keep-alive connections still open"""
+
+        self.stopped.set()
+        self.shutdown()
+        self.server_close()
+        with self.connectionsLock:
+            for connection in list(self.connections):
+                try:
+                    connection.shutdown(socket.SHUT_RDWR)
+                except socket.error:
+                    pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local mock Conductor Server for offline load testing.")
+    parser.add_argument('--host', default="127.0.0.1", help='Address to listen on (default == 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on (default == 8080)')
+    parser.add_argument('--latency', type=float, default=0, help='Mean latency injected in every response, in ms (default == 0)')
+    parser.add_argument('--jitter', type=float, default=0, help='Standard deviation of the injected latency, in ms (default == 0)')
+    parser.add_argument('--errorRate', type=float, default=0, help='Fraction of requests failed with --errorStatus (default == 0)')
+    parser.add_argument('--errorStatus', type=int, default=503, help='Status of injected errors (default == 503)')
+    parser.add_argument('--gzip', action='store_true', help='gzip responses of 1KB or more to clients accepting it')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    server = MockConductorServer(args.host, args.port, latency=args.latency, jitter=args.jitter, errorRate=args.errorRate, errorStatus=args.errorStatus, compress=args.gzip, verbose=args.verbose)
+    server.start()
+    print("Mock Conductor Server listening on http://" + args.host + ":" + str(server.serverPort))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()